@@ -28,6 +28,14 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip spatial/full-text columns, indexes and SQLite virtual tables created by DDL, not declared in models."""
+    if reflected and compare_to is None and name:
+        if name.endswith(("geog", "search_vector")) or "_rtree" in name or "_fts" in name:
+            return False
+    return True
+
+
 def get_url():
     return str(settings.SQLALCHEMY_DATABASE_URI)
 
@@ -53,6 +61,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -79,7 +88,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,27 @@
+"""add properties.updated_at index
+
+Revision ID: 1b2c3d4e5f6a
+Revises: f0a1b2c3d4e5
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b2c3d4e5f6a'
+down_revision: Union[str, None] = 'f0a1b2c3d4e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index for the analytics snapshot's incremental refresh (updated_at >= watermark)."""
+    op.create_index('ix_properties_updated_at', 'properties', ['updated_at'])
+
+
+def downgrade() -> None:
+    """Remove updated_at index."""
+    op.drop_index('ix_properties_updated_at', table_name='properties')
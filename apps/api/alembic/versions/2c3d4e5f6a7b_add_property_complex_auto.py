@@ -0,0 +1,31 @@
+"""add properties.complex_auto
+
+Revision ID: 2c3d4e5f6a7b
+Revises: 1b2c3d4e5f6a
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c3d4e5f6a7b'
+down_revision: Union[str, None] = '1b2c3d4e5f6a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Mark complex names assigned by complex_matcher; existing names count as admin-set."""
+    op.add_column(
+        'properties',
+        sa.Column('complex_auto', sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    """Remove complex_auto column."""
+    op.drop_column('properties', 'complex_auto')
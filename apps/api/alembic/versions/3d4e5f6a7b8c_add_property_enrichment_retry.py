@@ -0,0 +1,38 @@
+"""add properties enrichment retry and lease columns
+
+Revision ID: 3d4e5f6a7b8c
+Revises: 2c3d4e5f6a7b
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d4e5f6a7b8c'
+down_revision: Union[str, None] = '2c3d4e5f6a7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Track geocoding retries, worker leases and coordinates of a previous address."""
+    op.add_column(
+        'properties',
+        sa.Column('enrichment_attempts', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column('properties', sa.Column('enrichment_retry_at', sa.DateTime(), nullable=True))
+    op.add_column(
+        'properties',
+        sa.Column('location_stale', sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    """Remove enrichment retry columns."""
+    op.drop_column('properties', 'location_stale')
+    op.drop_column('properties', 'enrichment_retry_at')
+    op.drop_column('properties', 'enrichment_attempts')
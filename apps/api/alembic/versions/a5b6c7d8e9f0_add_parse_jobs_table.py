@@ -0,0 +1,51 @@
+"""add parse_jobs table
+
+Revision ID: a5b6c7d8e9f0
+Revises: f4a5b6c7d8e9
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5b6c7d8e9f0'
+down_revision: Union[str, None] = 'f4a5b6c7d8e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create parse_jobs table for the background parse queue."""
+    op.create_table(
+        'parse_jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('source', sa.String(length=50), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('pages_done', sa.Integer(), nullable=False),
+        sa.Column('last_completed_page', sa.Integer(), nullable=False),
+        sa.Column('items_found', sa.Integer(), nullable=False),
+        sa.Column('items_saved', sa.Integer(), nullable=False),
+        sa.Column('items_updated', sa.Integer(), nullable=False),
+        sa.Column('items_unchanged', sa.Integer(), nullable=False),
+        sa.Column('errors', sa.JSON(), nullable=False),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_parse_jobs_status', 'parse_jobs', ['status'])
+    op.create_index('ix_parse_jobs_created_at', 'parse_jobs', ['created_at'])
+
+
+def downgrade() -> None:
+    """Drop parse_jobs table."""
+    op.drop_index('ix_parse_jobs_created_at', table_name='parse_jobs')
+    op.drop_index('ix_parse_jobs_status', table_name='parse_jobs')
+    op.drop_table('parse_jobs')
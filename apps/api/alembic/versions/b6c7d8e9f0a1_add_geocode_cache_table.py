@@ -0,0 +1,38 @@
+"""add geocode_cache table
+
+Revision ID: b6c7d8e9f0a1
+Revises: a5b6c7d8e9f0
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6c7d8e9f0a1'
+down_revision: Union[str, None] = 'a5b6c7d8e9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create geocode_cache table keyed by normalized address."""
+    op.create_table(
+        'geocode_cache',
+        sa.Column('normalized', sa.String(length=500), nullable=False),
+        sa.Column('address', sa.String(length=500), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=True),
+        sa.Column('longitude', sa.Float(), nullable=True),
+        sa.Column('provider', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('normalized'),
+    )
+
+
+def downgrade() -> None:
+    """Drop geocode_cache table."""
+    op.drop_table('geocode_cache')
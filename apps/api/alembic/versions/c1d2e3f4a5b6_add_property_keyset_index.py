@@ -0,0 +1,32 @@
+"""add composite index for keyset pagination
+
+Revision ID: c1d2e3f4a5b6
+Revises: 2196de3ff51e
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1d2e3f4a5b6'
+down_revision: Union[str, None] = '2196de3ff51e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add (is_active, created_at, id) index backing cursor pagination."""
+    op.create_index(
+        'idx_property_active_created',
+        'properties',
+        ['is_active', 'created_at', 'id'],
+    )
+
+
+def downgrade() -> None:
+    """Remove keyset pagination index."""
+    op.drop_index('idx_property_active_created', table_name='properties')
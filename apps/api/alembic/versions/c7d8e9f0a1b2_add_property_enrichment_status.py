@@ -0,0 +1,31 @@
+"""add properties.enrichment_status
+
+Revision ID: c7d8e9f0a1b2
+Revises: b6c7d8e9f0a1
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d8e9f0a1b2'
+down_revision: Union[str, None] = 'b6c7d8e9f0a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Track background geocoding/distances; existing rows count as done."""
+    op.add_column('properties', sa.Column('enrichment_status', sa.String(length=20), nullable=True))
+    op.execute("UPDATE properties SET enrichment_status = 'done'")
+    op.create_index('ix_properties_enrichment_status', 'properties', ['enrichment_status'])
+
+
+def downgrade() -> None:
+    """Remove enrichment_status column."""
+    op.drop_index('ix_properties_enrichment_status', table_name='properties')
+    op.drop_column('properties', 'enrichment_status')
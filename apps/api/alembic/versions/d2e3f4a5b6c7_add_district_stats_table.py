@@ -0,0 +1,44 @@
+"""add materialized district_stats table
+
+Revision ID: d2e3f4a5b6c7
+Revises: c1d2e3f4a5b6
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2e3f4a5b6c7'
+down_revision: Union[str, None] = 'c1d2e3f4a5b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create district_stats table (filled at API startup or via /heatmap/districts/refresh)."""
+    op.create_table(
+        'district_stats',
+        sa.Column('district', sa.String(length=200), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('avg_price', sa.Float(), nullable=True),
+        sa.Column('min_price', sa.Float(), nullable=True),
+        sa.Column('max_price', sa.Float(), nullable=True),
+        sa.Column('median_price', sa.Float(), nullable=True),
+        sa.Column('avg_price_per_sqm', sa.Float(), nullable=True),
+        sa.Column('avg_area', sa.Float(), nullable=True),
+        sa.Column('center_lat', sa.Float(), nullable=True),
+        sa.Column('center_lng', sa.Float(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('district'),
+    )
+    op.create_index('ix_district_stats_count', 'district_stats', ['count'])
+
+
+def downgrade() -> None:
+    """Drop district_stats table."""
+    op.drop_index('ix_district_stats_count', table_name='district_stats')
+    op.drop_table('district_stats')
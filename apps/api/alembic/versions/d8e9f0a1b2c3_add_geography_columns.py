@@ -0,0 +1,46 @@
+"""add generated geography columns with GiST indexes
+
+Revision ID: d8e9f0a1b2c3
+Revises: c7d8e9f0a1b2
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e9f0a1b2c3'
+down_revision: Union[str, None] = 'c7d8e9f0a1b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('properties', 'infrastructure')
+
+ADD_COLUMN = (
+    "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS geog geography(Point, 4326) "
+    "GENERATED ALWAYS AS ("
+    "CASE WHEN latitude IS NOT NULL AND longitude IS NOT NULL "
+    "THEN ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography END"
+    ") STORED"
+)
+
+
+def upgrade() -> None:
+    """geography(Point) from latitude/longitude for index-assisted radius, bbox and k-NN (PostgreSQL only)."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+    for table in TABLES:
+        op.execute(ADD_COLUMN.format(table=table))
+        op.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_geog ON {table} USING GIST (geog)")
+
+
+def downgrade() -> None:
+    """Remove geog columns and their indexes."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in TABLES:
+        op.execute(f"DROP INDEX IF EXISTS idx_{table}_geog")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS geog")
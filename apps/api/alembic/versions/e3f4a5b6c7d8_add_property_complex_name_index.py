@@ -0,0 +1,32 @@
+"""add index on properties.complex_name
+
+Revision ID: e3f4a5b6c7d8
+Revises: d2e3f4a5b6c7
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3f4a5b6c7d8'
+down_revision: Union[str, None] = 'd2e3f4a5b6c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index complex_name for GROUP BY in /complexes.
+
+    Existing rows are classified by `python -m app.services.complex_matcher`
+    or POST /complexes-admin/backfill.
+    """
+    op.create_index('ix_properties_complex_name', 'properties', ['complex_name'])
+
+
+def downgrade() -> None:
+    """Remove complex_name index."""
+    op.drop_index('ix_properties_complex_name', table_name='properties')
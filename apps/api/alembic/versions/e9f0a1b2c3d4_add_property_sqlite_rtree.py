@@ -0,0 +1,55 @@
+"""add R-tree spatial index for properties on SQLite
+
+Revision ID: e9f0a1b2c3d4
+Revises: d8e9f0a1b2c3
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9f0a1b2c3d4'
+down_revision: Union[str, None] = 'd8e9f0a1b2c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """R-tree over properties.rowid kept in sync by triggers (SQLite only; PostgreSQL uses the geog GiST index)."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS properties_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)")
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS properties_rtree_ai AFTER INSERT ON properties "
+        "WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN "
+        "INSERT INTO properties_rtree VALUES (new.rowid, new.latitude, new.latitude, new.longitude, new.longitude); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS properties_rtree_au AFTER UPDATE OF latitude, longitude ON properties BEGIN "
+        "DELETE FROM properties_rtree WHERE id = old.rowid; "
+        "INSERT INTO properties_rtree SELECT new.rowid, new.latitude, new.latitude, new.longitude, new.longitude "
+        "WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL; "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS properties_rtree_ad AFTER DELETE ON properties BEGIN "
+        "DELETE FROM properties_rtree WHERE id = old.rowid; "
+        "END"
+    )
+    op.execute(
+        "INSERT INTO properties_rtree SELECT rowid, latitude, latitude, longitude, longitude FROM properties "
+        "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Remove the R-tree and its triggers."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in ('properties_rtree_ai', 'properties_rtree_au', 'properties_rtree_ad'):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS properties_rtree")
@@ -0,0 +1,70 @@
+"""add full-text search index for properties
+
+Revision ID: f0a1b2c3d4e5
+Revises: e9f0a1b2c3d4
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f0a1b2c3d4e5'
+down_revision: Union[str, None] = 'e9f0a1b2c3d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """tsvector + GIN on PostgreSQL, external-content FTS5 + triggers on SQLite."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE properties ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(address, '')), 'B') || "
+            "setweight(to_tsvector('russian', coalesce(description, '')), 'C')"
+            ") STORED"
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS idx_properties_search_vector ON properties USING GIN (search_vector)")
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS properties_fts USING fts5("
+            "title, address, description, content='properties', content_rowid='rowid', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS properties_fts_ai AFTER INSERT ON properties BEGIN "
+            "INSERT INTO properties_fts(rowid, title, address, description) "
+            "VALUES (new.rowid, new.title, new.address, new.description); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS properties_fts_ad AFTER DELETE ON properties BEGIN "
+            "INSERT INTO properties_fts(properties_fts, rowid, title, address, description) "
+            "VALUES ('delete', old.rowid, old.title, old.address, old.description); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS properties_fts_au AFTER UPDATE OF title, address, description ON properties BEGIN "
+            "INSERT INTO properties_fts(properties_fts, rowid, title, address, description) "
+            "VALUES ('delete', old.rowid, old.title, old.address, old.description); "
+            "INSERT INTO properties_fts(rowid, title, address, description) "
+            "VALUES (new.rowid, new.title, new.address, new.description); "
+            "END"
+        )
+        op.execute("INSERT INTO properties_fts(properties_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Remove the full-text index."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS idx_properties_search_vector")
+        op.execute("ALTER TABLE properties DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        for trigger in ('properties_fts_ai', 'properties_fts_ad', 'properties_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS properties_fts")
@@ -0,0 +1,45 @@
+"""add unique index on properties (source, source_id)
+
+Revision ID: f4a5b6c7d8e9
+Revises: e3f4a5b6c7d8
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a5b6c7d8e9'
+down_revision: Union[str, None] = 'e3f4a5b6c7d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Conflict target for parser bulk upserts.
+
+    Older duplicates of the same listing keep their rows but lose source_id
+    (NULLs never conflict), so the newest copy becomes the upsert target.
+    """
+    op.execute("""
+        UPDATE properties SET source_id = NULL
+        WHERE source_id IS NOT NULL
+          AND EXISTS (
+            SELECT 1 FROM properties newer
+            WHERE newer.source = properties.source
+              AND newer.source_id = properties.source_id
+              AND (newer.created_at > properties.created_at
+                   OR (newer.created_at = properties.created_at AND newer.id > properties.id))
+          )
+    """)
+    op.create_index(
+        'uq_property_source_source_id', 'properties', ['source', 'source_id'], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Remove unique (source, source_id) index."""
+    op.drop_index('uq_property_source_source_id', table_name='properties')
@@ -4,33 +4,38 @@ CRUD операции для админ-панели.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.core.deps import get_db
+from app.core import cache
+from app.core.deps import get_db, get_async_db
 from app.models.complex import Complex
 from app.schemas.complex import ComplexCreate, ComplexUpdate, ComplexResponse
+from app.services import complex_matcher
+from app.api.v1.auth import require_admin
 
 router = APIRouter(prefix="/complexes-admin", tags=["complexes-admin"])
 
 
 @router.get("", response_model=List[ComplexResponse])
-async def list_complexes_admin(db: Session = Depends(get_db)):
+async def list_complexes_admin(db: AsyncSession = Depends(get_async_db)):
     """Получить список всех ЖК для админки."""
-    return db.query(Complex).all()
+    return (await db.scalars(select(Complex))).all()
 
 
 @router.get("/{complex_id}", response_model=ComplexResponse)
-async def get_complex_admin(complex_id: int, db: Session = Depends(get_db)):
+async def get_complex_admin(complex_id: int, db: AsyncSession = Depends(get_async_db)):
     """Получить ЖК по ID."""
-    complex_obj = db.query(Complex).filter(Complex.id == complex_id).first()
+    complex_obj = await db.get(Complex, complex_id)
     if not complex_obj:
         raise HTTPException(status_code=404, detail="ЖК не найден")
     return complex_obj
 
 
 @router.post("", response_model=ComplexResponse, status_code=status.HTTP_201_CREATED)
-async def create_complex(data: ComplexCreate, db: Session = Depends(get_db)):
+def create_complex(data: ComplexCreate, db: Session = Depends(get_db)):
     """Создать новый ЖК."""
     existing = db.query(Complex).filter(Complex.name == data.name).first()
     if existing:
@@ -40,11 +45,13 @@ async def create_complex(data: ComplexCreate, db: Session = Depends(get_db)):
     db.add(complex_obj)
     db.commit()
     db.refresh(complex_obj)
+    complex_matcher.invalidate()
+    cache.invalidate(cache.COMPLEXES)
     return complex_obj
 
 
 @router.put("/{complex_id}", response_model=ComplexResponse)
-async def update_complex(complex_id: int, data: ComplexUpdate, db: Session = Depends(get_db)):
+def update_complex(complex_id: int, data: ComplexUpdate, db: Session = Depends(get_db)):
     """Обновить ЖК."""
     complex_obj = db.query(Complex).filter(Complex.id == complex_id).first()
     if not complex_obj:
@@ -56,11 +63,13 @@ async def update_complex(complex_id: int, data: ComplexUpdate, db: Session = Dep
     
     db.commit()
     db.refresh(complex_obj)
+    complex_matcher.invalidate()
+    cache.invalidate(cache.COMPLEXES)
     return complex_obj
 
 
 @router.delete("/{complex_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_complex(complex_id: int, db: Session = Depends(get_db)):
+def delete_complex(complex_id: int, db: Session = Depends(get_db)):
     """Удалить ЖК."""
     complex_obj = db.query(Complex).filter(Complex.id == complex_id).first()
     if not complex_obj:
@@ -68,4 +77,14 @@ async def delete_complex(complex_id: int, db: Session = Depends(get_db)):
     
     db.delete(complex_obj)
     db.commit()
+    complex_matcher.invalidate()
+    cache.invalidate(cache.COMPLEXES, cache.PROPERTIES)
     return None
+
+
+@router.post("/backfill", dependencies=[Depends(require_admin)])
+def backfill_complex_assignment(db: Session = Depends(get_db)):
+    """Привязать к ЖК существующие объекты без complex_name."""
+    assigned = complex_matcher.backfill(db)
+    cache.invalidate(cache.PROPERTIES)
+    return {"status": "ok", "assigned": assigned}
@@ -4,10 +4,13 @@ CRUD операции для админ-панели.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.core.deps import get_db
+from app.core import cache
+from app.core.deps import get_db, get_async_db
 from app.models.district import District
 from app.schemas.district import DistrictCreate, DistrictUpdate, DistrictResponse
 
@@ -15,22 +18,22 @@ router = APIRouter(prefix="/districts", tags=["districts"])
 
 
 @router.get("", response_model=List[DistrictResponse])
-async def list_districts(db: Session = Depends(get_db)):
+async def list_districts(db: AsyncSession = Depends(get_async_db)):
     """Получить список всех районов."""
-    return db.query(District).all()
+    return (await db.scalars(select(District))).all()
 
 
 @router.get("/{district_id}", response_model=DistrictResponse)
-async def get_district(district_id: int, db: Session = Depends(get_db)):
+async def get_district(district_id: int, db: AsyncSession = Depends(get_async_db)):
     """Получить район по ID."""
-    district = db.query(District).filter(District.id == district_id).first()
+    district = await db.get(District, district_id)
     if not district:
         raise HTTPException(status_code=404, detail="Район не найден")
     return district
 
 
 @router.post("", response_model=DistrictResponse, status_code=status.HTTP_201_CREATED)
-async def create_district(data: DistrictCreate, db: Session = Depends(get_db)):
+def create_district(data: DistrictCreate, db: Session = Depends(get_db)):
     """Создать новый район."""
     # Проверка уникальности имени
     existing = db.query(District).filter(District.name == data.name).first()
@@ -41,11 +44,12 @@ async def create_district(data: DistrictCreate, db: Session = Depends(get_db)):
     db.add(district)
     db.commit()
     db.refresh(district)
+    cache.invalidate(cache.DISTRICTS)
     return district
 
 
 @router.put("/{district_id}", response_model=DistrictResponse)
-async def update_district(district_id: int, data: DistrictUpdate, db: Session = Depends(get_db)):
+def update_district(district_id: int, data: DistrictUpdate, db: Session = Depends(get_db)):
     """Обновить район."""
     district = db.query(District).filter(District.id == district_id).first()
     if not district:
@@ -57,11 +61,12 @@ async def update_district(district_id: int, data: DistrictUpdate, db: Session =
     
     db.commit()
     db.refresh(district)
+    cache.invalidate(cache.DISTRICTS)
     return district
 
 
 @router.delete("/{district_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_district(district_id: int, db: Session = Depends(get_db)):
+def delete_district(district_id: int, db: Session = Depends(get_db)):
     """Удалить район."""
     district = db.query(District).filter(District.id == district_id).first()
     if not district:
@@ -69,4 +74,5 @@ async def delete_district(district_id: int, db: Session = Depends(get_db)):
     
     db.delete(district)
     db.commit()
+    cache.invalidate(cache.DISTRICTS)
     return None
@@ -1,21 +1,25 @@
 """API endpoint for GeoJSON heatmap data."""
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import Optional, List, Dict, Any
 
-from app.core.deps import get_db
+from app.core import cache
+from app.core.deps import get_analytics_db, get_db
 from app.models.property import Property
+from app.services import heatmap_service, district_stats_service
+from app.api.v1.auth import require_admin
 
 router = APIRouter(prefix="/heatmap", tags=["Heatmap & Analytics"])
 
 
 @router.get("")
 def get_heatmap_data(
+    request: Request,
     district: Optional[str] = Query(None, description="Filter by district"),
     min_price: Optional[float] = Query(None, description="Minimum price"),
     max_price: Optional[float] = Query(None, description="Maximum price"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_analytics_db)
 ) -> Dict[str, Any]:
     """Return GeoJSON FeatureCollection for map visualization.
     
@@ -25,7 +29,31 @@ def get_heatmap_data(
     - district, address
     - property_id for linking
     """
-    query = db.query(Property).filter(Property.is_active == True)
+    return cache.cached_response(
+        request, [cache.PROPERTIES],
+        lambda: _build_heatmap(db, district, min_price, max_price),
+    )
+
+
+def _build_heatmap(
+    db: Session,
+    district: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+) -> Dict[str, Any]:
+    # Only the columns the features need, not full ORM rows
+    query = db.query(
+        Property.id,
+        Property.title,
+        Property.price,
+        Property.area_sqm,
+        Property.rooms,
+        Property.address,
+        Property.source,
+        Property.marker_icon,
+        Property.latitude,
+        Property.longitude,
+    ).filter(Property.is_active == True)
     
     if district:
         query = query.filter(Property.address.ilike(f"%{district}%"))
@@ -72,60 +100,72 @@ def get_heatmap_data(
     }
 
 
+@router.get("/tiles/{z}/{x}/{y}")
+def get_heatmap_tile(
+    request: Request,
+    z: int = Path(..., ge=0, le=heatmap_service.MAX_ZOOM, description="Zoom level"),
+    x: int = Path(..., ge=0, description="Tile column"),
+    y: int = Path(..., ge=0, description="Tile row"),
+    min_price: Optional[float] = Query(None, description="Minimum price"),
+    max_price: Optional[float] = Query(None, description="Maximum price"),
+    db: Session = Depends(get_analytics_db)
+) -> Dict[str, Any]:
+    """Return pre-clustered heatmap cells for one XYZ map tile.
+    
+    Below zoom 15 each feature is a grid cell with count, avg price and
+    avg price per m². From zoom 15 on, individual listings are returned.
+    """
+    if x >= 2 ** z or y >= 2 ** z:
+        raise HTTPException(status_code=400, detail="Tile coordinates out of range")
+    
+    bbox = heatmap_service.tile_bounds(z, x, y)
+    return cache.cached_response(
+        request, [cache.PROPERTIES],
+        lambda: heatmap_service.get_collection(db, bbox, z, min_price, max_price),
+    )
+
+
+@router.get("/clusters")
+def get_heatmap_clusters(
+    request: Request,
+    bbox: str = Query(..., description="west,south,east,north"),
+    zoom: int = Query(..., ge=0, le=heatmap_service.MAX_ZOOM, description="Map zoom level"),
+    min_price: Optional[float] = Query(None, description="Minimum price"),
+    max_price: Optional[float] = Query(None, description="Maximum price"),
+    db: Session = Depends(get_analytics_db)
+) -> Dict[str, Any]:
+    """Same as /tiles, but for the current viewport bbox."""
+    try:
+        bounds = heatmap_service.parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return cache.cached_response(
+        request, [cache.PROPERTIES],
+        lambda: heatmap_service.get_collection(db, bounds, zoom, min_price, max_price),
+    )
+
+
 @router.get("/districts")
 def get_district_analytics(
+    request: Request,
     days: int = Query(30, description="Analysis period in days"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_analytics_db)
 ) -> List[Dict[str, Any]]:
     """Get aggregated analytics by district.
     
     Returns price statistics, object count, and avg price per sqm for each district.
+    Served from the materialized district_stats table.
     """
-    # Get all properties with location data
-    properties = db.query(Property).filter(
-        Property.is_active == True,
-        Property.latitude.isnot(None)
-    ).all()
-    
-    # Group by approximate district (from address or coordinates)
-    districts: Dict[str, List[Property]] = {}
-    
-    for prop in properties:
-        # Extract district from address (simplified)
-        address_parts = prop.address.split(",") if prop.address else []
-        district = address_parts[-1].strip() if len(address_parts) > 1 else "Сочи"
-        
-        if district not in districts:
-            districts[district] = []
-        districts[district].append(prop)
-    
-    # Calculate analytics per district
-    result = []
-    for district_name, props in districts.items():
-        prices = [p.price for p in props]
-        areas = [p.area_sqm for p in props if p.area_sqm > 0]
-        price_per_sqm = [p.price / p.area_sqm for p in props if p.area_sqm > 0]
-        
-        # Calculate center coordinates for district
-        lats = [p.latitude for p in props if p.latitude]
-        lngs = [p.longitude for p in props if p.longitude]
-        
-        result.append({
-            "district": district_name,
-            "count": len(props),
-            "avg_price": round(sum(prices) / len(prices)) if prices else 0,
-            "min_price": min(prices) if prices else 0,
-            "max_price": max(prices) if prices else 0,
-            "median_price": sorted(prices)[len(prices) // 2] if prices else 0,
-            "avg_price_per_sqm": round(sum(price_per_sqm) / len(price_per_sqm)) if price_per_sqm else 0,
-            "avg_area": round(sum(areas) / len(areas)) if areas else 0,
-            "center": {
-                "lat": sum(lats) / len(lats) if lats else 43.585,
-                "lng": sum(lngs) / len(lngs) if lngs else 39.720
-            }
-        })
-    
-    # Sort by count descending
-    result.sort(key=lambda x: x["count"], reverse=True)
-    
-    return result
+    return cache.cached_response(
+        request, [cache.PROPERTIES, cache.DISTRICTS],
+        lambda: district_stats_service.get_district_stats(db),
+    )
+
+
+@router.post("/districts/refresh", dependencies=[Depends(require_admin)])
+def refresh_district_analytics(db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """Rebuild materialized district analytics (for cron / manual use)."""
+    districts = district_stats_service.refresh_all(db)
+    cache.invalidate(cache.DISTRICTS)
+    return {"status": "ok", "districts": districts}
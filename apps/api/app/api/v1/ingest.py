@@ -1,5 +1,6 @@
 """API endpoints for data ingestion from external sources."""
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
@@ -59,7 +60,7 @@ async def parse_url(request: ParseUrlRequest, db: Session = Depends(get_db)):
     )
     
     # Save to database
-    prop = property_service.create_property(db, property_create)
+    prop = await run_in_threadpool(property_service.create_property, db, property_create)
     
     return ParseUrlResponse(
         success=True,
@@ -1,14 +1,17 @@
 """API endpoint for triggering real parsers."""
-from fastapi import APIRouter, Depends, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import asyncio
 
+from app.api.v1.auth import require_admin
 from app.core.deps import get_db
+from app.schemas.parse_job import ParseJobCreate, ParseJobResponse
 from app.schemas.property import PropertyCreate
-from app.services import property_service
-from app.parsers import CianParser, AvitoParser
+from app.services import property_service, parse_job_service
+from app.parsers import CianParser, AvitoParser, crawl
 
 router = APIRouter(prefix="/parse", tags=["Data Parsers"])
 
@@ -17,7 +20,8 @@ class ParseRequest(BaseModel):
     source: str  # "cian" or "avito"
     min_price: Optional[int] = None
     max_price: Optional[int] = None
-    max_pages: int = 1
+    max_pages: int = Field(default=1, ge=1, le=100)
+    concurrency: int = Field(default=3, ge=1, le=10)  # Pages fetched in parallel (rate limit still applies)
 
 
 class ParseResponse(BaseModel):
@@ -25,137 +29,44 @@ class ParseResponse(BaseModel):
     source: str
     items_found: int
     items_saved: int
+    items_updated: int = 0
+    items_unchanged: int = 0
     errors: List[str]
 
 
-from app.services.geocoding_service import geocode_address_2gis
-
 @router.post("/run", response_model=ParseResponse)
 async def run_parser(
     request: ParseRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ) -> ParseResponse:
-    """Run parser for specified source."""
-    # ... implementation details ...
+    """Run parser for specified source inside the request.
+    
+    Pages are fetched concurrently within the source's rate limit and each
+    one is written with a single bulk upsert keyed by (source, source_id):
+    new listings are inserted, changed ones updated, the rest skipped.
+    For multi-page runs prefer POST /parse/jobs.
+    """
     errors = []
     items_found = 0
-    items_saved = 0
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    source = request.source.lower()
     
-    if request.source.lower() == "cian":
-        parser = CianParser()
+    if source in parse_job_service.PARSERS:
+        _, parser_class = parse_job_service.PARSERS[source]
         
-        for page in range(1, request.max_pages + 1):
-            properties = await parser.search_sochi(
+        # Pages are saved as they arrive while later ones are still downloading
+        async with parser_class() as parser:
+            async for page in crawl(
+                parser,
+                request.max_pages,
+                concurrency=request.concurrency,
                 min_price=request.min_price,
                 max_price=request.max_price,
-                page=page
-            )
-            
-            items_found += len(properties)
-            
-            for prop in properties:
-                try:
-                    # Check if already exists
-                    existing = db.query(property_service.Property).filter(
-                        property_service.Property.source_id == prop.source_id
-                    ).first()
-                    
-                    if existing:
-                        continue
-                    
-                    # Geocode if needed
-                    lat, lon = prop.latitude, prop.longitude
-                    if lat is None or lon is None:
-                        try:
-                            coords = await geocode_address_2gis(prop.address, city="Сочи")
-                            if coords:
-                                lat, lon = coords
-                        except Exception:
-                            pass
-
-                    # Create new property
-                    property_create = PropertyCreate(
-                        title=prop.title,
-                        description=prop.description,
-                        price=prop.price,
-                        currency=prop.currency,
-                        address=prop.address,
-                        latitude=lat,
-                        longitude=lon,
-                        area_sqm=prop.area_sqm,
-                        rooms=prop.rooms,
-                        floor=prop.floor,
-                        total_floors=prop.total_floors,
-                        source="cian",
-                        source_id=prop.source_id,
-                        url=prop.url,
-                        images=prop.images,
-                        features=prop.features,
-                    )
-                    
-                    property_service.create_property(db, property_create)
-                    items_saved += 1
-                    
-                except Exception as e:
-                    errors.append(f"CIAN save error: {str(e)[:100]}")
-    
-    elif request.source.lower() == "avito":
-        parser = AvitoParser()
-        
-        for page in range(1, request.max_pages + 1):
-            properties = await parser.search_sochi(
-                min_price=request.min_price,
-                max_price=request.max_price,
-                page=page
-            )
-            
-            items_found += len(properties)
-            
-            for prop in properties:
-                try:
-                    existing = db.query(property_service.Property).filter(
-                        property_service.Property.source_id == prop.source_id
-                    ).first()
-                    
-                    if existing:
-                        continue
-                    
-                    # Geocode if needed
-                    lat, lon = prop.latitude, prop.longitude
-                    if lat is None or lon is None:
-                        try:
-                            coords = await geocode_address_2gis(prop.address, city="Сочи")
-                            if coords:
-                                lat, lon = coords
-                        except Exception:
-                            pass
-
-                    property_create = PropertyCreate(
-                        title=prop.title,
-                        description=prop.description,
-                        price=prop.price,
-                        currency=prop.currency,
-                        address=prop.address,
-                        latitude=lat,
-                        longitude=lon,
-                        area_sqm=prop.area_sqm,
-                        rooms=prop.rooms,
-                        floor=prop.floor,
-                        total_floors=prop.total_floors,
-                        source="avito",
-                        source_id=prop.source_id,
-                        url=prop.url,
-                        images=prop.images,
-                        features=prop.features,
-                    )
-                    
-                    property_service.create_property(db, property_create)
-                    items_saved += 1
-                    
-                except Exception as e:
-                    errors.append(f"Avito save error: {str(e)[:100]}")
-    
+            ):
+                items_found += len(page.items)
+                result = await parse_job_service.ingest_page(db, source, page, errors)
+                for key, value in (result or {}).items():
+                    counts[key] += value
     else:
         errors.append(f"Unknown source: {request.source}")
     
@@ -163,11 +74,58 @@ async def run_parser(
         status="completed" if not errors else "completed_with_errors",
         source=request.source,
         items_found=items_found,
-        items_saved=items_saved,
+        items_saved=counts["inserted"],
+        items_updated=counts["updated"],
+        items_unchanged=counts["unchanged"],
         errors=errors[:10]  # Limit errors in response
     )
 
 
+@router.post("/jobs", response_model=ParseJobResponse, status_code=202, dependencies=[Depends(require_admin)])
+def create_parse_job(
+    request: ParseJobCreate,
+    db: Session = Depends(get_db)
+) -> ParseJobResponse:
+    """Enqueue a parse job for the background workers.
+    
+    Poll GET /parse/jobs/{id} for progress.
+    """
+    try:
+        return parse_job_service.create_job(db, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/jobs", response_model=List[ParseJobResponse], dependencies=[Depends(require_admin)])
+def list_parse_jobs(
+    status: Optional[str] = Query(None, description="queued, running, completed, failed, cancelled"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+) -> List[ParseJobResponse]:
+    """List parse jobs, most recent first."""
+    return parse_job_service.list_jobs(db, status=status, limit=limit)
+
+
+@router.get("/jobs/{job_id}", response_model=ParseJobResponse, dependencies=[Depends(require_admin)])
+def get_parse_job(job_id: str, db: Session = Depends(get_db)) -> ParseJobResponse:
+    """Get progress of a parse job."""
+    job = parse_job_service.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=ParseJobResponse, dependencies=[Depends(require_admin)])
+def cancel_parse_job(job_id: str, db: Session = Depends(get_db)) -> ParseJobResponse:
+    """Cancel a parse job. A running job stops after the page in progress."""
+    job = parse_job_service.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status in parse_job_service.FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return parse_job_service.request_cancel(db, job)
+
+
 @router.get("/sources")
 def list_sources() -> List[Dict[str, Any]]:
     """List available parser sources."""
@@ -199,12 +157,12 @@ async def parse_url(
     Detects source automatically and parses the listing.
     """
     if "cian.ru" in url:
-        parser = CianParser()
-        prop = await parser.parse_listing(url)
+        async with CianParser() as parser:
+            prop = await parser.parse_listing(url)
         source = "cian"
     elif "avito.ru" in url:
-        parser = AvitoParser()
-        prop = await parser.parse_listing(url)
+        async with AvitoParser() as parser:
+            prop = await parser.parse_listing(url)
         source = "avito"
     else:
         return {"error": "Unsupported URL. Use cian.ru or avito.ru"}
@@ -233,7 +191,7 @@ async def parse_url(
             features=prop.features,
         )
         
-        saved = property_service.create_property(db, property_create)
+        saved = await run_in_threadpool(property_service.create_property, db, property_create)
         
         return {
             "success": True,
@@ -1,19 +1,24 @@
 """API endpoints for Properties resource."""
 import math
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db
+from app.core import cache
+from app.core.config import settings
+from app.core.deps import get_analytics_db, get_db, get_read_db
 from app.schemas.property import (
     PropertyCreate,
     PropertyUpdate,
     PropertyResponse,
+    PropertyCardResponse,
     PropertyListResponse,
     BulkPropertyCreate,
     BulkCreateResponse,
 )
-from app.services import property_service
+from app.services import property_service, distance_backfill, heatmap_service
 
 from app.api.v1.auth import require_admin
 from app.models.user import User
@@ -25,6 +30,10 @@ router = APIRouter(prefix="/properties", tags=["Properties"])
 def list_properties(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor (keyset mode)"),
+    with_total: Optional[bool] = Query(
+        None, description="Compute total count (default: on for page mode, off for cursor mode)"
+    ),
     min_price: Optional[float] = Query(None, ge=0),
     max_price: Optional[float] = Query(None, ge=0),
     min_area: Optional[float] = Query(None, ge=0),
@@ -34,37 +43,172 @@ def list_properties(
     layout_type: Optional[str] = Query(None),
     finishing_type: Optional[str] = Query(None),
     is_from_developer: Optional[bool] = Query(None),
-    db: Session = Depends(get_db),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Search center latitude"),
+    lon: Optional[float] = Query(None, ge=-180, le=180, description="Search center longitude"),
+    radius_m: Optional[float] = Query(None, gt=0, le=100_000, description="Search radius around lat/lon, meters"),
+    bbox: Optional[str] = Query(None, description="west,south,east,north"),
+    q: Optional[str] = Query(None, max_length=200, description="Full-text search in title, address and description"),
+    sort: Optional[Literal["created", "distance", "relevance"]] = Query(
+        None, description="Default: relevance with q, created otherwise; distance requires lat/lon"
+    ),
+    view: Literal["full", "card"] = Query("full", description="card: catalog card projection without JSON columns"),
+    fields: Optional[str] = Query(None, description="Comma-separated item fields to return, e.g. id,title,price"),
+    db: Session = Depends(get_read_db),
 ):
-    """List properties with filters and pagination."""
+    """List properties with filters and pagination.
+    
+    Supports two modes:
+    - page mode (``page``/``size``) with total count, used by the admin UI;
+    - cursor mode (``cursor``) for infinite scroll, pass ``next_cursor`` from
+      the previous response to get the following page.
+    
+    ``lat``/``lon``/``radius_m`` and ``bbox`` filter by location, ``q`` by
+    text; both combine with the other filters. ``sort=distance`` and
+    ``sort=relevance`` work in page mode only.
+    
+    ``view=card`` returns PropertyCardResponse items and ``fields`` only the
+    listed keys (overrides ``view``); both load just the columns they need.
+    """
+    if with_total is None:
+        with_total = cursor is None
+    
     skip = (page - 1) * size
-    items, total = property_service.get_properties(
-        db=db,
-        skip=skip,
-        limit=size,
-        min_price=min_price,
-        max_price=max_price,
-        min_area=min_area,
-        max_area=max_area,
-        rooms=rooms,
-        source=source,
-        layout_type=layout_type,
-        finishing_type=finishing_type,
-        is_from_developer=is_from_developer,
-    )
-    pages = math.ceil(total / size) if total > 0 else 1
+    try:
+        bounds = heatmap_service.parse_bbox(bbox) if bbox else None
+        names = property_service.parse_fields(fields) if fields is not None else None
+        if names is not None:
+            columns = names
+        elif view == "card":
+            columns = property_service.CARD_COLUMNS
+        else:
+            columns = None
+        items, total, next_cursor = property_service.get_properties(
+            db=db,
+            skip=skip,
+            limit=size,
+            cursor=cursor,
+            with_total=with_total,
+            min_price=min_price,
+            max_price=max_price,
+            min_area=min_area,
+            max_area=max_area,
+            rooms=rooms,
+            source=source,
+            layout_type=layout_type,
+            finishing_type=finishing_type,
+            is_from_developer=is_from_developer,
+            lat=lat,
+            lon=lon,
+            radius_m=radius_m,
+            bbox=bounds,
+            q=q,
+            sort=sort,
+            columns=columns,
+            as_rows=settings.FAST_JSON_READS,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    pages = None
+    if total is not None:
+        pages = math.ceil(total / size) if total > 0 else 1
+    
+    if settings.FAST_JSON_READS:
+        # Items are plain column dicts; no Pydantic validation on the way out
+        if names is None:
+            model = PropertyCardResponse if view == "card" else PropertyResponse
+            names = list(model.model_fields)
+        if "cover_image" in names:
+            for item in items:
+                item["cover_image"] = item["images"][0] if item["images"] else None
+        return ORJSONResponse({
+            "items": [{name: item.get(name) for name in names} for item in items],
+            "total": total,
+            "page": page if cursor is None else None,
+            "size": size,
+            "pages": pages,
+            "next_cursor": next_cursor,
+        })
+    
+    if columns is not None:
+        # Projections bypass PropertyResponse, which would read every column
+        if names is not None:
+            rows = [{name: getattr(prop, name, None) for name in names} for prop in items]
+        else:
+            rows = [PropertyCardResponse.model_validate(prop).model_dump() for prop in items]
+        return JSONResponse(jsonable_encoder({
+            "items": rows,
+            "total": total,
+            "page": page if cursor is None else None,
+            "size": size,
+            "pages": pages,
+            "next_cursor": next_cursor,
+        }))
     
     return PropertyListResponse(
         items=items,
         total=total,
-        page=page,
+        page=page if cursor is None else None,
         size=size,
         pages=pages,
+        next_cursor=next_cursor,
     )
 
 
+@router.get("/facets")
+def get_property_facets(
+    request: Request,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    min_area: Optional[float] = Query(None, ge=0),
+    max_area: Optional[float] = Query(None, ge=0),
+    rooms: Optional[str] = Query(None),
+    source: Optional[str] = Query(None),
+    layout_type: Optional[str] = Query(None),
+    finishing_type: Optional[str] = Query(None),
+    is_from_developer: Optional[bool] = Query(None),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_m: Optional[float] = Query(None, gt=0, le=100_000),
+    bbox: Optional[str] = Query(None, description="west,south,east,north"),
+    q: Optional[str] = Query(None, max_length=200),
+    db: Session = Depends(get_analytics_db),
+):
+    """Counts for every catalog filter option, given the same filters as the list.
+    
+    One grouped query per call, cached until properties change, so it can be
+    requested on every filter change.
+    """
+    try:
+        bounds = heatmap_service.parse_bbox(bbox) if bbox else None
+        if (lat is None) != (lon is None):
+            raise ValueError("lat and lon must be given together")
+        return cache.cached_response(
+            request, [cache.PROPERTIES],
+            lambda: property_service.get_facets(
+                db,
+                min_price=min_price,
+                max_price=max_price,
+                min_area=min_area,
+                max_area=max_area,
+                rooms=rooms,
+                source=source,
+                layout_type=layout_type,
+                finishing_type=finishing_type,
+                is_from_developer=is_from_developer,
+                lat=lat,
+                lon=lon,
+                radius_m=radius_m,
+                bbox=bounds,
+                q=q,
+            ),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/{property_id}", response_model=PropertyResponse)
-def get_property(property_id: str, db: Session = Depends(get_db)):
+def get_property(property_id: str, db: Session = Depends(get_read_db)):
     """Get a single property by ID."""
     db_property = property_service.get_property(db, property_id)
     if not db_property:
@@ -121,6 +265,7 @@ def bulk_create_properties(
     
     Creates multiple apartments based on a template and floor range.
     Example: floors 2-10, 2 apartments per floor = 18 properties created.
+    The template is geocoded once and all units are inserted in one transaction.
     """
     from app.schemas.property import BulkPropertyCreate, BulkCreateResponse
     
@@ -128,33 +273,26 @@ def bulk_create_properties(
     if bulk_data.floor_to < bulk_data.floor_from:
         raise HTTPException(status_code=400, detail="floor_to must be >= floor_from")
     
-    created_ids = []
-    base_price = bulk_data.template.price
-    
-    for floor in range(bulk_data.floor_from, bulk_data.floor_to + 1):
-        for apt_num in range(1, bulk_data.apartments_per_floor + 1):
-            # Calculate floor-adjusted price
-            floor_offset = floor - bulk_data.floor_from
-            adjusted_price = base_price + (floor_offset * bulk_data.price_increment_per_floor)
-            
-            # Create property data from template
-            property_dict = bulk_data.template.model_dump()
-            property_dict['floor'] = floor
-            property_dict['price'] = adjusted_price
-            
-            # Add apartment suffix to title if multiple per floor
-            if bulk_data.apartments_per_floor > 1:
-                property_dict['title'] = f"{property_dict['title']} (эт. {floor}, кв. {apt_num})"
-            else:
-                property_dict['title'] = f"{property_dict['title']} (эт. {floor})"
-            
-            # Create the property
-            property_data = PropertyCreate(**property_dict)
-            new_property = property_service.create_property(db, property_data)
-            created_ids.append(new_property.id)
+    created_ids = property_service.create_floor_units(db, bulk_data)
     
     return BulkCreateResponse(
         created_count=len(created_ids),
         property_ids=created_ids,
         message=f"Создано {len(created_ids)} объектов для этажей {bulk_data.floor_from}-{bulk_data.floor_to}"
     )
+
+
+@router.post("/maintenance/backfill-distances", dependencies=[Depends(require_admin)])
+def backfill_distances(
+    all_rows: bool = Query(False, alias="all", description="Recompute every row, not only empty ones"),
+    chunk_size: int = Query(1000, ge=100, le=10000),
+    db: Session = Depends(get_db),
+):
+    """
+    Recompute distances to infrastructure in bulk.
+    
+    Returns processed row count and throughput (rows per second).
+    """
+    return distance_backfill.backfill_distances(
+        db, only_dirty=not all_rows, chunk_size=chunk_size, on_progress=None
+    )
@@ -3,43 +3,64 @@ API endpoints для глобальных настроек сайта (SiteSetti
 Singleton — только GET и PUT.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db
+from app.core import cache
+from app.core.deps import get_db, get_async_db
 from app.models.site_settings import SiteSettings
 from app.schemas.site_settings import SiteSettingsUpdate, SiteSettingsResponse
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
 
+def _default_settings() -> SiteSettings:
+    return SiteSettings(
+        default_images=[],
+        default_locations=[],
+        social_links={},
+        footer_phone="+7 (800) 555-35-35",
+        footer_email="info@estateanalytics.ru",
+        footer_address="354000, г. Сочи, ул. Навагинская, 9Д",
+        footer_description="Премиальная недвижимость Сочи"
+    )
+
+
 def get_or_create_settings(db: Session) -> SiteSettings:
     """Получить или создать singleton-запись настроек."""
     settings = db.query(SiteSettings).first()
     if not settings:
-        settings = SiteSettings(
-            default_images=[],
-            default_locations=[],
-            social_links={},
-            footer_phone="+7 (800) 555-35-35",
-            footer_email="info@estateanalytics.ru",
-            footer_address="354000, г. Сочи, ул. Навагинская, 9Д",
-            footer_description="Премиальная недвижимость Сочи"
-        )
+        settings = _default_settings()
         db.add(settings)
         db.commit()
         db.refresh(settings)
     return settings
 
 
+async def get_or_create_settings_async(db: AsyncSession) -> SiteSettings:
+    """get_or_create_settings для асинхронной сессии."""
+    settings = (await db.scalars(select(SiteSettings).limit(1))).first()
+    if not settings:
+        settings = _default_settings()
+        db.add(settings)
+        await db.commit()
+        await db.refresh(settings)
+    return settings
+
+
 @router.get("", response_model=SiteSettingsResponse)
-async def get_settings(db: Session = Depends(get_db)):
+async def get_settings(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Получить глобальные настройки сайта."""
-    return get_or_create_settings(db)
+    async def build():
+        return SiteSettingsResponse.model_validate(await get_or_create_settings_async(db)).model_dump(mode="json")
+    
+    return await cache.cached_response_async(request, [cache.SETTINGS], build)
 
 
 @router.put("", response_model=SiteSettingsResponse)
-async def update_settings(data: SiteSettingsUpdate, db: Session = Depends(get_db)):
+def update_settings(data: SiteSettingsUpdate, db: Session = Depends(get_db)):
     """Обновить глобальные настройки сайта."""
     settings = get_or_create_settings(db)
     
@@ -49,4 +70,5 @@ async def update_settings(data: SiteSettingsUpdate, db: Session = Depends(get_db
     
     db.commit()
     db.refresh(settings)
+    cache.invalidate(cache.SETTINGS)
     return settings
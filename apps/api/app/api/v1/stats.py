@@ -1,17 +1,32 @@
 """API endpoints for Statistics."""
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db
-from app.services import property_service
+from app.core import cache
+from app.core.deps import get_analytics_db, get_db
+from app.services import analytics_snapshot, property_service
+from app.services.geocoder import geocoder
 
 router = APIRouter(prefix="/stats", tags=["Statistics"])
 
 
 @router.get("")
-def get_stats(db: Session = Depends(get_db)):
+def get_stats(request: Request, db: Session = Depends(get_analytics_db)):
     """Get aggregate statistics for the platform."""
-    property_stats = property_service.get_property_stats(db)
-    return {
-        "properties": property_stats,
-    }
+    return cache.cached_response(request, [cache.PROPERTIES], lambda: {
+        "properties": property_service.get_property_stats(db),
+    })
+
+
+@router.get("/geocoder")
+def get_geocoder_stats():
+    """Geocoding cache hit/miss counters of this worker process."""
+    return geocoder.stats()
+
+
+@router.get("/analytics-snapshot")
+def get_analytics_snapshot_stats(db: Session = Depends(get_db)):
+    """Rows, refresh counters and memory use of this worker's analytics snapshot."""
+    if analytics_snapshot.enabled():
+        analytics_snapshot.snapshot.get(db)
+    return analytics_snapshot.snapshot.stats()
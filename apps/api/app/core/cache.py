@@ -0,0 +1,350 @@
+"""Response cache for read-heavy public endpoints.
+
+Entries are tagged by the data they depend on ("properties", "districts",
+"complexes", "settings"); writers call ``invalidate(tag)`` after commit.
+Backends: in-process LRU with TTL (default) or Redis, shared by all workers.
+Every cached response carries ETag / Last-Modified so nginx and browsers can
+revalidate with 304 Not Modified.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+import orjson
+import structlog
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.db_router import track_reads
+
+try:
+    import redis
+except ImportError:
+    redis = None  # type: ignore
+
+logger = structlog.get_logger()
+
+# Tags
+PROPERTIES = "properties"
+DISTRICTS = "districts"
+COMPLEXES = "complexes"
+SETTINGS = "settings"
+
+
+@dataclass
+class CacheEntry:
+    """Serialized response body with validators."""
+    body: bytes
+    etag: str
+    last_modified: float  # unix time
+
+    def dumps(self) -> bytes:
+        return orjson.dumps({
+            "body": self.body.decode("utf-8"),
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+        })
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "CacheEntry":
+        data = orjson.loads(raw)
+        return cls(data["body"].encode("utf-8"), data["etag"], data["last_modified"])
+
+
+class LocalCache:
+    """Thread-safe in-process LRU cache with TTL and tag invalidation."""
+
+    def __init__(self, max_entries: int = 1024, ttl: int = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (expires_at, entry, tags)
+        self._entries: "OrderedDict[str, tuple[float, CacheEntry, tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._invalidated: Dict[str, float] = {}  # tag -> unix time
+        self._lock = threading.Lock()
+
+    def _drop(self, key: str) -> None:
+        """Remove an entry and its tag memberships (caller holds the lock)."""
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        for tag in item[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, entry, _ = item
+            if expires_at < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry, tags: Iterable[str], ttl: Optional[int] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._drop(key)
+            if ttl <= 0:
+                return
+            tags = tuple(tags)
+            self._entries[key] = (time.monotonic() + ttl, entry, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_tags(self, *tags: str) -> None:
+        now = time.time()
+        with self._lock:
+            for tag in tags:
+                self._invalidated[tag] = now
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+
+    def invalidated_at(self, tags: Iterable[str]) -> float:
+        """Unix time of the latest invalidation of any of the tags (0 if none)."""
+        with self._lock:
+            return max((self._invalidated.get(tag, 0.0) for tag in tags), default=0.0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+
+class RedisCache:
+    """Redis-backed cache shared between workers.
+
+    Tags are Redis sets of cache keys. Any object with the redis-py
+    get/set/sadd/smembers/delete/expire/scan_iter methods can be passed as
+    ``client`` (tests use an in-memory fake).
+    """
+
+    def __init__(self, client: Any, ttl: int = 300, prefix: str = "estate:cache:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}k:{key}"
+
+    def _tag(self, tag: str) -> str:
+        return f"{self.prefix}t:{tag}"
+
+    def _epoch(self, tag: str) -> str:
+        return f"{self.prefix}e:{tag}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raw = self.client.get(self._key(key))
+        return CacheEntry.loads(raw) if raw else None
+
+    def set(self, key: str, entry: CacheEntry, tags: Iterable[str], ttl: Optional[int] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            # Redis rejects non-positive expiry times: nothing to keep
+            self.client.delete(self._key(key))
+            return
+        self.client.set(self._key(key), entry.dumps(), ex=ttl)
+        for tag in tags:
+            self.client.sadd(self._tag(tag), self._key(key))
+            self.client.expire(self._tag(tag), ttl)
+
+    def invalidate_tags(self, *tags: str) -> None:
+        for tag in tags:
+            # Shared by all workers, so entries built elsewhere see it too
+            window = max(math.ceil(settings.DB_REPLICA_STICKY_SECONDS), 1)
+            self.client.set(self._epoch(tag), str(time.time()), ex=window)
+            keys = list(self.client.smembers(self._tag(tag)))
+            self.client.delete(*keys, self._tag(tag))
+
+    def invalidated_at(self, tags: Iterable[str]) -> float:
+        """Unix time of the latest recent invalidation of any of the tags (0 if none)."""
+        values = [self.client.get(self._epoch(tag)) for tag in tags]
+        return max((float(value) for value in values if value), default=0.0)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class NullCache:
+    """Disabled cache: always misses (ETag/304 still work)."""
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return None
+
+    def set(self, key: str, entry: CacheEntry, tags: Iterable[str], ttl: Optional[int] = None) -> None:
+        pass
+
+    def invalidate_tags(self, *tags: str) -> None:
+        pass
+
+    def invalidated_at(self, tags: Iterable[str]) -> float:
+        return 0.0
+
+    def clear(self) -> None:
+        pass
+
+
+def _create_cache():
+    if settings.CACHE_BACKEND == "none":
+        return NullCache()
+    if settings.CACHE_BACKEND == "redis":
+        if redis is None:
+            logger.warning("cache_redis_unavailable", reason="redis package not installed")
+        else:
+            client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.5)
+            return RedisCache(client, ttl=settings.CACHE_TTL_SECONDS)
+    return LocalCache(max_entries=settings.CACHE_MAX_ENTRIES, ttl=settings.CACHE_TTL_SECONDS)
+
+
+cache = _create_cache()
+
+# In-process derived data (e.g. analytics snapshot) to mark stale, by tag
+_listeners: Dict[str, List[Callable[[], None]]] = {}
+
+
+def on_invalidate(tag: str, callback: Callable[[], None]) -> None:
+    """Call ``callback`` whenever ``tag`` is invalidated in this process."""
+    _listeners.setdefault(tag, []).append(callback)
+
+
+def invalidate(*tags: str) -> None:
+    """Drop all cached responses depending on any of the tags."""
+    try:
+        cache.invalidate_tags(*tags)
+    except Exception as e:
+        logger.warning("cache_invalidate_failed", tags=tags, error=str(e))
+    for tag in tags:
+        for callback in _listeners.get(tag, ()):
+            callback()
+
+
+def _cache_key(request: Request) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def _is_not_modified(request: Request, entry: CacheEntry) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return entry.etag in {tag.strip() for tag in if_none_match.split(",")} or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(entry.last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _encode(payload: Any) -> bytes:
+    if settings.FAST_JSON_READS:
+        # Plain dicts/lists/datetimes are encoded natively; jsonable_encoder
+        # only sees what orjson cannot handle (Pydantic models, Decimal...)
+        return orjson.dumps(payload, default=jsonable_encoder, option=orjson.OPT_SERIALIZE_NUMPY)
+    return orjson.dumps(jsonable_encoder(payload))
+
+
+def _get(key: str) -> Optional[CacheEntry]:
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.warning("cache_get_failed", key=key, error=str(e))
+        return None
+
+
+def _replica_ttl(tags: Iterable[str], ttl: Optional[int]) -> Optional[int]:
+    """TTL for an entry read from a replica, which may lag behind the last invalidation."""
+    window = settings.DB_REPLICA_STICKY_SECONDS
+    try:
+        elapsed = time.time() - cache.invalidated_at(tags)
+    except Exception as e:
+        logger.warning("cache_epoch_failed", tags=list(tags), error=str(e))
+        elapsed = 0.0
+    if elapsed >= window:
+        return ttl
+    remaining = max(math.ceil(window - elapsed), 1)
+    return remaining if ttl is None else min(ttl, remaining)
+
+
+def _store(key: str, payload: Any, tags: Iterable[str], ttl: Optional[int]) -> CacheEntry:
+    body = _encode(payload)
+    entry = CacheEntry(
+        body=body,
+        etag=f'W/"{hashlib.sha1(body).hexdigest()}"',
+        last_modified=time.time(),
+    )
+    try:
+        cache.set(key, entry, tags, ttl)
+    except Exception as e:
+        logger.warning("cache_set_failed", key=key, error=str(e))
+    return entry
+
+
+def _respond(request: Request, entry: CacheEntry) -> Response:
+    headers = {
+        "ETag": entry.etag,
+        "Last-Modified": formatdate(entry.last_modified, usegmt=True),
+        "Cache-Control": "public, max-age=0, must-revalidate",
+    }
+    if _is_not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def cached_response(
+    request: Request,
+    tags: Iterable[str],
+    build: Callable[[], Any],
+    ttl: Optional[int] = None,
+) -> Response:
+    """Serve a JSON response from cache, building and storing it on miss.
+
+    Args:
+        request: Incoming request; path + sorted query string form the key.
+        tags: Data the response depends on, used for invalidation.
+        build: Produces the JSON-serializable payload on cache miss.
+        ttl: Override of CACHE_TTL_SECONDS.
+
+    Entries built on a replica within DB_REPLICA_STICKY_SECONDS of an
+    invalidation may predate the write behind it; they expire once that
+    window has passed instead of staying for the full TTL.
+    """
+    key = _cache_key(request)
+    entry = _get(key)
+    if entry is None:
+        with track_reads() as reads:
+            payload = build()
+        if reads.replica:
+            ttl = _replica_ttl(tags, ttl)
+        entry = _store(key, payload, tags, ttl)
+    return _respond(request, entry)
+
+
+async def cached_response_async(
+    request: Request,
+    tags: Iterable[str],
+    build: Callable[[], Awaitable[Any]],
+    ttl: Optional[int] = None,
+) -> Response:
+    """cached_response for async handlers: ``build`` is awaited on miss."""
+    key = _cache_key(request)
+    entry = _get(key)
+    if entry is None:
+        entry = _store(key, await build(), tags, ttl)
+    return _respond(request, entry)
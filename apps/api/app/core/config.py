@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import List, Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -25,6 +25,45 @@ class Settings(BaseSettings):
     S3_REGION: str = "ru-central1"
     S3_ENDPOINT_URL: str = "https://storage.yandexcloud.net"
 
+    # Response cache for public analytics endpoints
+    CACHE_BACKEND: Literal["memory", "redis", "none"] = "memory"
+    CACHE_TTL_SECONDS: int = 300
+    CACHE_MAX_ENTRIES: int = 1024
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Background parse jobs (/parse/jobs)
+    PARSE_WORKERS: int = 2  # 0 disables the in-process worker pool
+    PARSE_JOB_POLL_SECONDS: float = 5.0
+    PARSE_JOB_STALE_SECONDS: int = 300  # Running jobs without heartbeat are resumed
+    ENRICHMENT_POLL_SECONDS: float = 30.0  # Pending properties saved elsewhere or due for a retry
+
+    # Geocoding: "auto" uses 2GIS when DGIS_API_KEY is set, Photon (OSM) otherwise
+    GEOCODER_PROVIDER: Literal["auto", "2gis", "photon", "none"] = "auto"
+    GEOCODER_NEGATIVE_TTL_HOURS: int = 24
+    GEOCODER_TIMEOUT_SECONDS: float = 5.0
+
+    # Analytics aggregations: "snapshot" (in-memory NumPy columns) or "sql"
+    ANALYTICS_BACKEND: Literal["snapshot", "sql"] = "snapshot"
+    ANALYTICS_SNAPSHOT_REFRESH_SECONDS: float = 10.0  # Changes from other workers show up within this
+
+    # Database connection pool (PostgreSQL; SQLite keeps SQLAlchemy defaults)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0  # Wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 0 disables
+    DB_ANALYTICS_STATEMENT_TIMEOUT_MS: int = 5000  # Heavy aggregation endpoints
+    DB_PGBOUNCER: bool = False  # Behind PgBouncer in transaction pooling mode
+
+    # Read replicas for read-only endpoints, comma-separated database URLs
+    DB_REPLICA_URLS: str = ""
+    DB_REPLICA_STICKY_SECONDS: float = 10.0  # Clients read from the primary this long after a write
+    DB_REPLICA_RETRY_SECONDS: float = 30.0  # Failed replicas are skipped this long
+
+    # Read endpoints encode plain rows with orjson instead of validating Pydantic models
+    FAST_JSON_READS: bool = True
+
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="ignore")
 
     @property
@@ -34,5 +73,15 @@ class Settings(BaseSettings):
             return "sqlite:///./estate_analytics_dev.db"
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        # Same database through the asyncio drivers (aiosqlite / asyncpg)
+        uri = self.SQLALCHEMY_DATABASE_URI
+        return uri.replace("sqlite://", "sqlite+aiosqlite://", 1).replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    @property
+    def SQLALCHEMY_REPLICA_URIS(self) -> List[str]:
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+
 
 settings = Settings()
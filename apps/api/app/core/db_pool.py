@@ -0,0 +1,206 @@
+"""Connection pool configuration, pool metrics and statement timeouts.
+
+``engine_options(url)`` turns the DB_* settings into create_engine /
+create_async_engine arguments. On PostgreSQL the pool is a QueuePool that
+records how long checkouts wait; with DB_PGBOUNCER (transaction pooling)
+PgBouncer owns the pool, so connections are not kept (NullPool), asyncpg
+prepared statement caches are off and the statement timeout is set per
+transaction instead of per connection. SQLite keeps SQLAlchemy defaults.
+
+``statement_timeout(db, ms)`` lowers the timeout for one session, e.g. for
+heavy analytics endpoints (``deps.get_analytics_db``).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from app.core.config import settings
+
+# PostgreSQL SQLSTATE query_canceled (statement_timeout)
+QUERY_CANCELED = "57014"
+
+
+class PoolMetrics:
+    """Checkout counters of one pool, updated from any thread."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checked_out = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_checkout(self, seconds: float) -> None:
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checked_out -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checked_out": self.checked_out,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_seconds * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class _TimedCheckout:
+    """Pool mixin: time every checkout (queue wait or new connection)."""
+
+    def __init__(self, *args: Any, **kw: Any) -> None:
+        super().__init__(*args, **kw)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started)
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        self.metrics.record_checkin()
+        super()._do_return_conn(record)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(_TimedCheckout, NullPool):
+    pass
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Keyword arguments for create_engine / create_async_engine of ``url``."""
+    parsed = make_url(url)
+    is_async = parsed.get_dialect().is_async
+    if parsed.get_backend_name() == "sqlite":
+        return {} if is_async else {"connect_args": {"check_same_thread": False}}
+
+    connect_args: Dict[str, Any] = {}
+    if settings.DB_PGBOUNCER:
+        # Server connections are shared between clients: no prepared statements
+        if is_async:
+            connect_args.update(statement_cache_size=0, prepared_statement_cache_size=0)
+        return {"poolclass": TimedNullPool, "connect_args": connect_args}
+
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    if timeout_ms > 0:
+        if is_async:
+            connect_args["server_settings"] = {"statement_timeout": str(timeout_ms)}
+        else:
+            connect_args["options"] = f"-c statement_timeout={timeout_ms}"
+    return {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+def configure_engine(engine: Engine) -> Engine:
+    """Per-transaction statement timeout where it cannot be a connect option."""
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    if settings.DB_PGBOUNCER and timeout_ms > 0 and engine.dialect.name == "postgresql":
+        # PgBouncer rejects the "options" startup parameter and shares
+        # server sessions, so only SET LOCAL is safe
+        @event.listens_for(engine, "begin")
+        def set_statement_timeout(conn: Connection) -> None:
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+    return engine
+
+
+def pool_stats(pool: Pool) -> Dict[str, Any]:
+    """Occupancy and checkout wait times of ``pool`` (no connection is made)."""
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    metrics: Optional[PoolMetrics] = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.stats())
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            # Negative while fewer than pool_size connections exist
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    return stats
+
+
+@contextmanager
+def statement_timeout(db: Session, ms: int) -> Iterator[Session]:
+    """Cancel statements of ``db`` that run longer than ``ms`` (0 disables).
+
+    Applied lazily when the session begins its transaction, so cached
+    responses never check out a connection. PostgreSQL uses SET LOCAL (per
+    statement, reset at the end of the transaction); SQLite interrupts
+    statements once ``ms`` have passed since the transaction began.
+    """
+    if ms <= 0:
+        yield db
+        return
+
+    interrupted = []
+
+    def apply(connection: Connection) -> None:
+        if connection.dialect.name == "postgresql":
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(ms)}")
+        elif connection.dialect.name == "sqlite":
+            raw = connection.connection.dbapi_connection
+            deadline = time.monotonic() + ms / 1000
+            raw.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+            interrupted.append(raw)
+
+    def after_begin(session: Session, transaction, connection: Connection) -> None:
+        apply(connection)
+
+    if db.in_transaction():
+        apply(db.connection())
+    event.listen(db, "after_begin", after_begin)
+    try:
+        yield db
+    finally:
+        event.remove(db, "after_begin", after_begin)
+        for raw in interrupted:
+            raw.set_progress_handler(None, 0)
+
+
+def is_statement_timeout(exc: DBAPIError) -> bool:
+    """Whether ``exc`` was raised by a statement timeout."""
+    orig = exc.orig
+    if getattr(orig, "pgcode", None) == QUERY_CANCELED or getattr(orig, "sqlstate", None) == QUERY_CANCELED:
+        return True
+    return type(orig).__name__ == "OperationalError" and str(orig) == "interrupted"
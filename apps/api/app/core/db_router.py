@@ -0,0 +1,162 @@
+"""Read-replica routing for read-only sessions.
+
+``ReplicaRouter`` hands out replica connections round-robin. A replica whose
+connection fails (or whose pool is exhausted) is skipped for
+DB_REPLICA_RETRY_SECONDS; with no healthy replica, reads go to the primary.
+``ReplicaSession`` connects on the first query and keeps that connection, so
+cached responses never touch a pool and a replica costs a single checkout.
+
+Read-your-writes: successful write requests get an ``X-DB-Primary-Until``
+response header (``StickyPrimaryMiddleware``); clients echo it back on their
+requests and stay on the primary until replication has caught up
+(DB_REPLICA_STICKY_SECONDS). Admin-authenticated requests always read from the
+primary. ``track_reads`` tells the response cache whether an entry was built
+on a replica, so it can expire entries that may predate a recent write.
+"""
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import structlog
+from fastapi import Request
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.db_pool import pool_stats
+
+logger = structlog.get_logger()
+
+STICKY_HEADER = "X-DB-Primary-Until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+
+@dataclass
+class ReadTracker:
+    """Whether statements inside ``track_reads`` ran on a replica."""
+    replica: bool = False
+
+
+_read_tracker: ContextVar[Optional[ReadTracker]] = ContextVar("read_tracker", default=None)
+
+
+@contextmanager
+def track_reads() -> Iterator[ReadTracker]:
+    """Record whether read sessions used in the block query a replica."""
+    tracker = ReadTracker()
+    token = _read_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _read_tracker.reset(token)
+
+
+class ReplicaRouter:
+    """Choose the connection for read-only sessions."""
+
+    def __init__(self, primary: Engine, replicas: List[Engine], retry_seconds: float = 30.0):
+        self.primary = primary
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self._next = itertools.cycle(range(len(replicas))) if replicas else None
+        self._down_until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def connect(self) -> Union[Connection, Engine]:
+        """Connection to the next healthy replica, or the primary engine when none is available."""
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                index = next(self._next)
+                if self._down_until.get(index, 0) > time.monotonic():
+                    continue
+            try:
+                connection = self.replicas[index].connect()
+            except (DBAPIError, PoolTimeoutError) as e:
+                self.mark_down(index, e)
+                continue
+            with self._lock:
+                self._down_until.pop(index, None)
+            return connection
+        return self.primary
+
+    def mark_down(self, index: int, error: Optional[Exception] = None) -> None:
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_seconds
+        logger.warning("db_replica_down", replica=index, error=str(error), retry_seconds=self.retry_seconds)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            down = dict(self._down_until)
+        return [
+            {"replica": index, "up": down.get(index, 0) <= now, **pool_stats(replica.pool)}
+            for index, replica in enumerate(self.replicas)
+        ]
+
+
+class ReplicaSession(Session):
+    """Session bound to a replica connection (or the primary) chosen on first use."""
+
+    def __init__(self, router: ReplicaRouter, use_primary: bool = False, **kw: Any):
+        super().__init__(**kw)
+        self._router = router
+        self._use_primary = use_primary
+        self._read_bind: Optional[Union[Connection, Engine]] = None
+
+    def get_bind(self, *args: Any, **kw: Any) -> Union[Connection, Engine]:
+        if self._read_bind is None:
+            self._read_bind = self._router.primary if self._use_primary else self._router.connect()
+        if isinstance(self._read_bind, Connection):
+            tracker = _read_tracker.get()
+            if tracker is not None:
+                tracker.replica = True
+        return self._read_bind
+
+    def close(self) -> None:
+        super().close()
+        if isinstance(self._read_bind, Connection):
+            self._read_bind.close()
+        self._read_bind = None
+
+
+def is_sticky(request: Request) -> bool:
+    """Whether this request must read from the primary.
+
+    True for admins (who make every write) and for clients echoing a
+    ``X-DB-Primary-Until`` time that has not passed yet.
+    """
+    if "authorization" in request.headers:
+        return True
+    value = request.headers.get(STICKY_HEADER)
+    try:
+        return value is not None and float(value) > time.time()
+    except ValueError:
+        return False
+
+
+class StickyPrimaryMiddleware:
+    """Tell clients that just wrote how long to read from the primary."""
+
+    def __init__(self, app: ASGIApp, sticky_seconds: Optional[float] = None):
+        self.app = app
+        self.sticky_seconds = settings.DB_REPLICA_STICKY_SECONDS if sticky_seconds is None else sticky_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_header(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message)[STICKY_HEADER] = f"{time.time() + self.sticky_seconds:.0f}"
+            await send(message)
+
+        await self.app(scope, receive, send_with_header)
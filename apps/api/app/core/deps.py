@@ -1,16 +1,42 @@
-"""Database session dependency."""
-from typing import Generator
+"""Database session dependencies.
+
+``get_db`` yields a sync Session (write endpoints, services, scripts);
+``get_async_db`` yields an AsyncSession on the asyncio driver of the same
+database (aiosqlite locally, asyncpg on PostgreSQL) for read endpoints that
+run on the event loop. ``get_read_db`` yields a read-only Session on a
+replica (DB_REPLICA_URLS) unless the client has just written;
+``get_analytics_db`` adds the shorter DB_ANALYTICS_STATEMENT_TIMEOUT_MS to
+it for heavy aggregation endpoints.
+"""
+from typing import AsyncGenerator, Generator
+from fastapi import Depends, Request
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
+from app.core.db_pool import configure_engine, engine_options, statement_timeout
+from app.core.db_router import ReplicaRouter, ReplicaSession, is_sticky
 
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.SQLALCHEMY_DATABASE_URI else {}
+engine = configure_engine(
+    create_engine(settings.SQLALCHEMY_DATABASE_URI, **engine_options(settings.SQLALCHEMY_DATABASE_URI))
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+replica_router = ReplicaRouter(
+    engine,
+    [configure_engine(create_engine(url, **engine_options(url))) for url in settings.SQLALCHEMY_REPLICA_URIS],
+    retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+)
+
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI, **engine_options(settings.SQLALCHEMY_ASYNC_DATABASE_URI)
+)
+configure_engine(async_engine.sync_engine)
+
+# Objects stay readable after commit: lazy refresh would need a greenlet
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db() -> Generator[Session, None, None]:
     """Dependency for getting database session."""
@@ -19,3 +45,24 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """Dependency for a read-only database session (replica when configured)."""
+    db = ReplicaSession(replica_router, use_primary=is_sticky(request), autoflush=False)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_analytics_db(db: Session = Depends(get_read_db)) -> Generator[Session, None, None]:
+    """Dependency for a database session with the analytics statement timeout."""
+    with statement_timeout(db, settings.DB_ANALYTICS_STATEMENT_TIMEOUT_MS):
+        yield db
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for getting an asyncio database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
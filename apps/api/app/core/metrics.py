@@ -0,0 +1,134 @@
+"""Prometheus metrics for HTTP requests and the database.
+
+``MetricMiddleware`` (app.core.middleware) records per-route latency, status
+codes and requests in flight; SQLAlchemy cursor events count the queries and
+database time of the current request through a context variable, which
+FastAPI copies into the threadpool running sync endpoints. Routes are
+labelled by their path template ("/api/v1/properties/{property_id}").
+
+Served at GET /metrics. With several worker processes set
+PROMETHEUS_MULTIPROC_DIR so every worker writes to (and /metrics reads) the
+same directory. Without prometheus-client, requests are still logged but
+nothing is exported.
+"""
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None  # type: ignore
+
+# Requests without a matching route share one label value
+UNMATCHED = "<unmatched>"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+@dataclass
+class RequestDbStats:
+    """Queries run while serving one request."""
+    queries: int = 0
+    seconds: float = 0.0
+
+
+_request_db: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db", default=None)
+
+
+def track_db() -> Tuple[RequestDbStats, object]:
+    """Start counting queries for the current request; pass the token to ``untrack_db``."""
+    stats = RequestDbStats()
+    return stats, _request_db.set(stats)
+
+
+def untrack_db(token) -> None:
+    _request_db.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_db.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats = _request_db.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # Failed statements never reach after_cursor_execute
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+if prometheus_client is not None:
+    REGISTRY = CollectorRegistry(auto_describe=True)
+
+    REQUESTS = Counter(
+        "http_requests_total", "HTTP requests by route and status code.",
+        ["method", "route", "status"], registry=REGISTRY,
+    )
+    LATENCY = Histogram(
+        "http_request_duration_seconds", "HTTP request latency until the last body chunk.",
+        ["method", "route"], buckets=LATENCY_BUCKETS, registry=REGISTRY,
+    )
+    IN_PROGRESS = Gauge(
+        "http_requests_in_progress", "HTTP requests being served.",
+        ["method"], registry=REGISTRY, multiprocess_mode="livesum",
+    )
+    DB_QUERIES = Histogram(
+        "http_request_db_queries", "Database queries per HTTP request.",
+        ["method", "route"], buckets=QUERY_BUCKETS, registry=REGISTRY,
+    )
+    DB_SECONDS = Histogram(
+        "http_request_db_seconds", "Database time per HTTP request.",
+        ["method", "route"], buckets=LATENCY_BUCKETS, registry=REGISTRY,
+    )
+
+
+def enabled() -> bool:
+    return prometheus_client is not None
+
+
+def request_started(method: str) -> None:
+    if prometheus_client is not None:
+        IN_PROGRESS.labels(method).inc()
+
+
+def request_finished(method: str, route: str, status: int, seconds: float, db: RequestDbStats) -> None:
+    if prometheus_client is None:
+        return
+    IN_PROGRESS.labels(method).dec()
+    REQUESTS.labels(method, route, str(status)).inc()
+    LATENCY.labels(method, route).observe(seconds)
+    DB_QUERIES.labels(method, route).observe(db.queries)
+    DB_SECONDS.labels(method, route).observe(db.seconds)
+
+
+def render() -> Tuple[bytes, str]:
+    """Exposition body and content type for GET /metrics."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
@@ -2,44 +2,66 @@ import time
 import uuid
 
 import structlog
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
 
 logger = structlog.get_logger()
 
-class MetricMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request_id = request.headers.get("X-Request-Id") or str(uuid.uuid4())
+
+class MetricMiddleware:
+    """Request id, access log and Prometheus metrics (pure ASGI, streaming-safe)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or str(uuid.uuid4())
         structlog.contextvars.clear_contextvars()
         structlog.contextvars.bind_contextvars(request_id=request_id)
-        
-        print(f"[DEBUG] Request: {request.method} {request.url.path}")  # DEBUG
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-Id"] = request_id
+            await send(message)
+
+        db, token = metrics.track_db()
+        metrics.request_started(method)
         start_time = time.perf_counter()
-        
         try:
-            response = await call_next(request)
-            process_time = time.perf_counter() - start_time
-            print(f"[DEBUG] Response: {response.status_code}")  # DEBUG
-            
-            logger.info(
-                "request_completed",
-                method=request.method,
-                path=request.url.path,
-                status_code=response.status_code,
-                latency_ms=round(process_time * 1000, 2)
-            )
-            response.headers["X-Request-Id"] = request_id
-            return response
+            await self.app(scope, receive, send_with_request_id)
         except Exception as e:
-            import traceback
-            print(f"[DEBUG] Exception: {e}")  # DEBUG
-            print(traceback.format_exc())  # DEBUG
-            process_time = time.perf_counter() - start_time
             logger.error(
                 "request_failed",
-                error=str(e),
-                method=request.method,
-                path=request.url.path,
-                latency_ms=round(process_time * 1000, 2)
+                error=repr(e),
+                method=method,
+                path=scope["path"],
+                latency_ms=round((time.perf_counter() - start_time) * 1000, 2),
             )
-            raise e
+            raise
+        finally:
+            process_time = time.perf_counter() - start_time
+            metrics.untrack_db(token)
+            # FastAPI stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", None) or metrics.UNMATCHED
+            metrics.request_finished(method, route, status_code, process_time, db)
+
+        logger.info(
+            "request_completed",
+            method=method,
+            path=scope["path"],
+            route=route,
+            status_code=status_code,
+            latency_ms=round(process_time * 1000, 2),
+            db_queries=db.queries,
+            db_ms=round(db.seconds * 1000, 2),
+        )
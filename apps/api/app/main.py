@@ -1,13 +1,18 @@
 from contextlib import asynccontextmanager
 
 import structlog
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import ORJSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 import os
+import time
 from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
 
 from app.api.v1.router import api_router
+from app.core import metrics
 from app.core.config import settings
 from app.core.logging import setup_logging
 from app.core.middleware import MetricMiddleware
@@ -16,17 +21,31 @@ setup_logging()
 logger = structlog.get_logger()
 
 from app.core.db import Base
-from app.core.deps import engine
+from app.core.db_pool import is_statement_timeout, pool_stats
+from app.core.db_router import STICKY_HEADER, StickyPrimaryMiddleware
+from app.core.deps import engine, async_engine, get_db, replica_router, SessionLocal
+from app.services import parse_job_service, enrichment_service, district_stats_service
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Создаём таблицы БД автоматически
     Base.metadata.create_all(bind=engine)
+    # Районная аналитика строится один раз после деплоя, GET только читает
+    with SessionLocal() as db:
+        district_stats_service.build_if_empty(db)
     
     # Startup: Initialize resources (DB pools, Redis)
     logger.info("startup", app_name=settings.PROJECT_NAME)
+    # Фоновые задания парсинга (незавершённые продолжаются с последней страницы)
+    if settings.PARSE_WORKERS > 0:
+        parse_job_service.pool.start()
+    # Геокодирование и расстояния для сохранённых объектов
+    enrichment_service.worker.start()
     yield
     # Shutdown: Close resources
+    await parse_job_service.pool.stop()
+    enrichment_service.worker.stop()
+    await async_engine.dispose()
     logger.info("shutdown")
 
 app = FastAPI(
@@ -34,10 +53,13 @@ app = FastAPI(
     version=settings.VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse if settings.FAST_JSON_READS else JSONResponse,
     # debug=settings.ENVIRONMENT == "local", # Optional, removed for cleanliness
 )
 
 app.add_middleware(MetricMiddleware)
+if replica_router.replicas:
+    app.add_middleware(StickyPrimaryMiddleware)
 
 from fastapi.middleware.cors import CORSMiddleware
 app.add_middleware(
@@ -55,6 +77,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[STICKY_HEADER],  # Клиент возвращает его, чтобы читать с primary после записи
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -63,6 +86,39 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 async def health_check():
     return {"status": "ok", "app": settings.PROJECT_NAME}
 
+@app.get("/healthz/db", tags=["Health"])
+def db_health_check(db: Session = Depends(get_db)):
+    """Проверка БД (SELECT 1) и состояние пулов соединений"""
+    pools = {
+        "sync": pool_stats(engine.pool),
+        "async": pool_stats(async_engine.pool),
+        "replicas": replica_router.stats(),
+    }
+    started = time.perf_counter()
+    try:
+        db.execute(text("SELECT 1"))
+    except OperationalError as e:
+        logger.error("db_health_failed", error=str(e))
+        return JSONResponse(status_code=503, content={"status": "unavailable", "pools": pools})
+    latency_ms = round((time.perf_counter() - started) * 1000, 2)
+    return {"status": "ok", "latency_ms": latency_ms, "pools": pools}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Метрики Prometheus: запросы по маршрутам, задержки, запросы к БД"""
+    if not metrics.enabled():
+        return JSONResponse(status_code=501, content={"detail": "prometheus-client is not installed"})
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+@app.exception_handler(OperationalError)
+async def statement_timeout_handler(request: Request, exc: OperationalError):
+    # Отменённый по statement_timeout запрос — 503, остальные ошибки как раньше
+    if not is_statement_timeout(exc):
+        raise exc
+    logger.warning("statement_timeout", path=request.url.path)
+    return JSONResponse(status_code=503, content={"detail": "Query timed out"}, headers={"Retry-After": "5"})
+
 # Монтируем папку uploads для раздачи статики
 # Теперь используем локальную папку API, так как на Render нет доступа к 'apps/web'
 upload_dir = Path("uploads")
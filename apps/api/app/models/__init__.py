@@ -7,3 +7,6 @@ from .district import District
 from .complex import Complex
 from .site_settings import SiteSettings
 from .user import User
+from .district_stats import DistrictStats
+from .parse_job import ParseJob
+from .geocode_cache import GeocodeCache
@@ -0,0 +1,43 @@
+"""
+Материализованная аналитика по районам (DistrictStats).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Float, DateTime
+
+from app.core.db import Base
+
+
+class DistrictStats(Base):
+    """
+    Предрассчитанная статистика активных объектов по району.
+    
+    Обновляется инкрементально при записи объектов в property_service
+    (пересчитываются только затронутые районы) или целиком по расписанию.
+    
+    Атрибуты:
+        district: Ключ района (последняя часть адреса после запятой)
+        count: Количество объектов
+        avg_price / min_price / max_price / median_price: Статистика цен
+        avg_price_per_sqm: Средняя цена за м²
+        avg_area: Средняя площадь
+        center_lat / center_lng: Центр масс объектов района
+        updated_at: Время последнего пересчёта
+    """
+    __tablename__ = "district_stats"
+
+    district = Column(String(200), primary_key=True)
+    
+    count = Column(Integer, nullable=False, default=0, index=True)
+    avg_price = Column(Float, nullable=True)
+    min_price = Column(Float, nullable=True)
+    max_price = Column(Float, nullable=True)
+    median_price = Column(Float, nullable=True)
+    avg_price_per_sqm = Column(Float, nullable=True)
+    avg_area = Column(Float, nullable=True)
+    
+    center_lat = Column(Float, nullable=True)
+    center_lng = Column(Float, nullable=True)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
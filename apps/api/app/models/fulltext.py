@@ -0,0 +1,69 @@
+"""Полнотекстовый индекс объявлений (title, address, description).
+
+PostgreSQL: генерируемая колонка ``search_vector tsvector`` (конфигурация
+russian, веса A/B/C для title/address/description) с GIN-индексом.
+
+SQLite: FTS5-таблица ``properties_fts`` с внешним содержимым (content=
+properties), синхронизируется триггерами. Стемминга для русского в FTS5
+нет, поэтому ``search_service`` ищет по префиксам слов. VACUUM может
+изменить rowid — после него нужен ``REBUILD_FTS``.
+
+Обе структуры создаются DDL при create_all и миграцией; в ORM не объявлены.
+"""
+from sqlalchemy import DDL, Table, event
+
+SEARCH_VECTOR_COLUMN = "search_vector"
+# Порядок колонок FTS5 (важен для весов bm25)
+FTS_COLUMNS = ("title", "address", "description")
+
+_PG_STATEMENTS = (
+    "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(address, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'C')"
+    ") STORED",
+    "CREATE INDEX IF NOT EXISTS idx_{table}_search_vector ON {table} USING GIN (search_vector)",
+)
+
+_SQLITE_STATEMENTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5("
+    "title, address, description, content='{table}', content_rowid='rowid', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {table}_fts(rowid, title, address, description) "
+    "VALUES (new.rowid, new.title, new.address, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {table}_fts({table}_fts, rowid, title, address, description) "
+    "VALUES ('delete', old.rowid, old.title, old.address, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE OF title, address, description ON {table} BEGIN "
+    "INSERT INTO {table}_fts({table}_fts, rowid, title, address, description) "
+    "VALUES ('delete', old.rowid, old.title, old.address, old.description); "
+    "INSERT INTO {table}_fts(rowid, title, address, description) "
+    "VALUES (new.rowid, new.title, new.address, new.description); "
+    "END",
+)
+
+REBUILD_FTS = "INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"
+
+
+def postgres_sql(table: str) -> list:
+    return [statement.format(table=table) for statement in _PG_STATEMENTS]
+
+
+def sqlite_sql(table: str) -> list:
+    return [statement.format(table=table) for statement in _SQLITE_STATEMENTS]
+
+
+def add_fulltext_index(table: Table) -> None:
+    """Создавать search_vector/GIN (PostgreSQL) или FTS5 (SQLite) при create_all."""
+    for statement in postgres_sql(table.name):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in sqlite_sql(table.name):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(
+        table,
+        "after_drop",
+        DDL(f"DROP TABLE IF EXISTS {table.name}_fts").execute_if(dialect="sqlite"),
+    )
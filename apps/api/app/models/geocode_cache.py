@@ -0,0 +1,39 @@
+"""
+Постоянный кэш геокодирования (GeocodeCache).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, String, Float, DateTime
+
+from app.core.db import Base
+
+
+class GeocodeCache(Base):
+    """
+    Результат геокодирования адреса.
+    
+    Ключ — нормализованный адрес (см. app.services.geocoder.normalize_address),
+    поэтому "ул. Навагинская, 9" и "Навагинская улица 9" дают одну запись.
+    Отрицательные результаты (адрес не найден) хранятся с пустыми координатами
+    до expires_at, чтобы не повторять запросы к провайдеру.
+    
+    Атрибуты:
+        normalized: Нормализованный адрес (первичный ключ)
+        address: Исходный адрес первого запроса
+        latitude / longitude: Координаты (NULL — адрес не найден)
+        provider: Источник ("seed", "2gis", "photon")
+        created_at: Время записи
+        expires_at: Срок жизни отрицательного результата
+    """
+    __tablename__ = "geocode_cache"
+
+    normalized = Column(String(500), primary_key=True)
+    address = Column(String(500), nullable=False)
+    
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    provider = Column(String(20), nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=True)
@@ -0,0 +1,103 @@
+"""Пространственные индексы для таблиц с latitude/longitude.
+
+PostgreSQL: ``geog geography(Point, 4326)`` — генерируемая (STORED) колонка с
+GiST-индексом, её вычисляет сама БД из latitude/longitude. В ORM она не
+объявлена: на SQLite её нет, а запросы к ней строит ``GeoService``.
+
+SQLite (тесты, локальная разработка): R-tree ``properties_rtree`` по rowid
+объектов, поддерживается триггерами, и функция ``haversine_m(lat1, lon1,
+lat2, lon2)``, регистрируемая при каждом подключении. VACUUM может изменить
+rowid — после него индекс пересобирается через ``REBUILD_RTREE``.
+"""
+import math
+import sqlite3
+
+from sqlalchemy import DDL, Table, event
+from sqlalchemy.engine import Engine
+
+GEOG_COLUMN = "geog"
+EARTH_RADIUS_M = 6_371_000.0
+
+_ADD_COLUMN = (
+    "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS geog geography(Point, 4326) "
+    "GENERATED ALWAYS AS ("
+    "CASE WHEN latitude IS NOT NULL AND longitude IS NOT NULL "
+    "THEN ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography END"
+    ") STORED"
+)
+_ADD_INDEX = "CREATE INDEX IF NOT EXISTS idx_{table}_geog ON {table} USING GIST (geog)"
+
+_RTREE_STATEMENTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {table}_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+    "CREATE TRIGGER IF NOT EXISTS {table}_rtree_ai AFTER INSERT ON {table} "
+    "WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN "
+    "INSERT INTO {table}_rtree VALUES (new.rowid, new.latitude, new.latitude, new.longitude, new.longitude); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS {table}_rtree_au AFTER UPDATE OF latitude, longitude ON {table} BEGIN "
+    "DELETE FROM {table}_rtree WHERE id = old.rowid; "
+    "INSERT INTO {table}_rtree SELECT new.rowid, new.latitude, new.latitude, new.longitude, new.longitude "
+    "WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL; "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS {table}_rtree_ad AFTER DELETE ON {table} BEGIN "
+    "DELETE FROM {table}_rtree WHERE id = old.rowid; "
+    "END",
+)
+
+REBUILD_RTREE = (
+    "DELETE FROM {table}_rtree",
+    "INSERT INTO {table}_rtree SELECT rowid, latitude, latitude, longitude, longitude FROM {table} "
+    "WHERE latitude IS NOT NULL AND longitude IS NOT NULL",
+)
+
+# Таблицы, для которых на SQLite есть R-tree
+RTREE_TABLES: set = set()
+
+
+def add_column_sql(table: str) -> str:
+    return _ADD_COLUMN.format(table=table)
+
+
+def add_index_sql(table: str) -> str:
+    return _ADD_INDEX.format(table=table)
+
+
+def rtree_sql(table: str) -> list:
+    return [statement.format(table=table) for statement in _RTREE_STATEMENTS]
+
+
+def add_geography_column(table: Table) -> None:
+    """Создавать geog и GiST-индекс при create_all на PostgreSQL."""
+    event.listen(
+        table,
+        "before_create",
+        DDL("CREATE EXTENSION IF NOT EXISTS postgis").execute_if(dialect="postgresql"),
+    )
+    for statement in (add_column_sql(table.name), add_index_sql(table.name)):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+
+def add_sqlite_rtree(table: Table) -> None:
+    """Создавать R-tree и триггеры при create_all на SQLite."""
+    RTREE_TABLES.add(table.name)
+    for statement in rtree_sql(table.name):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(
+        table,
+        "after_drop",
+        DDL(f"DROP TABLE IF EXISTS {table.name}_rtree").execute_if(dialect="sqlite"),
+    )
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Расстояние по большой окружности в метрах (NULL, если нет координат)."""
+    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+        return None
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2.0 * EARTH_RADIUS_M * math.asin(math.sqrt(min(1.0, a)))
+
+
+@event.listens_for(Engine, "connect")
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function("haversine_m", 4, haversine_m, deterministic=True)
@@ -3,6 +3,7 @@ from typing import Optional
 from sqlalchemy import String, Float, Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.db import Base
+from app.models.geography import add_geography_column
 import enum
 
 class InfraType(str, enum.Enum):
@@ -27,3 +28,6 @@ class Infrastructure(Base):
     
     address: Mapped[Optional[str]] = mapped_column(String)
     rating: Mapped[Optional[float]] = mapped_column(Float) # e.g. 5.0 for schools
+
+
+add_geography_column(Infrastructure.__table__)
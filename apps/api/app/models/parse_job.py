@@ -0,0 +1,53 @@
+"""
+Задание парсинга (ParseJob) для фоновой очереди /parse/jobs.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON
+
+from app.core.db import Base
+
+
+class ParseJob(Base):
+    """
+    Фоновое задание парсинга одного источника.
+    
+    Выполняется пулом воркеров (parse_job_service). Прогресс сохраняется
+    после каждой страницы, поэтому после перезапуска задание продолжается
+    со страницы last_completed_page + 1.
+    
+    Атрибуты:
+        source: Источник ("cian", "avito")
+        params: Фильтры поиска (min_price, max_price, max_pages, concurrency)
+        status: queued / running / completed / failed / cancelled
+        pages_done: Количество обработанных страниц
+        last_completed_page: Последняя страница, до которой обработаны все
+        items_found / items_saved / items_updated / items_unchanged: Счётчики
+        errors: Последние ошибки (массив строк)
+        cancel_requested: Запрошена отмена
+        heartbeat_at: Последний признак жизни воркера
+    """
+    __tablename__ = "parse_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    source = Column(String(50), nullable=False)
+    params = Column(JSON, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    
+    # Прогресс
+    pages_done = Column(Integer, nullable=False, default=0)
+    last_completed_page = Column(Integer, nullable=False, default=0)
+    items_found = Column(Integer, nullable=False, default=0)
+    items_saved = Column(Integer, nullable=False, default=0)
+    items_updated = Column(Integer, nullable=False, default=0)
+    items_unchanged = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=False, default=list)
+    
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
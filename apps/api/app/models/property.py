@@ -1,9 +1,11 @@
 import uuid
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import String, Float, Integer, Boolean, DateTime, CheckConstraint, Index, JSON, ForeignKey
+from sqlalchemy import String, Float, Integer, Boolean, DateTime, CheckConstraint, Index, JSON, ForeignKey, false
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.db import Base
+from app.models.geography import add_geography_column, add_sqlite_rtree
+from app.models.fulltext import add_fulltext_index
 
 class Property(Base):
     __tablename__ = "properties"
@@ -50,7 +52,8 @@ class Property(Base):
     
     # Extended Data (Admin Full Control)
     quality_score: Mapped[Optional[int]] = mapped_column(Integer, default=95)
-    complex_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    complex_name: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)  # Set by complex_matcher at ingest
+    complex_auto: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())  # complex_name from complex_matcher, not admin
     district: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     badges: Mapped[List[str]] = mapped_column(JSON, default=[]) # e.g. ["Exclusive", "Sea View"]
     
@@ -77,6 +80,11 @@ class Property(Base):
     developer_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     developer_comment: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # Вместо owner_quote для застройщиков
     custom_fields: Mapped[dict] = mapped_column(JSON, default={})  # Поля свободной формы
+    # Background geocoding/distances: "pending", "done", "failed" (see enrichment_service)
+    enrichment_status: Mapped[Optional[str]] = mapped_column(String(20), nullable=True, default="done", index=True)
+    enrichment_attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")  # Ошибки провайдера подряд
+    enrichment_retry_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # Аренда воркера / следующая попытка
+    location_stale: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())  # Координаты прежнего адреса
     complex_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("complexes.id"), nullable=True, index=True)
     
     # Relationships
@@ -84,10 +92,17 @@ class Property(Base):
     
     # System
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
     __table_args__ = (
         Index("idx_property_location", "latitude", "longitude"),
+        Index("idx_property_active_created", "is_active", "created_at", "id"),  # Keyset pagination
+        Index("uq_property_source_source_id", "source", "source_id", unique=True),  # Parser upserts
         CheckConstraint("price > 0", name="check_price_positive"),
     )
+
+
+add_geography_column(Property.__table__)
+add_sqlite_rtree(Property.__table__)
+add_fulltext_index(Property.__table__)
@@ -1,10 +1,15 @@
 """Parsers package for external data sources."""
 from app.parsers.cian_parser import CianParser, CianProperty
 from app.parsers.avito_parser import AvitoParser, AvitoProperty
+from app.parsers.scheduler import CrawlScheduler, PageResult, TokenBucket, crawl
 
 __all__ = [
     "CianParser",
     "CianProperty",
     "AvitoParser",
     "AvitoProperty",
+    "CrawlScheduler",
+    "PageResult",
+    "TokenBucket",
+    "crawl",
 ]
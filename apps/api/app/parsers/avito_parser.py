@@ -7,7 +7,6 @@ import asyncio
 import random
 import re
 from typing import Optional, List, Dict, Any
-from datetime import datetime
 from dataclasses import dataclass
 import json
 
@@ -21,6 +20,14 @@ try:
 except ImportError:
     BeautifulSoup = None  # type: ignore
 
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+from app.parsers.scheduler import bucket_for
+
 
 @dataclass
 class AvitoProperty:
@@ -63,15 +70,18 @@ class AvitoParser:
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     ]
     
-    def __init__(self, proxy: Optional[str] = None):
+    def __init__(self, proxy: Optional[str] = None, transport: Optional[Any] = None):
         """Initialize parser with optional proxy.
         
         Args:
             proxy: Proxy URL. For Avito, residential proxies work best.
+            transport: Optional httpx transport (e.g. MockTransport in tests)
         """
         self.proxy = proxy
         self._rate_limit_delay = (3.0, 7.0)  # Avito needs longer delays
-        self._last_request_time = 0.0
+        self._rate_burst = 1  # Requests allowed back to back
+        self.transport = transport
+        self._client: Optional["httpx.AsyncClient"] = None
     
     def _get_headers(self) -> Dict[str, str]:
         """Generate headers mimicking real browser."""
@@ -89,16 +99,33 @@ class AvitoParser:
             "Sec-Fetch-Site": "same-origin",
         }
     
+    def _get_client(self) -> "httpx.AsyncClient":
+        """Return the pooled client, reused by all requests of this parser."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                proxy=self.proxy,
+                transport=self.transport,
+                http2=HTTP2,  # Needs the optional h2 package
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the pooled client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
     async def _rate_limit(self):
         """Apply stricter rate limiting for Avito."""
-        now = datetime.now().timestamp()
-        elapsed = now - self._last_request_time
-        delay = random.uniform(*self._rate_limit_delay)
-        
-        if elapsed < delay:
-            await asyncio.sleep(delay - elapsed)
-        
-        self._last_request_time = datetime.now().timestamp()
+        await bucket_for("avito", self._rate_limit_delay, self._rate_burst).acquire()
     
     async def search_sochi(
         self,
@@ -139,35 +166,35 @@ class AvitoParser:
         }
         
         try:
-            async with httpx.AsyncClient(proxies=self.proxy, http2=True) as client:
-                # Add cookies to appear more legitimate
-                cookies = {
-                    "_ym_uid": str(random.randint(100000000, 999999999)),
-                    "f": str(random.randint(1000000000, 9999999999)),
-                }
-                
-                response = await client.get(
-                    self.SEARCH_URL,
-                    params=params,
-                    headers=self._get_headers(),
-                    cookies=cookies,
-                    timeout=30.0,
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._parse_search_results(data)
-                elif response.status_code == 429:
-                    print("Avito rate limit hit, backing off...")
-                    await asyncio.sleep(60)
-                    return self._generate_mock_data(5)
-                elif response.status_code == 403:
-                    print("Avito blocked request (403), need proxy rotation")
-                    return self._generate_mock_data(5)
-                else:
-                    print(f"Avito returned {response.status_code}")
-                    return self._generate_mock_data(5)
-                    
+            client = self._get_client()
+            # Add cookies to appear more legitimate
+            cookies = {
+                "_ym_uid": str(random.randint(100000000, 999999999)),
+                "f": str(random.randint(1000000000, 9999999999)),
+            }
+            
+            response = await client.get(
+                self.SEARCH_URL,
+                params=params,
+                headers=self._get_headers(),
+                cookies=cookies,
+                timeout=30.0,
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                return self._parse_search_results(data)
+            elif response.status_code == 429:
+                print("Avito rate limit hit, backing off...")
+                await asyncio.sleep(60)
+                return self._generate_mock_data(5)
+            elif response.status_code == 403:
+                print("Avito blocked request (403), need proxy rotation")
+                return self._generate_mock_data(5)
+            else:
+                print(f"Avito returned {response.status_code}")
+                return self._generate_mock_data(5)
+            
         except Exception as e:
             print(f"Avito parser error: {e}")
             return self._generate_mock_data(5)
@@ -191,20 +218,20 @@ class AvitoParser:
         await self._rate_limit()
         
         try:
-            async with httpx.AsyncClient(proxies=self.proxy, http2=True) as client:
-                response = await client.get(
-                    url,
-                    headers=self._get_headers(),
-                    timeout=30.0,
-                    follow_redirects=True,
-                )
-                
-                if response.status_code == 200:
-                    return self._parse_listing_html(response.text, url)
-                else:
-                    print(f"Avito listing returned {response.status_code}")
-                    return None
-                    
+            client = self._get_client()
+            response = await client.get(
+                url,
+                headers=self._get_headers(),
+                timeout=30.0,
+                follow_redirects=True,
+            )
+            
+            if response.status_code == 200:
+                return self._parse_listing_html(response.text, url)
+            else:
+                print(f"Avito listing returned {response.status_code}")
+                return None
+            
         except Exception as e:
             print(f"Avito listing error: {e}")
             return None
@@ -375,8 +402,8 @@ class AvitoParser:
 
 # Usage example
 async def main():
-    parser = AvitoParser()
-    properties = await parser.search_sochi(min_price=10_000_000, max_price=80_000_000)
+    async with AvitoParser() as parser:
+        properties = await parser.search_sochi(min_price=10_000_000, max_price=80_000_000)
     
     for prop in properties:
         print(f"{prop.title}: {prop.price:,.0f} ₽ - {prop.address}")
@@ -0,0 +1,167 @@
+"""Concurrent crawl scheduling for listing parsers.
+
+Pages of a search are fetched concurrently, but every request of a source
+first takes a token from that source's bucket, so the request rate stays
+within the parser's ``_rate_limit_delay``. Results are yielded page by page
+as soon as they arrive, letting the caller ingest page 1 while later pages
+are still downloading.
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class TokenBucket:
+    """Asyncio token bucket with optional random jitter.
+
+    ``rate`` tokens are added per second up to ``capacity``. Jitter is charged
+    as extra debt after each acquire, so consecutive requests are spread by a
+    random ``0..jitter`` seconds on top of the base interval.
+    """
+
+    def __init__(self, rate: Optional[float], capacity: int = 1, jitter: float = 0.0):
+        """
+        Args:
+            rate: Tokens per second; None disables limiting.
+            capacity: Burst size.
+            jitter: Maximum extra delay in seconds per request.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.jitter = jitter
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_delay(cls, delay: Tuple[float, float], capacity: int = 1) -> "TokenBucket":
+        """Build a bucket from a parser's (min, max) delay between requests."""
+        low, high = delay
+        return cls(1.0 / low if low > 0 else None, capacity, max(high - low, 0.0))
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Buckets outlive event loops (tests, worker restarts)
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        if self.rate is None:
+            return
+        async with self._get_lock():
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+            if self.jitter:
+                self._tokens -= random.uniform(0, self.jitter) * self.rate
+
+
+_buckets: Dict[Tuple[str, Tuple[float, float], int], TokenBucket] = {}
+
+
+def bucket_for(source: str, delay: Tuple[float, float], capacity: int = 1) -> TokenBucket:
+    """Return the process-wide bucket of a source, shared by all parser instances."""
+    key = (source, tuple(delay), capacity)
+    bucket = _buckets.get(key)
+    if bucket is None:
+        bucket = _buckets[key] = TokenBucket.from_delay(delay, capacity)
+    return bucket
+
+
+@dataclass
+class PageResult:
+    """Outcome of fetching one search page."""
+    page: int
+    items: List[Any] = field(default_factory=list)
+    error: Optional[Exception] = None
+
+
+class CrawlScheduler:
+    """Fetch pages first_page..max_pages with bounded concurrency, yielding in completion order.
+
+    An empty page marks the end of results: pages after it that have not
+    finished yet are cancelled.
+    """
+
+    def __init__(
+        self,
+        fetch_page: Callable[[int], Awaitable[List[Any]]],
+        max_pages: int,
+        concurrency: int = 3,
+        first_page: int = 1,
+    ):
+        self.fetch_page = fetch_page
+        self.max_pages = max_pages
+        self.concurrency = max(1, concurrency)
+        self.first_page = first_page
+
+    async def stream(self) -> AsyncIterator[PageResult]:
+        queue: "asyncio.Queue[PageResult]" = asyncio.Queue()
+
+        async def worker(page: int) -> None:
+            try:
+                result = PageResult(page, await self.fetch_page(page))
+            except Exception as e:
+                result = PageResult(page, error=e)
+            await queue.put(result)
+
+        # Pages are started as earlier ones finish, never more than concurrency at once
+        tasks: Dict[int, asyncio.Task] = {}
+        in_flight = set()
+        next_page = self.first_page
+        last_page = self.max_pages
+        received = set()
+
+        def start_pages() -> None:
+            nonlocal next_page
+            while next_page <= last_page and len(in_flight) < self.concurrency:
+                tasks[next_page] = asyncio.create_task(worker(next_page))
+                in_flight.add(next_page)
+                next_page += 1
+
+        start_pages()
+        try:
+            while not received.issuperset(range(self.first_page, last_page + 1)):
+                result = await queue.get()
+                in_flight.discard(result.page)
+                if result.page > last_page:
+                    continue
+                received.add(result.page)
+                if result.error is None and not result.items:
+                    for page in [p for p in in_flight if p > result.page]:
+                        tasks[page].cancel()
+                        in_flight.discard(page)
+                    last_page = result.page
+                start_pages()
+                yield result
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+
+def crawl(
+    parser: Any,
+    max_pages: int,
+    concurrency: int = 3,
+    first_page: int = 1,
+    **filters: Any,
+) -> AsyncIterator[PageResult]:
+    """Stream ``parser.search_sochi`` pages through a CrawlScheduler."""
+    async def fetch_page(page: int) -> List[Any]:
+        return await parser.search_sochi(page=page, **filters)
+
+    return CrawlScheduler(fetch_page, max_pages, concurrency, first_page).stream()
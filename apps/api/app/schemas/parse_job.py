@@ -0,0 +1,38 @@
+"""
+Pydantic-схемы для фоновых заданий парсинга.
+"""
+
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field
+
+
+class ParseJobCreate(BaseModel):
+    """Схема постановки задания в очередь."""
+    source: str  # "cian" or "avito"
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    max_pages: int = Field(default=1, ge=1, le=100)
+    concurrency: int = Field(default=3, ge=1, le=10)
+
+
+class ParseJobResponse(BaseModel):
+    """Схема ответа с прогрессом задания."""
+    id: str
+    source: str
+    params: Dict[str, Any]
+    status: str
+    pages_done: int
+    last_completed_page: int
+    items_found: int
+    items_saved: int
+    items_updated: int
+    items_unchanged: int
+    errors: List[str]
+    cancel_requested: bool
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -1,7 +1,7 @@
 """Schemas for Property resource."""
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import AliasPath, BaseModel, Field
 
 
 class PropertyBase(BaseModel):
@@ -125,18 +125,61 @@ class PropertyResponse(PropertyBase):
     created_at: datetime
     updated_at: datetime
     is_active: bool
+    enrichment_status: Optional[str] = None  # "pending" until geocoding/distances finish
+    distance_m: Optional[int] = None  # Only in lists searched around lat/lon
+    highlight: Optional[str] = None  # Only in lists searched with q: escaped HTML with <mark> matches
+
+    class Config:
+        from_attributes = True
+
+
+class PropertyCardResponse(BaseModel):
+    """Catalog card projection of Property (``view=card``).
+    
+    Scalar columns a listing card shows plus the first image; none of the
+    JSON columns (investment metrics, eco score, agent profile...) are loaded.
+    """
+    id: str
+    title: str
+    price: float
+    price_per_sqm: Optional[float] = None
+    currency: str
+    address: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    area_sqm: float
+    rooms: Optional[str] = None
+    floor: Optional[int] = None
+    total_floors: Optional[int] = None
+    property_type: Optional[str] = None
+    complex_name: Optional[str] = None
+    district: Optional[str] = None
+    completion_date: Optional[str] = None
+    is_from_developer: bool
+    source: str
+    marker_icon: Optional[str] = None
+    cover_image: Optional[str] = Field(None, validation_alias=AliasPath("images", 0))
+    created_at: datetime
+    distance_m: Optional[int] = None
+    highlight: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 
 class PropertyListResponse(BaseModel):
-    """Schema for paginated property list."""
+    """Schema for paginated property list.
+    
+    ``total``/``pages`` are None when the count was skipped (cursor mode),
+    ``page`` is None in cursor mode. With ``view=card`` items are
+    PropertyCardResponse, with ``fields=`` objects with only the requested keys.
+    """
     items: List[PropertyResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class BulkPropertyCreate(BaseModel):
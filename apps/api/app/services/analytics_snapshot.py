@@ -0,0 +1,419 @@
+"""Columnar in-memory snapshot of active properties for analytics.
+
+Heatmap clusters, complex analytics and platform stats only need price,
+area, coordinates and a few categorical columns. The snapshot keeps them as
+NumPy arrays (categoricals dictionary-encoded as int32 codes) and computes the
+aggregations vectorized instead of loading rows through the ORM.
+
+Refresh is incremental: rows with ``updated_at`` at or after the watermark
+(minus a lag that covers transactions committed out of order) are re-read and
+merged; soft deletes arrive the same way as ``is_active=False``. A count check
+catches anything the watermark cannot see (hard deletes, rollbacks) and falls
+back to a full rebuild. Writes in this process mark the snapshot stale through
+``cache.invalidate(PROPERTIES)``; writes from other workers show up within
+``ANALYTICS_SNAPSHOT_REFRESH_SECONDS``.
+
+Selected with ``ANALYTICS_BACKEND="snapshot"`` (default); "sql" keeps the
+aggregations in the database.
+"""
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core import cache
+from app.core.config import settings
+from app.models.property import Property
+
+# (west, south, east, north) in degrees
+BBox = Tuple[float, float, float, float]
+
+WATERMARK_LAG = timedelta(seconds=120)
+NO_CODE = -1
+
+_COLUMNS = (
+    Property.id,
+    Property.price,
+    Property.area_sqm,
+    Property.latitude,
+    Property.longitude,
+    Property.rooms,
+    Property.source,
+    Property.complex_id,
+    Property.complex_name,
+)
+
+
+class Dictionary:
+    """Append-only value <-> int32 code mapping shared by snapshot versions."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_CODE
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code(self, value: str) -> Optional[int]:
+        return self._codes.get(value)
+
+    def decode(self, code: int) -> Optional[str]:
+        return self.values[code] if code != NO_CODE else None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(sys.getsizeof(v) for v in self.values)
+
+
+@dataclass(frozen=True)
+class Columns:
+    """One immutable version of the snapshot; refreshes build a new one."""
+    ids: np.ndarray         # object (str)
+    price: np.ndarray       # float64
+    area: np.ndarray        # float64, NaN when unknown
+    lat: np.ndarray         # float64, NaN when unknown
+    lon: np.ndarray         # float64, NaN when unknown
+    rooms: np.ndarray       # int32 code
+    source: np.ndarray      # int32 code
+    complex_id: np.ndarray  # int64, NO_CODE when unassigned
+    complex: np.ndarray     # int32 code of complex_name
+    positions: Dict[str, int] = field(repr=False)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # --- aggregations ------------------------------------------------------
+
+    def _price_filter(self, mask: np.ndarray, min_price: Optional[float], max_price: Optional[float]) -> np.ndarray:
+        if min_price:
+            mask &= self.price >= min_price
+        if max_price:
+            mask &= self.price <= max_price
+        return mask
+
+    def property_stats(self) -> Dict[str, Any]:
+        """Same payload as property_service.get_property_stats."""
+        if not len(self):
+            return {"total_properties": 0, "avg_price": 0, "min_price": 0, "max_price": 0, "avg_area_sqm": 0}
+        area = self.area[~np.isnan(self.area)]
+        return {
+            "total_properties": len(self),
+            "avg_price": round(float(self.price.mean()), 2),
+            "min_price": float(self.price.min()),
+            "max_price": float(self.price.max()),
+            "avg_area_sqm": round(float(area.mean()), 2) if len(area) else 0,
+        }
+
+    def clusters(
+        self,
+        bbox: BBox,
+        zoom: int,
+        size: float,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Grid cells (origin-anchored, ``size`` degrees) inside bbox, as heatmap_service.get_clusters."""
+        west, south, east, north = bbox
+        with np.errstate(invalid="ignore"):
+            mask = (self.lat >= south) & (self.lat <= north) & (self.lon >= west) & (self.lon <= east)
+        mask = self._price_filter(mask, min_price, max_price)
+        if not mask.any():
+            return []
+
+        lat, lon, price, area = self.lat[mask], self.lon[mask], self.price[mask], self.area[mask]
+        cell_x = ((lon + 180.0) / size).astype(np.int64)
+        cell_y = ((lat + 90.0) / size).astype(np.int64)
+        cells, inverse = np.unique(np.column_stack((cell_x, cell_y)), axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        count = np.bincount(inverse)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            has_area = area > 0
+            per_sqm = np.where(has_area, price / area, 0.0)
+            per_sqm_count = np.bincount(inverse, weights=has_area)
+            avg_per_sqm = np.bincount(inverse, weights=per_sqm) / per_sqm_count
+        avg_price = np.bincount(inverse, weights=price) / count
+        avg_lat = np.bincount(inverse, weights=lat) / count
+        avg_lon = np.bincount(inverse, weights=lon) / count
+
+        features = []
+        for i, (x, y) in enumerate(cells):
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [float(avg_lon[i]), float(avg_lat[i])]},
+                "properties": {
+                    "cluster": True,
+                    "cell": f"{zoom}/{x}/{y}",
+                    "count": int(count[i]),
+                    "avg_price": round(float(avg_price[i])),
+                    "avg_price_per_sqm": round(float(avg_per_sqm[i])) if per_sqm_count[i] else 0,
+                },
+            })
+        return features
+
+    def _group_stats(self, mask: np.ndarray, codes: np.ndarray) -> Dict[int, Dict[str, Any]]:
+        """count/avg/min/max price, avg price per m² and avg area per code."""
+        codes = codes[mask]
+        price, area = self.price[mask], self.area[mask]
+        groups, inverse = np.unique(codes, return_inverse=True)
+        count = np.bincount(inverse)
+        has_area = area > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            area_count = np.bincount(inverse, weights=has_area)
+            avg_area = np.bincount(inverse, weights=np.where(has_area, area, 0.0)) / area_count
+            avg_per_sqm = np.bincount(inverse, weights=np.where(has_area, price / area, 0.0)) / area_count
+        min_price = np.full(len(groups), np.inf)
+        max_price = np.full(len(groups), -np.inf)
+        np.minimum.at(min_price, inverse, price)
+        np.maximum.at(max_price, inverse, price)
+        avg_price = np.bincount(inverse, weights=price) / count
+        return {
+            int(code): {
+                "count": int(count[i]),
+                "avg_price": float(avg_price[i]),
+                "min_price": float(min_price[i]),
+                "max_price": float(max_price[i]),
+                "avg_price_per_sqm": float(avg_per_sqm[i]) if area_count[i] else None,
+                "avg_area": float(avg_area[i]) if area_count[i] else None,
+            }
+            for i, code in enumerate(groups)
+        }
+
+    def complex_groups(self, dictionary: Dictionary) -> List[Tuple[Optional[str], Dict[str, Any]]]:
+        """(complex_name or None, stats) for every complex, as the GROUP BY complex_name."""
+        stats = self._group_stats(np.ones(len(self), dtype=bool), self.complex)
+        return [(dictionary.decode(code), values) for code, values in stats.items()]
+
+    def complex_statistics(
+        self,
+        code: Optional[int],
+        price_ranges: List[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        """Statistics and histogram of one complex, as complex_service.get_statistics."""
+        if code is None:
+            return None
+        mask = self.complex == code
+        total = int(mask.sum())
+        if not total:
+            return None
+        price, area = self.price[mask], self.area[mask]
+        has_area = area > 0
+        per_sqm = price[has_area] / area[has_area]
+        buckets = [
+            int(((price >= r["min"]) & ((price < r["max"]) if r["max"] is not None else True)).sum())
+            for r in price_ranges
+        ]
+        return {
+            "statistics": {
+                "total_count": total,
+                "avg_price": round(float(price.mean())),
+                "min_price": float(price.min()),
+                "max_price": float(price.max()),
+                # Interpolated, as percentile_cont(0.5) in the SQL backend
+                "median_price": float(np.median(price)),
+                "avg_price_per_sqm": round(float(per_sqm.mean())) if len(per_sqm) else 0,
+                "min_price_per_sqm": round(float(per_sqm.min())) if len(per_sqm) else 0,
+                "max_price_per_sqm": round(float(per_sqm.max())) if len(per_sqm) else 0,
+                "avg_area": round(float(area[has_area].mean())) if has_area.any() else 0,
+            },
+            "price_distribution": [
+                {
+                    "range": range_info["label"],
+                    "count": count,
+                    "percentage": round(count / total * 100, 1),
+                }
+                for range_info, count in zip(price_ranges, buckets)
+            ],
+        }
+
+    def value_counts(self, mask: np.ndarray, codes: np.ndarray, dictionary: Dictionary) -> Dict[Optional[str], int]:
+        values, counts = np.unique(codes[mask], return_counts=True)
+        return {dictionary.decode(int(v)): int(c) for v, c in zip(values, counts)}
+
+
+def _freeze(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    for array in arrays.values():
+        array.setflags(write=False)
+    return arrays
+
+
+class PropertySnapshot:
+    """Process-wide snapshot manager: builds, refreshes and reports memory."""
+
+    def __init__(self):
+        self.rooms = Dictionary()
+        self.sources = Dictionary()
+        self.complexes = Dictionary()
+        self._columns: Optional[Columns] = None
+        self._watermark: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._stale = False
+        self._lock = threading.Lock()  # Guards the published columns
+        self._refresh_lock = threading.Lock()  # One refresh at a time
+        self.refreshes = {"full": 0, "incremental": 0}
+        self.last_refresh_ms: Optional[float] = None
+
+    def mark_stale(self) -> None:
+        self._stale = True
+
+    def reset(self) -> None:
+        """Drop the snapshot (rebuilt on next use)."""
+        with self._refresh_lock, self._lock:
+            self._columns = None
+            self._watermark = None
+            self._stale = False
+
+    def _due(self) -> bool:
+        return self._stale or time.monotonic() - self._checked_at > settings.ANALYTICS_SNAPSHOT_REFRESH_SECONDS
+
+    def get(self, db: Session) -> Columns:
+        """Current columns, refreshed first when stale or past the refresh interval.
+
+        The database is queried outside the lock readers take: while one
+        caller refreshes, the others get the columns published so far
+        (only the first build is waited for).
+        """
+        columns = self._columns
+        if columns is not None and not self._due():
+            return columns
+        if not self._refresh_lock.acquire(blocking=columns is None):
+            return columns
+        try:
+            if self._columns is None or self._due():
+                self._update(db)
+        finally:
+            self._refresh_lock.release()
+        return self._columns
+
+    def _update(self, db: Session) -> None:
+        started = time.perf_counter()
+        self._stale = False
+        try:
+            if self._columns is None:
+                self._build(db)
+            else:
+                self._refresh(db)
+        except Exception:
+            self._stale = True
+            raise
+        self._checked_at = time.monotonic()
+        self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    # --- building ----------------------------------------------------------
+
+    def _encode(self, rows) -> Dict[str, np.ndarray]:
+        n = len(rows)
+        nan = float("nan")
+        return {
+            "ids": np.array([r.id for r in rows], dtype=object),
+            "price": np.fromiter((r.price for r in rows), np.float64, n),
+            "area": np.fromiter((nan if r.area_sqm is None else r.area_sqm for r in rows), np.float64, n),
+            "lat": np.fromiter((nan if r.latitude is None else r.latitude for r in rows), np.float64, n),
+            "lon": np.fromiter((nan if r.longitude is None else r.longitude for r in rows), np.float64, n),
+            "rooms": np.fromiter((self.rooms.encode(r.rooms) for r in rows), np.int32, n),
+            "source": np.fromiter((self.sources.encode(r.source) for r in rows), np.int32, n),
+            "complex_id": np.fromiter((NO_CODE if r.complex_id is None else r.complex_id for r in rows), np.int64, n),
+            "complex": np.fromiter((self.complexes.encode(r.complex_name) for r in rows), np.int32, n),
+        }
+
+    def _publish(self, arrays: Dict[str, np.ndarray], positions: Optional[Dict[str, int]] = None) -> None:
+        if positions is None:
+            positions = {property_id: i for i, property_id in enumerate(arrays["ids"])}
+        columns = Columns(positions=positions, **_freeze(arrays))
+        with self._lock:
+            self._columns = columns
+
+    def _build(self, db: Session) -> None:
+        started_at = datetime.utcnow()
+        rows = db.query(*_COLUMNS).filter(Property.is_active == True).all()
+        self._publish(self._encode(rows))
+        self._watermark = started_at
+        self.refreshes["full"] += 1
+
+    def _refresh(self, db: Session) -> None:
+        started_at = datetime.utcnow()
+        changed = db.query(*_COLUMNS, Property.is_active).filter(
+            Property.updated_at >= self._watermark - WATERMARK_LAG
+        ).all()
+
+        columns = self._columns
+        arrays = {name: getattr(columns, name) for name in Columns.__dataclass_fields__ if name != "positions"}
+        positions = columns.positions
+        if changed:
+            updates = [(columns.positions.get(r.id), r) for r in changed]
+            removed = [i for i, r in updates if i is not None and not r.is_active]
+            in_place = [(i, r) for i, r in updates if i is not None and r.is_active]
+            appended = [r for i, r in updates if i is None and r.is_active]
+
+            arrays = {name: array.copy() for name, array in arrays.items()}
+            if in_place:
+                encoded = self._encode([r for _, r in in_place])
+                index = np.fromiter((i for i, _ in in_place), np.int64, len(in_place))
+                for name, values in encoded.items():
+                    arrays[name][index] = values
+            if appended:
+                encoded = self._encode(appended)
+                arrays = {name: np.concatenate((arrays[name], encoded[name])) for name in arrays}
+            if removed:
+                keep = np.ones(len(arrays["ids"]), dtype=bool)
+                keep[removed] = False
+                arrays = {name: array[keep] for name, array in arrays.items()}
+                positions = None
+            elif appended:
+                positions = dict(positions)
+                offset = len(columns)
+                positions.update((r.id, offset + k) for k, r in enumerate(appended))
+            self._publish(arrays, positions)
+
+        self._watermark = started_at
+        self.refreshes["incremental"] += 1
+
+        active = db.query(func.count(Property.id)).filter(Property.is_active == True).scalar()
+        if active != len(self._columns):
+            self._build(db)
+
+    # --- reporting ---------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Rows, refresh counters and memory use in bytes."""
+        with self._lock:
+            columns = self._columns
+            memory: Dict[str, int] = {}
+            if columns is not None:
+                for name in Columns.__dataclass_fields__:
+                    if name == "positions":
+                        continue
+                    array = getattr(columns, name)
+                    memory[name] = int(array.nbytes)
+                # Object array holds pointers; the strings live on the heap
+                memory["ids"] += sum(sys.getsizeof(v) for v in columns.ids)
+                memory["positions"] = sys.getsizeof(columns.positions)
+                memory["dictionaries"] = self.rooms.nbytes + self.sources.nbytes + self.complexes.nbytes
+            return {
+                "backend": settings.ANALYTICS_BACKEND,
+                "rows": len(columns) if columns is not None else 0,
+                "watermark": self._watermark.isoformat() if self._watermark else None,
+                "refreshes": dict(self.refreshes),
+                "last_refresh_ms": self.last_refresh_ms,
+                "memory_bytes": memory,
+                "total_bytes": sum(memory.values()),
+            }
+
+
+snapshot = PropertySnapshot()
+cache.on_invalidate(cache.PROPERTIES, snapshot.mark_stale)
+
+
+def enabled() -> bool:
+    return settings.ANALYTICS_BACKEND == "snapshot"
@@ -0,0 +1,235 @@
+"""Ingest-time assignment of properties to residential complexes (ЖК).
+
+Keywords of all known complexes are compiled into a single Aho-Corasick
+automaton, so classifying a listing is one pass over ``title + address``
+instead of a loop over every complex and keyword.
+"""
+import logging
+from collections import deque
+from typing import Optional, List, Dict, Iterable, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.complex import Complex
+from app.models.property import Property
+
+logger = logging.getLogger(__name__)
+
+# Known residential complexes in Sochi
+KNOWN_COMPLEXES = [
+    {"name": "Mantera Residence", "keywords": ["mantera", "мантера"]},
+    {"name": "Sochi Lighthouse", "keywords": ["lighthouse", "лайтхаус"]},
+    {"name": "Residence (Красная Поляна)", "keywords": ["residence", "резиденс"]},
+    {"name": "Corum", "keywords": ["corum", "корум"]},
+    {"name": "Elite Park", "keywords": ["elite park", "элит парк"]},
+    {"name": "Актёр Гэлакси", "keywords": ["актёр", "гэлакси", "galaxy"]},
+    {"name": "Александрийский маяк", "keywords": ["александрийский", "маяк"]},
+    {"name": "Горки Город", "keywords": ["горки город", "gorki"]},
+]
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher.
+
+    Each pattern carries an integer priority; ``best()`` returns the payload
+    with the lowest priority among all patterns found in the text.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, int, str]]):
+        """Build the automaton.
+
+        Args:
+            patterns: (keyword, priority, payload) triples. Keywords are lowercased.
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Optional[Tuple[int, str]]] = [None]
+
+        for keyword, priority, payload in patterns:
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(None)
+                state = nxt
+            self._out[state] = self._better(self._out[state], (priority, payload))
+
+        # BFS to compute failure links and merge outputs along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._out[nxt] = self._better(self._out[nxt], self._out[self._fail[nxt]])
+
+    @staticmethod
+    def _better(a: Optional[Tuple[int, str]], b: Optional[Tuple[int, str]]) -> Optional[Tuple[int, str]]:
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return a if a[0] <= b[0] else b
+
+    def best(self, text: str) -> Optional[str]:
+        """Return payload of the highest-priority pattern occurring in text."""
+        state = 0
+        found: Optional[Tuple[int, str]] = None
+        for char in text.lower():
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            found = self._better(found, self._out[state])
+        return found[1] if found else None
+
+
+def build_matcher(extra_names: Iterable[str] = ()) -> AhoCorasick:
+    """Compile KNOWN_COMPLEXES (in list order) plus extra complex names."""
+    patterns = [
+        (keyword, priority, info["name"])
+        for priority, info in enumerate(KNOWN_COMPLEXES)
+        for keyword in info["keywords"]
+    ]
+    offset = len(KNOWN_COMPLEXES)
+    patterns.extend((name, offset + i, name) for i, name in enumerate(extra_names))
+    return AhoCorasick(patterns)
+
+
+_matcher: Optional[AhoCorasick] = None
+_complex_ids: Dict[str, int] = {}
+
+
+def invalidate() -> None:
+    """Drop the compiled matcher and name -> id map (call after Complex rows change)."""
+    global _matcher, _complex_ids
+    _matcher = None
+    _complex_ids = {}
+
+
+def _get_matcher(db: Session) -> AhoCorasick:
+    """Return the process-wide matcher, compiling it from the DB on first use."""
+    global _matcher, _complex_ids
+    if _matcher is None:
+        rows = db.query(Complex.id, Complex.name).all()
+        _complex_ids = {name.lower(): complex_id for complex_id, name in rows}
+        _matcher = build_matcher(name for _, name in rows)
+    return _matcher
+
+
+def classify(db: Session, title: Optional[str], address: Optional[str]) -> Tuple[Optional[str], Optional[int]]:
+    """Return (complex_name, complex_id) for a listing, or (None, None)."""
+    name = _get_matcher(db).best(f"{title or ''} {address or ''}")
+    if name is None:
+        return None, None
+    return name, _complex_ids.get(name.lower())
+
+
+def reclassify(
+    db: Session,
+    title: Optional[str],
+    address: Optional[str],
+    complex_name: Optional[str],
+    complex_id: Optional[int],
+    complex_auto: bool,
+) -> Tuple[Optional[str], Optional[int], bool]:
+    """(complex_name, complex_id, complex_auto) after a title or address change.
+
+    Names set by admin are kept. Otherwise the property is classified again
+    and a complex_id is replaced only if it came from the previous automatic
+    match.
+    """
+    if complex_name and not complex_auto:
+        return complex_name, complex_id, False
+    _get_matcher(db)  # Loads _complex_ids on a cold matcher
+    previous_id = _complex_ids.get(complex_name.lower()) if complex_name else None
+    name, matched_id = classify(db, title, address)
+    if complex_id is None or (complex_auto and complex_id == previous_id):
+        complex_id = matched_id
+    return name, complex_id, name is not None
+
+
+def assign_complex(db: Session, prop: Property) -> None:
+    """Classify a property unless its complex_name was set by admin (see ``reclassify``)."""
+    prop.complex_name, prop.complex_id, prop.complex_auto = reclassify(
+        db, prop.title, prop.address, prop.complex_name, prop.complex_id, prop.complex_auto,
+    )
+
+
+def backfill(db: Session, batch_size: int = 500) -> int:
+    """Classify existing rows without complex_name. Returns number of rows assigned."""
+    matcher = _get_matcher(db)
+    assigned = 0
+    last_id = ""
+
+    while True:
+        rows = (
+            db.query(Property.id, Property.title, Property.address, Property.complex_id)
+            .filter(Property.complex_name.is_(None), Property.id > last_id)
+            .order_by(Property.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        updates = []
+        for row in rows:
+            name = matcher.best(f"{row.title or ''} {row.address or ''}")
+            if name:
+                updates.append({
+                    "id": row.id,
+                    "complex_name": name,
+                    "complex_auto": True,
+                    "complex_id": row.complex_id or _complex_ids.get(name.lower()),
+                })
+        if updates:
+            db.execute(update(Property), updates)
+            db.commit()
+            assigned += len(updates)
+
+    logger.info(f"Complex backfill: assigned {assigned} properties")
+    return assigned
+
+
+def resolve_name(db: Session, complex_name: str) -> Optional[str]:
+    """Find the stored complex_name for a user-supplied name (exact, then partial).
+
+    Compared in Python: SQLite lower() does not fold Cyrillic.
+    """
+    needle = complex_name.lower()
+    names = sorted(
+        name for (name,) in db.query(Property.complex_name)
+        .filter(Property.complex_name.isnot(None))
+        .distinct()
+    )
+    exact = next((n for n in names if n.lower() == needle), None)
+    if exact:
+        return exact
+    partial = next((n for n in names if needle in n.lower()), None)
+    if partial:
+        return partial
+    # Known complex without listings yet
+    return next((c["name"] for c in KNOWN_COMPLEXES if needle in c["name"].lower()), None)
+
+
+if __name__ == "__main__":
+    from app.core.deps import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        print(f"Assigned {backfill(session)} properties to complexes")
+    finally:
+        session.close()
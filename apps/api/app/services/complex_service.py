@@ -0,0 +1,163 @@
+"""SQL-side analytics for a single residential complex.
+
+All statistics are aggregated in the database, so the number of round trips
+does not depend on how many listings a complex has. With the snapshot
+analytics backend the same payloads come from ``analytics_snapshot``.
+"""
+from typing import Optional, List, Dict, Any
+
+import numpy as np
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+
+from app.models.property import Property
+from app.services import analytics_snapshot
+
+PRICE_RANGES = [
+    {"label": "< 15M", "min": 0, "max": 15_000_000},
+    {"label": "15-30M", "min": 15_000_000, "max": 30_000_000},
+    {"label": "30-50M", "min": 30_000_000, "max": 50_000_000},
+    {"label": "50-100M", "min": 50_000_000, "max": 100_000_000},
+    {"label": "> 100M", "min": 100_000_000, "max": None},
+]
+
+
+def _scope(query, complex_name: str):
+    return query.filter(Property.is_active == True, Property.complex_name == complex_name)
+
+
+def _bucket(range_info: Dict[str, Any]):
+    condition = Property.price >= range_info["min"]
+    if range_info["max"] is not None:
+        condition = condition & (Property.price < range_info["max"])
+    return func.sum(case((condition, 1), else_=0))
+
+
+def _median_price(db: Session, complex_name: str, count: int) -> float:
+    """Median without percentile_cont (SQLite): one indexed ORDER BY ... OFFSET.
+
+    Interpolated between the two middle rows for an even count, like
+    percentile_cont(0.5) on PostgreSQL and the snapshot's np.median.
+    """
+    prices = [price for (price,) in _scope(db.query(Property.price), complex_name).order_by(
+        Property.price
+    ).offset((count - 1) // 2).limit(2 - count % 2)]
+    return sum(prices) / len(prices)
+
+
+def get_statistics(db: Session, complex_name: str) -> Optional[Dict[str, Any]]:
+    """Price/area statistics and price histogram in a single aggregate query.
+
+    Returns None when the complex has no active listings.
+    """
+    if analytics_snapshot.enabled():
+        snapshot = analytics_snapshot.snapshot
+        return snapshot.get(db).complex_statistics(snapshot.complexes.code(complex_name), PRICE_RANGES)
+    
+    price_per_sqm = case((Property.area_sqm > 0, Property.price / Property.area_sqm))
+    area = case((Property.area_sqm > 0, Property.area_sqm))
+    is_postgres = db.get_bind().dialect.name == "postgresql"
+
+    columns = [
+        func.count(Property.id).label("total_count"),
+        func.avg(Property.price).label("avg_price"),
+        func.min(Property.price).label("min_price"),
+        func.max(Property.price).label("max_price"),
+        func.avg(price_per_sqm).label("avg_price_per_sqm"),
+        func.min(price_per_sqm).label("min_price_per_sqm"),
+        func.max(price_per_sqm).label("max_price_per_sqm"),
+        func.avg(area).label("avg_area"),
+    ]
+    columns += [_bucket(r).label(f"bucket_{i}") for i, r in enumerate(PRICE_RANGES)]
+    if is_postgres:
+        columns.append(func.percentile_cont(0.5).within_group(Property.price).label("median_price"))
+
+    row = _scope(db.query(*columns), complex_name).one()
+    if not row.total_count:
+        return None
+
+    median = row.median_price if is_postgres else _median_price(db, complex_name, row.total_count)
+    total = row.total_count
+
+    return {
+        "statistics": {
+            "total_count": total,
+            "avg_price": round(row.avg_price),
+            "min_price": row.min_price,
+            "max_price": row.max_price,
+            "median_price": median,
+            "avg_price_per_sqm": round(row.avg_price_per_sqm or 0),
+            "min_price_per_sqm": round(row.min_price_per_sqm or 0),
+            "max_price_per_sqm": round(row.max_price_per_sqm or 0),
+            "avg_area": round(row.avg_area or 0),
+        },
+        "price_distribution": [
+            {
+                "range": range_info["label"],
+                "count": getattr(row, f"bucket_{i}") or 0,
+                "percentage": round((getattr(row, f"bucket_{i}") or 0) / total * 100, 1),
+            }
+            for i, range_info in enumerate(PRICE_RANGES)
+        ],
+    }
+
+
+def get_distributions(db: Session, complex_name: str) -> Dict[str, Dict[str, int]]:
+    """Room and source distributions from one GROUP BY (rooms, source)."""
+    if analytics_snapshot.enabled():
+        snapshot = analytics_snapshot.snapshot
+        columns = snapshot.get(db)
+        code = snapshot.complexes.code(complex_name)
+        mask = columns.complex == code if code is not None else np.zeros(len(columns), dtype=bool)
+        rooms = columns.value_counts(mask, columns.rooms, snapshot.rooms)
+        sources = columns.value_counts(mask, columns.source, snapshot.sources)
+        return {
+            "room_distribution": {(k or "Не указано"): v for k, v in rooms.items()},
+            "source_distribution": {(k or "unknown"): v for k, v in sources.items()},
+        }
+    
+    rows = _scope(
+        db.query(Property.rooms, Property.source, func.count(Property.id)),
+        complex_name,
+    ).group_by(Property.rooms, Property.source).all()
+
+    room_distribution: Dict[str, int] = {}
+    source_distribution: Dict[str, int] = {}
+    for rooms, source, count in rows:
+        room = rooms or "Не указано"
+        room_distribution[room] = room_distribution.get(room, 0) + count
+        source = source or "unknown"
+        source_distribution[source] = source_distribution.get(source, 0) + count
+
+    return {
+        "room_distribution": room_distribution,
+        "source_distribution": source_distribution,
+    }
+
+
+def get_cheapest(db: Session, complex_name: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Cheapest listings of the complex, sorted and limited in SQL."""
+    rows = _scope(
+        db.query(
+            Property.id,
+            Property.title,
+            Property.price,
+            Property.area_sqm,
+            Property.rooms,
+            Property.source,
+        ),
+        complex_name,
+    ).order_by(Property.price).limit(limit).all()
+
+    return [
+        {
+            "id": p.id,
+            "title": p.title,
+            "price": p.price,
+            "area_sqm": p.area_sqm,
+            "rooms": p.rooms,
+            "price_per_sqm": round(p.price / p.area_sqm) if p.area_sqm > 0 else 0,
+            "source": p.source,
+        }
+        for p in rows
+    ]
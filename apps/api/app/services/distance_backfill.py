@@ -0,0 +1,132 @@
+"""Batch recomputation of ``Property.distances``.
+
+Rows with coordinates are streamed in primary-key order (keyset pagination),
+each chunk gets distances to every infrastructure type from one vectorized
+spatial-index call, and the results are written back with a single bulk
+UPDATE per chunk.
+
+Run ``python -m app.services.distance_backfill [--all]`` or
+POST /properties/maintenance/backfill-distances.
+"""
+import argparse
+import logging
+import time
+from typing import Callable, Dict, Any, Optional
+
+import numpy as np
+from sqlalchemy import String, cast, or_, update
+from sqlalchemy.orm import Session
+
+from app.core import cache
+from app.models.property import Property
+from app.services import spatial_index
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def _dirty_filter():
+    """Rows never enriched: distances NULL or empty."""
+    as_text = cast(Property.distances, String)
+    return or_(Property.distances.is_(None), as_text.in_(["{}", "null"]))
+
+
+def _log_progress(progress: Dict[str, Any]) -> None:
+    logger.info(
+        f"Distance backfill: {progress['processed']} rows, "
+        f"{progress['rows_per_second']:.0f} rows/s"
+    )
+
+
+def backfill_distances(
+    db: Session,
+    only_dirty: bool = True,
+    chunk_size: int = 1000,
+    on_progress: Optional[ProgressCallback] = _log_progress,
+) -> Dict[str, Any]:
+    """Recompute distances for dirty (or all) properties with coordinates.
+
+    Returns:
+        {"processed": int, "seconds": float, "rows_per_second": float,
+         "chunks": int, "infrastructure_points": int}
+    """
+    index = spatial_index.get_index(db)
+    started = time.perf_counter()
+    processed = chunks = 0
+    last_id = ""
+
+    while True:
+        query = db.query(Property.id, Property.latitude, Property.longitude).filter(
+            Property.latitude.isnot(None),
+            Property.longitude.isnot(None),
+            Property.id > last_id,
+        )
+        if only_dirty:
+            query = query.filter(_dirty_filter())
+        rows = query.order_by(Property.id).limit(chunk_size).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        ids = [row.id for row in rows]
+        meters = index.nearest_many(
+            np.fromiter((row.latitude for row in rows), float, len(rows)),
+            np.fromiter((row.longitude for row in rows), float, len(rows)),
+        )
+        # Round to tens of meters like GeoService.calculate_distances
+        rounded = {
+            key: np.round(values, -1).astype(int).tolist() if values is not None else None
+            for key, values in meters.items()
+        }
+        updates = [
+            {
+                "id": property_id,
+                "distances": {key: (values[i] if values is not None else None) for key, values in rounded.items()},
+            }
+            for i, property_id in enumerate(ids)
+        ]
+        db.execute(update(Property), updates)
+        db.commit()
+
+        processed += len(rows)
+        chunks += 1
+        if on_progress is not None:
+            elapsed = time.perf_counter() - started
+            on_progress({
+                "processed": processed,
+                "chunks": chunks,
+                "seconds": elapsed,
+                "rows_per_second": processed / elapsed if elapsed else 0.0,
+            })
+
+    if processed:
+        cache.invalidate(cache.PROPERTIES)
+    elapsed = time.perf_counter() - started
+    return {
+        "processed": processed,
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(processed / elapsed, 1) if elapsed else 0.0,
+        "infrastructure_points": index.size,
+    }
+
+
+if __name__ == "__main__":
+    from app.core.deps import SessionLocal
+
+    arg_parser = argparse.ArgumentParser(description="Recompute Property.distances")
+    arg_parser.add_argument("--all", action="store_true", help="recompute every row, not only empty ones")
+    arg_parser.add_argument("--chunk-size", type=int, default=1000)
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        result = backfill_distances(session, only_dirty=not args.all, chunk_size=args.chunk_size)
+        print(
+            f"Updated {result['processed']} properties in {result['seconds']}s "
+            f"({result['rows_per_second']} rows/s)"
+        )
+    finally:
+        session.close()
@@ -0,0 +1,161 @@
+"""Materialized district analytics.
+
+District statistics are stored in the ``district_stats`` table and refreshed
+incrementally from ``property_service`` writes, so /heatmap/districts is a
+single indexed read instead of a full scan grouped in Python. The table is
+built at startup when empty (``build_if_empty``) and rebuilt by
+POST /heatmap/districts/refresh; reads never write.
+"""
+from collections import defaultdict
+from typing import Iterable, List, Dict, Any, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.district import District
+from app.models.district_stats import DistrictStats
+from app.models.property import Property
+
+DEFAULT_DISTRICT = "Сочи"
+DEFAULT_CENTER = (43.585, 39.720)
+
+_STAT_COLUMNS = (
+    Property.address,
+    Property.price,
+    Property.area_sqm,
+    Property.latitude,
+    Property.longitude,
+)
+
+
+def district_key(address: Optional[str]) -> str:
+    """Extract district from address (last comma-separated part)."""
+    address_parts = address.split(",") if address else []
+    return address_parts[-1].strip() if len(address_parts) > 1 else DEFAULT_DISTRICT
+
+
+def _active_rows(db: Session):
+    return db.query(*_STAT_COLUMNS).filter(
+        Property.is_active == True,
+        Property.latitude.isnot(None),
+    )
+
+
+def _compute(rows) -> Dict[str, Any]:
+    """Aggregate (address, price, area, lat, lon) rows of one district."""
+    prices = [r.price for r in rows]
+    areas = [r.area_sqm for r in rows if r.area_sqm and r.area_sqm > 0]
+    price_per_sqm = [r.price / r.area_sqm for r in rows if r.area_sqm and r.area_sqm > 0]
+    lats = [r.latitude for r in rows if r.latitude]
+    lngs = [r.longitude for r in rows if r.longitude]
+
+    return {
+        "count": len(rows),
+        "avg_price": sum(prices) / len(prices) if prices else 0,
+        "min_price": min(prices) if prices else 0,
+        "max_price": max(prices) if prices else 0,
+        "median_price": sorted(prices)[len(prices) // 2] if prices else 0,
+        "avg_price_per_sqm": sum(price_per_sqm) / len(price_per_sqm) if price_per_sqm else 0,
+        "avg_area": sum(areas) / len(areas) if areas else 0,
+        "center_lat": sum(lats) / len(lats) if lats else DEFAULT_CENTER[0],
+        "center_lng": sum(lngs) / len(lngs) if lngs else DEFAULT_CENTER[1],
+    }
+
+
+def _store(db: Session, name: str, values: Optional[Dict[str, Any]]) -> None:
+    """Upsert (or drop when empty) a stats row and mirror it into District."""
+    stats = db.get(DistrictStats, name)
+    if not values or not values["count"]:
+        if stats is not None:
+            db.delete(stats)
+        count, avg_price_sqm = 0, None
+    else:
+        if stats is None:
+            stats = DistrictStats(district=name)
+            db.add(stats)
+        for field, value in values.items():
+            setattr(stats, field, value)
+        count, avg_price_sqm = values["count"], round(values["avg_price_per_sqm"])
+
+    db.query(District).filter(District.name == name).update(
+        {District.objects_count: count, District.avg_price_sqm: avg_price_sqm},
+        synchronize_session=False,
+    )
+
+
+def refresh_districts(db: Session, names: Iterable[str]) -> None:
+    """Recompute statistics for the given districts only.
+
+    Candidate rows are narrowed in SQL by address substring, then matched exactly
+    with district_key(). The leading-wildcard LIKE cannot use an index, so this
+    is one scan of active rows per district; accepted because a write touches
+    one or two districts and the scan reads five narrow columns. Changes are
+    flushed, not committed — callers commit together with the property write.
+    """
+    for name in {n for n in names if n}:
+        escaped = name.replace("%", r"\%").replace("_", r"\_")
+        candidates = Property.address.like(f"%{escaped}%", escape="\\")
+        if name == DEFAULT_DISTRICT:
+            candidates = or_(candidates, ~Property.address.contains(","))
+        rows = [r for r in _active_rows(db).filter(candidates) if district_key(r.address) == name]
+        _store(db, name, _compute(rows) if rows else None)
+    db.flush()
+
+
+def refresh_for_addresses(db: Session, addresses: Iterable[Optional[str]]) -> None:
+    """Refresh districts affected by writes to properties with these addresses."""
+    refresh_districts(db, {district_key(a) for a in addresses})
+
+
+def refresh_all(db: Session) -> int:
+    """Rebuild the whole table (scheduled job). Returns number of districts."""
+    groups: Dict[str, list] = defaultdict(list)
+    for row in _active_rows(db).yield_per(1000):
+        groups[district_key(row.address)].append(row)
+
+    stale = {name for (name,) in db.query(DistrictStats.district)} - set(groups)
+    for name in stale:
+        _store(db, name, None)
+    for name, rows in groups.items():
+        _store(db, name, _compute(rows))
+
+    db.commit()
+    return len(groups)
+
+
+def build_if_empty(db: Session) -> int:
+    """Build the table on first startup after deploy. Returns districts built.
+
+    Several workers may start at once; the losers of the insert race roll back.
+    """
+    if db.query(DistrictStats.district).first() is not None or _active_rows(db).first() is None:
+        return 0
+    try:
+        return refresh_all(db)
+    except IntegrityError:
+        db.rollback()
+        return 0
+
+
+def get_district_stats(db: Session) -> List[Dict[str, Any]]:
+    """Read materialized district analytics, sorted by count descending."""
+    rows = db.query(DistrictStats).order_by(DistrictStats.count.desc()).all()
+
+    return [
+        {
+            "district": row.district,
+            "count": row.count,
+            "avg_price": round(row.avg_price or 0),
+            "min_price": row.min_price or 0,
+            "max_price": row.max_price or 0,
+            "median_price": row.median_price or 0,
+            "avg_price_per_sqm": round(row.avg_price_per_sqm or 0),
+            "avg_area": round(row.avg_area or 0),
+            "center": {
+                "lat": row.center_lat,
+                "lng": row.center_lng,
+            },
+        }
+        for row in rows
+    ]
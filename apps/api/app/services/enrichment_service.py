@@ -0,0 +1,196 @@
+"""Background enrichment of saved properties.
+
+Admin saves no longer wait for network geocoding or infrastructure distances:
+``property_service`` resolves coordinates from the geocoding cache only, marks
+the row ``enrichment_status="pending"`` and enqueues it here. A worker thread
+geocodes missing coordinates, computes distances and updates the row.
+
+When the address changes and the cache misses, the row keeps the coordinates
+of the old address (``location_stale``) until the new one is geocoded. A
+provider failure (timeout, 5xx, no provider configured) leaves the row
+pending and retries it with exponential backoff; only an address the provider
+does not know ends up ``failed``. Rows are claimed with a conditional UPDATE
+of ``enrichment_retry_at`` (a lease), so with several API processes each row
+is enriched by one of them.
+"""
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.core import cache
+from app.core.config import settings
+from app.core.deps import SessionLocal
+from app.models.property import Property
+from app.services import district_stats_service
+from app.services.geo_service import GeoService
+from app.services.geocoder import GeocodingError, geocoder
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"  # Address could not be geocoded
+
+LEASE_SECONDS = 300  # A crashed worker's rows are reclaimed after this
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 6 * 3600
+CLAIM_BATCH = 100
+
+
+def _claimable(now: datetime):
+    return and_(
+        Property.enrichment_status == PENDING,
+        or_(Property.enrichment_retry_at.is_(None), Property.enrichment_retry_at <= now),
+    )
+
+
+def claim(db: Session, property_id: str) -> bool:
+    """Lease a pending property for enrichment; False if another worker holds it or it is not due."""
+    now = datetime.utcnow()
+    claimed = db.query(Property).filter(Property.id == property_id, _claimable(now)).update(
+        {Property.enrichment_retry_at: now + timedelta(seconds=LEASE_SECONDS)},
+        synchronize_session=False,
+    )
+    db.commit()
+    return bool(claimed)
+
+
+def claim_due(db: Session, limit: int = CLAIM_BATCH) -> List[str]:
+    """Lease up to ``limit`` pending properties that are due, oldest first."""
+    candidates = [
+        property_id for (property_id,) in db.query(Property.id)
+        .filter(_claimable(datetime.utcnow()))
+        .order_by(Property.updated_at)
+        .limit(limit)
+    ]
+    return [property_id for property_id in candidates if claim(db, property_id)]
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before retry number ``attempts``: 1, 2, 4 ... minutes, at most 6 hours."""
+    return min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+
+
+def enrich(db: Session, property_id: str) -> Optional[str]:
+    """Geocode and compute distances for one property. Returns the new status."""
+    prop = db.get(Property, property_id)
+    if prop is None or prop.enrichment_status != PENDING:
+        return None
+
+    status = DONE
+    located = prop.latitude is not None and prop.longitude is not None
+    if (not located or prop.location_stale) and prop.address:
+        try:
+            coords = geocoder.geocode(prop.address, db)
+        except GeocodingError as e:
+            # Provider unavailable: keep the row (and its old location) pending
+            prop.enrichment_attempts += 1
+            delay = retry_delay(prop.enrichment_attempts)
+            prop.enrichment_retry_at = datetime.utcnow() + timedelta(seconds=delay)
+            db.commit()
+            logger.warning(f"Geocoding of {property_id} failed, retry in {delay:.0f}s: {e}")
+            return PENDING
+        if coords:
+            prop.latitude, prop.longitude = coords
+            located = True
+        else:
+            # Unknown address: a stale location stays until an admin fixes it
+            status = FAILED
+        prop.location_stale = False
+
+    if located:
+        try:
+            prop.distances = GeoService.calculate_distances(db, prop.latitude, prop.longitude)
+        except Exception as e:
+            logger.warning(f"Failed to calculate distances for {property_id}: {e}")
+    else:
+        status = FAILED
+    prop.enrichment_status = status
+    prop.enrichment_attempts = 0
+    prop.enrichment_retry_at = None
+
+    db.flush()
+    district_stats_service.refresh_for_addresses(db, [prop.address])
+    db.commit()
+    cache.invalidate(cache.PROPERTIES)
+    return prop.enrichment_status
+
+
+class EnrichmentWorker:
+    """Daemon thread enriching pending properties.
+
+    IDs enqueued by this process are handled right away; the table is polled
+    every ``poll_seconds`` for the rest (rows saved by other processes, left
+    over by a restart or due for a retry). Every row is claimed first.
+    """
+
+    def __init__(self, session_factory=SessionLocal, poll_seconds: float = 30.0):
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="enrichment-worker", daemon=True)
+        self._thread.start()
+        logger.info("Enrichment worker started")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if not self.running:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def enqueue(self, property_id: str) -> None:
+        """Schedule a property (when stopped, polling picks it up from the table)."""
+        if self.running:
+            self._queue.put(property_id)
+
+    def _run(self) -> None:
+        next_poll = 0.0
+        while True:
+            if time.monotonic() >= next_poll:
+                claimed = self._enrich_claimed(claim_due)
+                # A full batch means more rows are due: poll again right away
+                next_poll = 0.0 if claimed >= CLAIM_BATCH else time.monotonic() + self.poll_seconds
+            try:
+                property_id = self._queue.get(timeout=max(next_poll - time.monotonic(), 0))
+            except queue.Empty:
+                continue
+            if property_id is None:
+                break
+            self._enrich_claimed(lambda db: [property_id] if claim(db, property_id) else [])
+
+    def _enrich_claimed(self, claim_ids: Callable[[Session], List[str]]) -> int:
+        db = self.session_factory()
+        try:
+            property_ids = claim_ids(db)
+            for property_id in property_ids:
+                try:
+                    enrich(db, property_id)
+                except Exception:
+                    db.rollback()
+                    logger.exception(f"Enrichment of {property_id} failed")
+            return len(property_ids)
+        except Exception:
+            db.rollback()
+            logger.exception("Claiming pending properties failed")
+            return 0
+        finally:
+            db.close()
+
+
+worker = EnrichmentWorker(poll_seconds=settings.ENRICHMENT_POLL_SECONDS)
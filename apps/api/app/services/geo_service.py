@@ -1,95 +1,126 @@
+import math
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, text
-from app.models.infrastructure import Infrastructure, InfraType
+from sqlalchemy import func, cast, literal_column, and_, select, table, column
+from sqlalchemy.sql import ColumnElement
 from geoalchemy2 import Geography
 from typing import Dict, Optional, Tuple
-import json
-from urllib.request import Request, urlopen
-from urllib.parse import urlencode
+from app.models.geography import GEOG_COLUMN, RTREE_TABLES
+from app.services import spatial_index
+from app.services.geocoder import GeocodingError, geocoder
+
+# (west, south, east, north) in degrees
+BBox = Tuple[float, float, float, float]
+
+METERS_PER_DEGREE = 111_320.0
+
 
 class GeoService:
     @staticmethod
     def geocode(address: str) -> Optional[Tuple[float, float]]:
         """
-        Geocodes address string to (latitude, longitude) using Photon (OSM).
+        Geocodes address string to (latitude, longitude) through the cached geocoder.
+        None when the address is not found or the provider gave no answer.
         """
         try:
-            url = "https://photon.komoot.io/api/"
-            params = {'q': address, 'limit': 1}
-            full_url = f"{url}?{urlencode(params)}"
-            req = Request(full_url, headers={"User-Agent": "EstateAnalytics/1.0"})
-            
-            with urlopen(req, timeout=5) as response:
-                data = json.load(response)
-                if data and data.get("features"):
-                    coords = data["features"][0]["geometry"]["coordinates"]
-                    # Photon returns [lon, lat]
-                    return coords[1], coords[0]
-        except Exception as e:
-            print(f"Geocode error for '{address}': {e}")
+            return geocoder.geocode(address)
+        except GeocodingError:
             return None
 
     @staticmethod
-    def calculate_distances(db: Session, lat: float, lon: float) -> Dict[str, int]:
+    def calculate_distances(db: Session, lat: float, lon: float) -> Dict[str, Optional[int]]:
         """
         Calculates distances (in meters) from a point (lat, lon) to nearest key infrastructure.
-        Returns: {"sea": 800, "airport": 15000, "school": 450}
+        Returns: {"sea": 800, "airport": 15000, "school": 450, ...}; None for types without data.
+
+        Served by the in-memory spatial index (same on SQLite and PostgreSQL).
         """
-        distances = {}
-        
-        # 1. Define types to check
-        target_types = {
-            InfraType.SCHOOL: "school",
-            InfraType.AIRPORT: "airport",
-            InfraType.SEA: "sea", # Will search for points marked as SEA type
-            InfraType.PARK: "park",
-            InfraType.SHOP: "shop",
-            InfraType.HOSPITAL: "hospital"
-        }
-
-        # 2. Iterate and find nearest for each type
-        # Using raw SQL for efficiency with PostGIS operators if needed, 
-        # or SQLAlchemy with geoalchemy2 if configured. 
-        # For simplicity without installing extra deps yet, we can use the Haversine formula 
-        # OR simple Euclidean if PostGIS isn't fully active in Python env (though DB has it).
-        # ideally: db.query(Infrastructure).order_by(Infrastructure.location.distance_box(point)).first()
-        
-        # Let's assume we use a raw SQL query for maximum compatibility with the new PostGIS image
-        # ST_DistanceSphere returns meters.
-        
-        try:
-            # Check if using SQLite (which doesn't support ST_DistanceSphere by default without extensions)
-            dialect = db.bind.dialect.name
-            if dialect == 'sqlite':
-                # Return dummy distances for SQLite to confirm functionality without errors
-                return {k: 500 + i*100 for i, k in enumerate(target_types.values())}
-
-            for type_enum, key_name in target_types.items():
-                # Find ONE nearest item of this type
-                # "SELECT * FROM infrastructure WHERE type = :type ORDER BY ST_DistanceSphere(ST_MakePoint(longitude, latitude), ST_MakePoint(:lon, :lat)) LIMIT 1"
-                
-                stmt = text("""
-                    SELECT 
-                        ST_DistanceSphere(
-                            ST_MakePoint(longitude, latitude), 
-                            ST_MakePoint(:lon, :lat)
-                        ) as distance_meters
-                    FROM infrastructure 
-                    WHERE type = :type_val
-                    ORDER BY distance_meters ASC
-                    LIMIT 1
-                """)
-                
-                result = db.execute(stmt, {"lon": lon, "lat": lat, "type_val": type_enum.value}).fetchone()
-                
-                if result:
-                     # Round to tens of meters
-                    distances[key_name] = int(round(result[0], -1))
-                else:
-                    distances[key_name] = None
-                    
-        except Exception as e:
-            print(f"Geo calc error: {e}")
-            # Fallback (return empty or Partial)
-            
-        return distances
+        return spatial_index.get_index(db).nearest(lat, lon)
+
+    # --- Spatial query helpers ---------------------------------------------
+    # On PostgreSQL they use the generated ``geog`` column and its GiST index;
+    # on SQLite the R-tree table and the ``haversine_m`` function
+    # (see app.models.geography).
+
+    @staticmethod
+    def has_postgis(db: Session) -> bool:
+        return db.get_bind().dialect.name == "postgresql"
+
+    @staticmethod
+    def geography(model) -> ColumnElement:
+        """The ``geog`` column of a mapped table (PostgreSQL only)."""
+        return literal_column(f"{model.__tablename__}.{GEOG_COLUMN}", Geography("POINT", 4326))
+
+    @staticmethod
+    def point(lat: float, lon: float) -> ColumnElement:
+        return cast(func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326), Geography)
+
+    @staticmethod
+    def _degree_box(lat: float, lon: float, radius_m: float) -> BBox:
+        """Bounding box of a circle, in degrees."""
+        dlat = radius_m / METERS_PER_DEGREE
+        dlon = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        return lon - dlon, lat - dlat, lon + dlon, lat + dlat
+
+    @staticmethod
+    def _rtree_filter(model, bbox: BBox) -> Optional[ColumnElement]:
+        """``rowid IN (R-tree search)`` when the table has an R-tree."""
+        name = model.__tablename__
+        if name not in RTREE_TABLES:
+            return None
+        west, south, east, north = bbox
+        rtree = table(f"{name}_rtree", column("id"), column("min_lat"), column("max_lat"), column("min_lon"), column("max_lon"))
+        candidates = select(rtree.c.id).where(
+            rtree.c.max_lat >= south,
+            rtree.c.min_lat <= north,
+            rtree.c.max_lon >= west,
+            rtree.c.min_lon <= east,
+        )
+        return literal_column(f"{name}.rowid").in_(candidates)
+
+    @staticmethod
+    def within_bbox(db: Session, model, bbox: BBox) -> ColumnElement:
+        """Filter: rows inside (west, south, east, north)."""
+        west, south, east, north = bbox
+        if GeoService.has_postgis(db):
+            envelope = cast(func.ST_MakeEnvelope(west, south, east, north, 4326), Geography)
+            return GeoService.geography(model).op("&&")(envelope)
+        exact = and_(model.latitude.between(south, north), model.longitude.between(west, east))
+        # R-tree stores 32-bit floats, so its answer is a superset refined by the exact range
+        rtree = GeoService._rtree_filter(model, bbox)
+        return and_(rtree, exact) if rtree is not None else exact
+
+    @staticmethod
+    def distance(db: Session, model, lat: float, lon: float) -> ColumnElement:
+        """Distance in meters from (lat, lon) as a SQL expression."""
+        if GeoService.has_postgis(db):
+            return func.ST_Distance(GeoService.geography(model), GeoService.point(lat, lon))
+        return func.haversine_m(model.latitude, model.longitude, lat, lon)
+
+    @staticmethod
+    def within_radius(db: Session, model, lat: float, lon: float, radius_m: float) -> ColumnElement:
+        """Filter: rows within radius_m meters of (lat, lon)."""
+        if GeoService.has_postgis(db):
+            return func.ST_DWithin(GeoService.geography(model), GeoService.point(lat, lon), radius_m)
+        return and_(
+            GeoService.within_bbox(db, model, GeoService._degree_box(lat, lon, radius_m)),
+            GeoService.distance(db, model, lat, lon) <= radius_m,
+        )
+
+    @staticmethod
+    def distance_order(db: Session, model, lat: float, lon: float) -> ColumnElement:
+        """ORDER BY expression, nearest first (k-NN ``<->`` on the GiST index on PostgreSQL)."""
+        if GeoService.has_postgis(db):
+            return GeoService.geography(model).op("<->")(GeoService.point(lat, lon))
+        return GeoService.distance(db, model, lat, lon)
+
+    @staticmethod
+    def nearest(db: Session, model, lat: float, lon: float, limit: int = 10, radius_m: Optional[float] = None, query=None):
+        """Query of the ``limit`` rows nearest to (lat, lon), optionally within radius_m.
+
+        ``query`` narrows the candidates (e.g. active properties only).
+        """
+        query = query if query is not None else db.query(model)
+        query = query.filter(model.latitude.isnot(None), model.longitude.isnot(None))
+        if radius_m is not None:
+            query = query.filter(GeoService.within_radius(db, model, lat, lon, radius_m))
+        return query.order_by(GeoService.distance_order(db, model, lat, lon)).limit(limit)
@@ -0,0 +1,362 @@
+"""Unified geocoder with a persistent, normalized-address cache.
+
+Lookups go through three layers before a provider (2GIS or Photon) is called:
+
+1. exact match on the normalized address in memory (seed addresses from
+   ``geocoding_service.SOCHI_ADDRESS_CACHE`` plus every positive row of
+   ``geocode_cache``);
+2. the ``geocode_cache`` row itself, which also stores negative results
+   until they expire;
+3. a token index for partial matches (one address's tokens are a subset of
+   the other's), replacing the linear substring scan over all keys.
+
+Provider results are written back to ``geocode_cache``, so they survive
+restarts and are shared between workers. With a caller's session the row is
+written in a SAVEPOINT and committed by the caller; otherwise in a session of
+its own.
+
+``None`` means the address was not found; when no answer could be obtained
+(provider disabled, timeout, HTTP error) ``GeocodingError`` is raised instead,
+so callers can retry later.
+"""
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Optional, Tuple, Dict, Set, Iterator, Any
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.deps import SessionLocal
+from app.models.geocode_cache import GeocodeCache
+from app.services.geocoding_service import DGIS_API_KEY, GEOCODER_URL, SOCHI_ADDRESS_CACHE
+
+logger = logging.getLogger(__name__)
+
+Coords = Tuple[float, float]
+
+
+class GeocodingError(Exception):
+    """The provider gave no answer; unlike a None result, a retry may succeed."""
+
+PHOTON_URL = "https://photon.komoot.io/api/"
+HEADERS = {"User-Agent": "EstateAnalytics/1.0"}
+
+# Street-type spellings collapsed to one token
+ABBREVIATIONS = {
+    "улица": "ул", "ул": "ул",
+    "проспект": "пр", "просп": "пр", "пр-т": "пр", "пр-кт": "пр", "пр": "пр",
+    "переулок": "пер", "пер": "пер",
+    "шоссе": "ш", "ш": "ш",
+    "бульвар": "б-р", "бул": "б-р", "б-р": "б-р",
+    "набережная": "наб", "наб": "наб",
+    "площадь": "пл", "пл": "пл",
+    "микрорайон": "мкр", "мкрн": "мкр", "мкр": "мкр",
+    "проезд": "пр-д", "пр-д": "пр-д",
+    "тупик": "туп", "туп": "туп",
+    "поселок": "пос", "пос": "пос",
+}
+
+# Tokens that do not help to tell Sochi addresses apart
+NOISE_TOKENS = {"россия", "рф", "краснодарский", "край", "г", "город", "д", "дом", "сочи"}
+
+_TOKEN_RE = re.compile(r"[0-9a-zа-я]+(?:[-/][0-9a-zа-я]+)*")
+
+
+def address_tokens(address: str) -> Tuple[str, ...]:
+    """Split an address into normalized tokens (sorted, unique)."""
+    raw = _TOKEN_RE.findall(address.lower().replace("ё", "е"))
+    tokens = []
+    for token in raw:
+        # "105 Б" -> "105б"
+        if len(token) == 1 and token.isalpha() and tokens and tokens[-1].isdigit():
+            tokens[-1] += token
+            continue
+        tokens.append(token)
+    normalized = {ABBREVIATIONS.get(t, t) for t in tokens} - NOISE_TOKENS
+    return tuple(sorted(normalized))
+
+
+def normalize_address(address: str) -> str:
+    """Cache key of an address: "ул. Навагинская, 9" == "Навагинская улица 9"."""
+    return " ".join(address_tokens(address))
+
+
+class AddressIndex:
+    """Inverted token index over normalized addresses for partial matching."""
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = {}
+
+    def add(self, key: str) -> None:
+        for token in key.split():
+            self._postings.setdefault(token, set()).add(key)
+
+    def match(self, key: str) -> Optional[str]:
+        """Closest indexed key whose tokens contain, or are contained in, the query.
+
+        Prefers the most specific indexed address contained in the query
+        (e.g. the query adds a district), then the least specific one that
+        contains the query (e.g. the query lacks the house number).
+        """
+        tokens = key.split()
+        if len(tokens) < 2:
+            return None
+        postings = [self._postings.get(t, set()) for t in tokens]
+
+        overlap: Counter = Counter()
+        for keys in postings:
+            overlap.update(keys)
+        contained = [k for k, n in overlap.items() if n >= 2 and n == len(k.split())]
+        if contained:
+            return max(contained, key=lambda k: (len(k.split()), k))
+
+        containing = set.intersection(*postings) if all(postings) else set()
+        if containing:
+            return min(containing, key=lambda k: (len(k.split()), k))
+        return None
+
+
+class Geocoder:
+    """Cached geocoding for sync (property_service) and async (parsers) callers."""
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self.metrics: Counter = Counter()
+        self._entries: Dict[str, Coords] = {}
+        self._index = AddressIndex()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # --- cache -----------------------------------------------------------
+
+    @contextmanager
+    def _session(self, db: Optional[Session]) -> Iterator[Session]:
+        if db is not None:
+            yield db
+            return
+        session = self.session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def _remember(self, key: str, coords: Coords) -> None:
+        if key and key not in self._entries:
+            self._index.add(key)
+        self._entries[key] = coords
+
+    def _load(self, db: Session) -> None:
+        """Fill the in-memory layer once per process."""
+        with self._lock:
+            if self._loaded:
+                return
+            for address, coords in SOCHI_ADDRESS_CACHE.items():
+                self._remember(normalize_address(address), coords)
+            rows = db.query(GeocodeCache.normalized, GeocodeCache.latitude, GeocodeCache.longitude).filter(
+                GeocodeCache.latitude.isnot(None)
+            )
+            for key, lat, lon in rows:
+                self._remember(key, (lat, lon))
+            self._loaded = True
+
+    def reset(self) -> None:
+        """Drop the in-memory layer and metrics (reloaded on next lookup)."""
+        with self._lock:
+            self._entries.clear()
+            self._index = AddressIndex()
+            self._loaded = False
+            self.metrics.clear()
+
+    def _count(self, metric: str) -> None:
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def _lookup(self, db: Session, key: str) -> Tuple[str, Optional[Coords]]:
+        """Return (outcome, coords); outcome is hits, negative_hits, partial_hits or misses."""
+        self._load(db)
+        if not key:
+            return "misses", None
+        coords = self._entries.get(key)
+        if coords is not None:
+            return "hits", coords
+
+        # Written by another worker, or a negative result
+        row = db.get(GeocodeCache, key)
+        if row is not None:
+            if row.latitude is not None:
+                with self._lock:
+                    self._remember(key, (row.latitude, row.longitude))
+                return "hits", (row.latitude, row.longitude)
+            if row.expires_at is None or row.expires_at > datetime.utcnow():
+                return "negative_hits", None
+
+        with self._lock:
+            partial = self._index.match(key)
+            if partial is not None:
+                return "partial_hits", self._entries[partial]
+        return "misses", None
+
+    def lookup(self, address: str, db: Optional[Session] = None) -> Optional[Coords]:
+        """Cache-only geocoding (no provider call)."""
+        with self._session(db) as session:
+            outcome, coords = self._lookup(session, normalize_address(address))
+        self._count(outcome)
+        return coords
+
+    def _store(
+        self, db: Session, key: str, address: str, coords: Optional[Coords], provider: str, commit: bool
+    ) -> None:
+        """Write a provider result; ``commit`` only for sessions opened here.
+
+        A caller's session gets the row in a SAVEPOINT: its pending work is
+        neither committed nor expired, and the caller's commit persists it.
+        """
+        expires_at = None
+        if coords is None:
+            expires_at = datetime.utcnow() + timedelta(hours=settings.GEOCODER_NEGATIVE_TTL_HOURS)
+        entry = GeocodeCache(
+            normalized=key,
+            address=address[:500],
+            latitude=coords[0] if coords else None,
+            longitude=coords[1] if coords else None,
+            provider=provider,
+            created_at=datetime.utcnow(),
+            expires_at=expires_at,
+        )
+        try:
+            if commit:
+                db.merge(entry)
+                db.commit()
+            else:
+                with db.begin_nested():
+                    db.merge(entry)
+        except IntegrityError:
+            # Stored concurrently by another worker
+            if commit:
+                db.rollback()
+        if coords is not None:
+            with self._lock:
+                self._remember(key, coords)
+
+    # --- providers -------------------------------------------------------
+
+    @staticmethod
+    def provider() -> str:
+        if settings.GEOCODER_PROVIDER != "auto":
+            return settings.GEOCODER_PROVIDER
+        return "2gis" if DGIS_API_KEY != "demo" else "photon"
+
+    @staticmethod
+    def _request(provider: str, address: str, city: str) -> Tuple[str, Dict[str, Any]]:
+        if provider == "2gis":
+            return GEOCODER_URL, {
+                "q": f"{city}, {address}",
+                "key": DGIS_API_KEY,
+                "fields": "items.point",
+                "locale": "ru_RU",
+            }
+        query = address if city.lower() in address.lower() else f"{address}, {city}"
+        return PHOTON_URL, {"q": query, "limit": 1}
+
+    @staticmethod
+    def _parse(provider: str, data: Dict[str, Any]) -> Optional[Coords]:
+        if provider == "2gis":
+            items = data.get("result", {}).get("items", [])
+            if items and "point" in items[0]:
+                return items[0]["point"]["lat"], items[0]["point"]["lon"]
+            return None
+        features = data.get("features") or []
+        if features:
+            lon, lat = features[0]["geometry"]["coordinates"][:2]  # GeoJSON order
+            return lat, lon
+        return None
+
+    def _cached(self, db: Session, address: str) -> Tuple[str, Optional[Coords], Optional[str]]:
+        """Return (key, cached coords, provider to call or None)."""
+        key = normalize_address(address)
+        outcome, coords = self._lookup(db, key)
+        self._count(outcome)
+        if outcome != "misses" or not key:
+            return key, coords, None
+        provider = self.provider()
+        if provider == "none":
+            raise GeocodingError("Geocoding provider is disabled")
+        self._count("provider_calls")
+        return key, None, provider
+
+    def _failed(self, address: str, error: Exception) -> GeocodingError:
+        # Transient failures are not cached
+        self._count("provider_errors")
+        logger.warning(f"Geocode error for '{address}': {error}")
+        return GeocodingError(f"Geocoding '{address}' failed: {error}")
+
+    def geocode(self, address: str, db: Optional[Session] = None, city: str = "Сочи") -> Optional[Coords]:
+        """Geocode with the cache, calling the provider synchronously on a miss.
+
+        Raises:
+            GeocodingError: If the provider is disabled or failed.
+        """
+        with self._session(db) as session:
+            key, coords, provider = self._cached(session, address)
+            if provider is None:
+                return coords
+            url, params = self._request(provider, address, city)
+            try:
+                response = httpx.get(url, params=params, headers=HEADERS, timeout=settings.GEOCODER_TIMEOUT_SECONDS)
+                response.raise_for_status()
+                coords = self._parse(provider, response.json())
+            except Exception as e:
+                raise self._failed(address, e) from e
+            self._store(session, key, address, coords, provider, commit=db is None)
+            return coords
+
+    async def geocode_async(self, address: str, db: Optional[Session] = None, city: str = "Сочи") -> Optional[Coords]:
+        """Async variant of geocode() for parsers.
+
+        Cache reads and writes run in the threadpool, so concurrent calls
+        must not share ``db`` (leave it unset to use a session per call).
+
+        Raises:
+            GeocodingError: If the provider is disabled or failed.
+        """
+        with self._session(db) as session:
+            key, coords, provider = await run_in_threadpool(self._cached, session, address)
+            if provider is None:
+                return coords
+            url, params = self._request(provider, address, city)
+            try:
+                async with httpx.AsyncClient(timeout=settings.GEOCODER_TIMEOUT_SECONDS) as client:
+                    response = await client.get(url, params=params, headers=HEADERS)
+                response.raise_for_status()
+                coords = self._parse(provider, response.json())
+            except Exception as e:
+                raise self._failed(address, e) from e
+            await run_in_threadpool(self._store, session, key, address, coords, provider, db is None)
+            return coords
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters since process start."""
+        with self._lock:
+            counts = {
+                name: self.metrics[name]
+                for name in ("hits", "partial_hits", "negative_hits", "misses", "provider_calls", "provider_errors")
+            }
+            entries = len(self._entries)
+        lookups = counts["hits"] + counts["partial_hits"] + counts["negative_hits"] + counts["misses"]
+        return {
+            **counts,
+            "lookups": lookups,
+            "hit_rate": round((lookups - counts["misses"]) / lookups, 3) if lookups else None,
+            "cached_addresses": entries,
+            "provider": self.provider(),
+        }
+
+
+geocoder = Geocoder()
@@ -4,7 +4,6 @@
 """
 import os
 import httpx
-from functools import lru_cache
 from typing import Optional
 import logging
 
@@ -17,7 +16,10 @@ DGIS_API_KEY = os.getenv("DGIS_API_KEY", "demo")
 # Базовый URL 2GIS Geocoder API
 GEOCODER_URL = "https://catalog.api.2gis.com/3.0/items/geocode"
 
-# Кэш известных адресов Сочи (для работы без API)
+# Центр Сочи (fallback, если адрес не найден)
+SOCHI_CENTER = (43.5855, 39.7231)
+
+# Известные адреса Сочи: начальное заполнение кэша геокодера (app.services.geocoder)
 SOCHI_ADDRESS_CACHE: dict[str, tuple[float, float]] = {
     # Центральный район
     "ул. Орджоникидзе, 17": (43.5807, 39.7188),
@@ -56,67 +58,27 @@ async def geocode_address_2gis(
     address: str, 
     city: str = "Сочи"
 ) -> Optional[tuple[float, float]]:
-    """Геокодирует адрес через 2GIS API.
+    """Геокодирует адрес через общий кэширующий геокодер (app.services.geocoder).
     
     Args:
         address: Адрес для геокодирования (например, "ул. Орджоникидзе, 17")
         city: Город для поиска (по умолчанию Сочи)
     
     Returns:
-        Кортеж (latitude, longitude) или None если адрес не найден
+        Кортеж (latitude, longitude); центр Сочи, если адрес не найден
     """
-    # Сначала проверяем локальный кэш
-    if address in SOCHI_ADDRESS_CACHE:
-        logger.debug(f"Адрес найден в кэше: {address}")
-        return SOCHI_ADDRESS_CACHE[address]
-    
-    # Пробуем частичное совпадение
-    for cached_addr, coords in SOCHI_ADDRESS_CACHE.items():
-        if cached_addr in address or address in cached_addr:
-            logger.debug(f"Частичное совпадение: {address} -> {cached_addr}")
-            return coords
+    from app.services.geocoder import GeocodingError, geocoder
     
-    # Если демо-ключ — используем только кэш
-    if DGIS_API_KEY == "demo":
-        logger.warning(f"Демо-режим: адрес не найден в кэше: {address}")
-        # Возвращаем центр Сочи как fallback
-        return (43.5855, 39.7231)
-    
-    # Запрос к 2GIS API
     try:
-        full_address = f"{city}, {address}"
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(
-                GEOCODER_URL,
-                params={
-                    "q": full_address,
-                    "key": DGIS_API_KEY,
-                    "fields": "items.point",
-                    "locale": "ru_RU",
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                items = data.get("result", {}).get("items", [])
-                
-                if items and "point" in items[0]:
-                    point = items[0]["point"]
-                    lat, lon = point["lat"], point["lon"]
-                    
-                    # Добавляем в кэш для будущих запросов
-                    SOCHI_ADDRESS_CACHE[address] = (lat, lon)
-                    logger.info(f"Геокодирован: {address} -> ({lat}, {lon})")
-                    
-                    return (lat, lon)
-                    
-            logger.warning(f"Адрес не найден через API: {address}")
-            
-    except Exception as e:
-        logger.error(f"Ошибка геокодирования: {e}")
+        coords = await geocoder.geocode_async(address, city=city)
+    except GeocodingError:
+        coords = None
+    if coords:
+        return coords
     
     # Fallback: центр Сочи
-    return (43.5855, 39.7231)
+    logger.warning(f"Адрес не найден: {address}")
+    return SOCHI_CENTER
 
 
 async def search_items_2gis(
@@ -190,19 +152,12 @@ async def search_items_2gis(
 def geocode_address_sync(address: str, city: str = "Сочи") -> tuple[float, float]:
     """Синхронная версия геокодера (для seed.py).
     
-    Использует только локальный кэш без API-запросов.
+    Использует только кэш геокодера без API-запросов.
     """
-    # Точное совпадение
-    if address in SOCHI_ADDRESS_CACHE:
-        return SOCHI_ADDRESS_CACHE[address]
-    
-    # Частичное совпадение
-    for cached_addr, coords in SOCHI_ADDRESS_CACHE.items():
-        if cached_addr in address or address in cached_addr:
-            return coords
+    from app.services.geocoder import geocoder
     
     # Fallback: центр Сочи
-    return (43.5855, 39.7231)
+    return geocoder.lookup(address) or SOCHI_CENTER
 
 
 def get_random_sochi_location() -> tuple[float, float, str]:
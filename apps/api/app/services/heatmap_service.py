@@ -0,0 +1,208 @@
+"""Server-side clustering for the map heatmap.
+
+Aggregates active properties into grid cells inside a slippy-map tile
+(or an arbitrary bbox) so the frontend never has to download every listing.
+"""
+import math
+from typing import Optional, List, Dict, Any, Tuple
+
+from sqlalchemy import func, case, cast, Integer
+from sqlalchemy.orm import Session
+
+from app.models.property import Property
+from app.services import analytics_snapshot
+from app.services.geo_service import GeoService
+
+# (west, south, east, north) in degrees
+BBox = Tuple[float, float, float, float]
+
+MAX_ZOOM = 22
+# From this zoom level on, individual points are returned instead of clusters
+POINTS_MIN_ZOOM = 15
+# Grid resolution: cells per tile side
+CELLS_PER_TILE = 8
+# Safety cap for point mode
+MAX_POINTS = 2000
+
+
+def tile_bounds(z: int, x: int, y: int) -> BBox:
+    """Return (west, south, east, north) of a Web Mercator XYZ tile."""
+    n = 2 ** z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return west, south, east, north
+
+
+def parse_bbox(bbox: str) -> BBox:
+    """Parse "west,south,east,north" string.
+
+    Raises:
+        ValueError: If the string is not four floats in a valid order.
+    """
+    try:
+        west, south, east, north = (float(v) for v in bbox.split(","))
+    except ValueError as e:
+        raise ValueError("bbox must be 'west,south,east,north'") from e
+    if west >= east or south >= north:
+        raise ValueError("bbox must satisfy west < east and south < north")
+    return west, south, east, north
+
+
+def cell_size(zoom: int) -> float:
+    """Grid cell size in degrees for a zoom level."""
+    return 360.0 / (2 ** zoom) / CELLS_PER_TILE
+
+
+def _bbox_query(
+    db: Session,
+    columns: list,
+    bbox: BBox,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+):
+    """Select given columns for active properties inside bbox.
+
+    Served by the GiST index on ``geog`` on PostgreSQL, by
+    idx_property_location elsewhere.
+    """
+    query = db.query(*columns).filter(
+        Property.is_active == True,
+        GeoService.within_bbox(db, Property, bbox),
+    )
+    if min_price:
+        query = query.filter(Property.price >= min_price)
+    if max_price:
+        query = query.filter(Property.price <= max_price)
+    return query
+
+
+def get_clusters(
+    db: Session,
+    bbox: BBox,
+    zoom: int,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Aggregate properties inside bbox into grid cells.
+
+    Cells are anchored to the world origin, so the same listing always falls
+    into the same cell regardless of which tile requested it.
+    """
+    size = cell_size(zoom)
+    if analytics_snapshot.enabled():
+        return analytics_snapshot.snapshot.get(db).clusters(bbox, zoom, size, min_price, max_price)
+    
+    # CAST truncates toward zero; shifting by 180/90 keeps values positive
+    cell_x = cast((Property.longitude + 180.0) / size, Integer).label("cell_x")
+    cell_y = cast((Property.latitude + 90.0) / size, Integer).label("cell_y")
+    price_per_sqm = case((Property.area_sqm > 0, Property.price / Property.area_sqm))
+
+    rows = (
+        _bbox_query(
+            db,
+            [
+                cell_x,
+                cell_y,
+                func.count(Property.id).label("count"),
+                func.avg(Property.price).label("avg_price"),
+                func.avg(price_per_sqm).label("avg_price_per_sqm"),
+                func.avg(Property.latitude).label("lat"),
+                func.avg(Property.longitude).label("lng"),
+            ],
+            bbox,
+            min_price,
+            max_price,
+        )
+        .group_by(cell_x, cell_y)
+        .all()
+    )
+
+    return [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [row.lng, row.lat]},
+            "properties": {
+                "cluster": True,
+                "cell": f"{zoom}/{row.cell_x}/{row.cell_y}",
+                "count": row.count,
+                "avg_price": round(row.avg_price or 0),
+                "avg_price_per_sqm": round(row.avg_price_per_sqm or 0),
+            },
+        }
+        for row in rows
+    ]
+
+
+def get_points(
+    db: Session,
+    bbox: BBox,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    limit: int = MAX_POINTS,
+) -> List[Dict[str, Any]]:
+    """Return individual listings inside bbox (only the columns the map needs)."""
+    rows = _bbox_query(
+        db,
+        [
+            Property.id,
+            Property.title,
+            Property.price,
+            Property.area_sqm,
+            Property.rooms,
+            Property.marker_icon,
+            Property.latitude,
+            Property.longitude,
+        ],
+        bbox,
+        min_price,
+        max_price,
+    ).limit(limit).all()
+
+    return [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [row.longitude, row.latitude]},
+            "properties": {
+                "cluster": False,
+                "id": row.id,
+                "title": row.title,
+                "price": row.price,
+                "price_per_sqm": round(row.price / row.area_sqm) if row.area_sqm else 0,
+                "area_sqm": row.area_sqm,
+                "rooms": row.rooms,
+                "marker_icon": row.marker_icon,
+            },
+        }
+        for row in rows
+    ]
+
+
+def get_collection(
+    db: Session,
+    bbox: BBox,
+    zoom: int,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Build a FeatureCollection of clusters (low zoom) or points (high zoom)."""
+    if zoom >= POINTS_MIN_ZOOM:
+        mode = "points"
+        features = get_points(db, bbox, min_price, max_price)
+        total = len(features)
+    else:
+        mode = "clusters"
+        features = get_clusters(db, bbox, zoom, min_price, max_price)
+        total = sum(f["properties"]["count"] for f in features)
+
+    return {
+        "type": "FeatureCollection",
+        "features": features,
+        "metadata": {
+            "mode": mode,
+            "zoom": zoom,
+            "bbox": list(bbox),
+            "total": total,
+        },
+    }
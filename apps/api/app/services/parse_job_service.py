@@ -0,0 +1,385 @@
+"""Background parse jobs.
+
+Jobs are rows in ``parse_jobs``. A pool of asyncio workers started with the
+app claims queued jobs (and running ones whose heartbeat went stale, e.g. after
+a crash), crawls the pages and saves progress after every page, so an
+interrupted job resumes from ``last_completed_page + 1``. Re-fetched pages are
+harmless: listings are upserted by (source, source_id).
+"""
+import asyncio
+import logging
+from contextlib import aclosing
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.deps import SessionLocal
+from app.models.parse_job import ParseJob
+from app.models.property import Property
+from app.parsers import CianParser, AvitoParser, PageResult, crawl
+from app.schemas.parse_job import ParseJobCreate
+from app.schemas.property import PropertyCreate
+from app.services import property_service
+from app.services.geocoder import GeocodingError, geocoder
+
+logger = logging.getLogger(__name__)
+
+PARSERS = {
+    "cian": ("CIAN", CianParser),
+    "avito": ("Avito", AvitoParser),
+}
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+# Errors kept on a job row
+MAX_ERRORS = 50
+# Provider requests in flight per page
+GEOCODE_CONCURRENCY = 4
+
+
+def _located_source_ids(db: Session, source: str, source_ids: List[str]) -> Set[str]:
+    return {
+        source_id for (source_id,) in db.query(Property.source_id).filter(
+            Property.source == source,
+            Property.source_id.in_(source_ids),
+            Property.latitude.isnot(None),
+        )
+    }
+
+
+async def build_items(db: Session, source: str, properties: list, errors: List[str]) -> List[PropertyCreate]:
+    """Convert parsed listings of one page into PropertyCreate items.
+
+    Only listings not yet stored with coordinates are geocoded, up to
+    GEOCODE_CONCURRENCY at a time. Database work runs in the threadpool.
+    """
+    label = PARSERS[source][0]
+    source_ids = [p.source_id for p in properties if p.source_id]
+    located = await run_in_threadpool(_located_source_ids, db, source, source_ids) if source_ids else set()
+    semaphore = asyncio.Semaphore(GEOCODE_CONCURRENCY)
+
+    async def locate(prop) -> Tuple[Optional[float], Optional[float]]:
+        if (prop.latitude is not None and prop.longitude is not None) or prop.source_id in located:
+            return prop.latitude, prop.longitude
+        async with semaphore:
+            try:
+                # No session passed: concurrent lookups must not share ``db``
+                coords = await geocoder.geocode_async(prop.address, city="Сочи")
+            except GeocodingError:
+                coords = None
+        return coords or (prop.latitude, prop.longitude)
+
+    locations = await asyncio.gather(*(locate(prop) for prop in properties), return_exceptions=True)
+
+    items = []
+    for prop, location in zip(properties, locations):
+        try:
+            if isinstance(location, Exception):
+                errors.append(f"{label} geocode error: {str(location)[:100]}")
+                location = prop.latitude, prop.longitude
+            lat, lon = location
+
+            items.append(PropertyCreate(
+                title=prop.title,
+                description=prop.description,
+                price=prop.price,
+                currency=prop.currency,
+                address=prop.address,
+                latitude=lat,
+                longitude=lon,
+                area_sqm=prop.area_sqm,
+                rooms=prop.rooms,
+                floor=prop.floor,
+                total_floors=prop.total_floors,
+                source=source,
+                source_id=prop.source_id,
+                url=prop.url,
+                images=prop.images,
+                features=prop.features,
+            ))
+        except Exception as e:
+            errors.append(f"{label} save error: {str(e)[:100]}")
+    return items
+
+
+async def ingest_page(db: Session, source: str, page: PageResult, errors: List[str]) -> Optional[Dict[str, int]]:
+    """Save one crawled page. Returns upsert counts, or None if the page failed."""
+    label = PARSERS[source][0]
+    if page.error is not None:
+        errors.append(f"{label} page {page.page} error: {str(page.error)[:100]}")
+        return None
+    items = await build_items(db, source, page.items, errors)
+    try:
+        return await run_in_threadpool(property_service.bulk_upsert_properties, db, items)
+    except Exception as e:
+        await run_in_threadpool(db.rollback)
+        errors.append(f"{label} save error: {str(e)[:100]}")
+        return None
+
+
+def create_job(db: Session, data: ParseJobCreate) -> ParseJob:
+    """Enqueue a parse job.
+
+    Raises:
+        ValueError: If the source is unknown.
+    """
+    source = data.source.lower()
+    if source not in PARSERS:
+        raise ValueError(f"Unknown source: {data.source}")
+    job = ParseJob(
+        source=source,
+        params=data.model_dump(exclude={"source"}),
+        status="queued",
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    pool.notify()
+    return job
+
+
+def get_job(db: Session, job_id: str) -> Optional[ParseJob]:
+    """Get a job by ID."""
+    return db.get(ParseJob, job_id)
+
+
+def list_jobs(db: Session, status: Optional[str] = None, limit: int = 50) -> List[ParseJob]:
+    """Most recent jobs first."""
+    query = db.query(ParseJob)
+    if status:
+        query = query.filter(ParseJob.status == status)
+    return query.order_by(ParseJob.created_at.desc()).limit(limit).all()
+
+
+def request_cancel(db: Session, job: ParseJob) -> ParseJob:
+    """Cancel a queued job at once; a running one stops after its current page."""
+    if job.status == "queued":
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+    job.cancel_requested = True
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _claimable(stale_before: datetime):
+    return or_(
+        ParseJob.status == "queued",
+        and_(
+            ParseJob.status == "running",
+            or_(ParseJob.heartbeat_at.is_(None), ParseJob.heartbeat_at < stale_before),
+        ),
+    )
+
+
+def claim_next_job(db: Session, stale_seconds: int = 300) -> Optional[ParseJob]:
+    """Atomically mark the oldest claimable job as running and return it.
+
+    The conditional UPDATE makes claiming safe across processes.
+    """
+    now = datetime.utcnow()
+    condition = _claimable(now - timedelta(seconds=stale_seconds))
+    candidates = [
+        job_id for (job_id,) in db.query(ParseJob.id)
+        .filter(condition)
+        .order_by(ParseJob.created_at)
+        .limit(5)
+    ]
+    for job_id in candidates:
+        claimed = db.query(ParseJob).filter(ParseJob.id == job_id, condition).update(
+            {
+                ParseJob.status: "running",
+                ParseJob.heartbeat_at: now,
+                ParseJob.started_at: func.coalesce(ParseJob.started_at, now),
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        if claimed:
+            return db.get(ParseJob, job_id)
+    return None
+
+
+def _record_page(
+    db: Session,
+    job: ParseJob,
+    page: PageResult,
+    counts: Optional[Dict[str, int]],
+    errors: List[str],
+    completed: set,
+) -> None:
+    """Persist progress of one page and pick up cancellation requests."""
+    db.refresh(job)
+    job.pages_done += 1
+    job.items_found += len(page.items)
+    if counts is not None:
+        completed.add(page.page)
+        job.items_saved += counts["inserted"]
+        job.items_updated += counts["updated"]
+        job.items_unchanged += counts["unchanged"]
+    # Pages finish out of order; resume point is the end of the contiguous prefix
+    while job.last_completed_page + 1 in completed:
+        job.last_completed_page += 1
+    if errors:
+        job.errors = (list(job.errors or []) + errors)[-MAX_ERRORS:]
+    job.heartbeat_at = datetime.utcnow()
+    db.commit()
+
+
+def _requeue(db: Session, job: ParseJob) -> None:
+    db.rollback()
+    job.status = "queued"
+    db.commit()
+
+
+def _fail(db: Session, job: ParseJob, error: str) -> None:
+    db.rollback()
+    job.status = "failed"
+    job.errors = (list(job.errors or []) + [error])[-MAX_ERRORS:]
+
+
+def _finish(db: Session, job: ParseJob) -> None:
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+
+def _touch(session_factory, job_id: str) -> None:
+    db = session_factory()
+    try:
+        db.query(ParseJob).filter(ParseJob.id == job_id, ParseJob.status == "running").update(
+            {ParseJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _keep_alive(session_factory, job_id: str, interval: float) -> None:
+    """Refresh the heartbeat while a page is in progress (it may take minutes)."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(_touch, session_factory, job_id)
+        except Exception:
+            logger.exception(f"Heartbeat of parse job {job_id} failed")
+
+
+async def run_job(
+    db: Session,
+    job: ParseJob,
+    session_factory=SessionLocal,
+    heartbeat_seconds: Optional[float] = None,
+) -> ParseJob:
+    """Crawl a claimed job to the end, or until it is cancelled.
+
+    Database work runs in the threadpool so crawling other jobs and serving
+    requests go on meanwhile. A separate task (with its own sessions from
+    ``session_factory``) refreshes the heartbeat every ``heartbeat_seconds``,
+    by default a third of PARSE_JOB_STALE_SECONDS, so a slow page does not
+    let another worker re-claim the job.
+    """
+    label, parser_class = PARSERS[job.source]
+    params = job.params or {}
+    first_page = job.last_completed_page + 1
+    completed = set(range(1, first_page))
+    if heartbeat_seconds is None:
+        heartbeat_seconds = settings.PARSE_JOB_STALE_SECONDS / 3
+    heartbeat = asyncio.create_task(_keep_alive(session_factory, job.id, heartbeat_seconds))
+
+    try:
+        try:
+            if not job.cancel_requested:
+                async with parser_class() as parser:
+                    pages = crawl(
+                        parser,
+                        params.get("max_pages", 1),
+                        concurrency=params.get("concurrency", 3),
+                        first_page=first_page,
+                        min_price=params.get("min_price"),
+                        max_price=params.get("max_price"),
+                    )
+                    async with aclosing(pages):
+                        async for page in pages:
+                            errors: List[str] = []
+                            counts = await ingest_page(db, job.source, page, errors)
+                            await run_in_threadpool(_record_page, db, job, page, counts, errors, completed)
+                            if job.cancel_requested:
+                                break
+            job.status = "cancelled" if job.cancel_requested else "completed"
+        except asyncio.CancelledError:
+            # Shutdown: hand the job back to the queue to resume on next start
+            await run_in_threadpool(_requeue, db, job)
+            raise
+        except Exception as e:
+            logger.exception(f"Parse job {job.id} failed")
+            await run_in_threadpool(_fail, db, job, f"{label} job error: {str(e)[:100]}")
+
+        await run_in_threadpool(_finish, db, job)
+    finally:
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+    return job
+
+
+class ParseWorkerPool:
+    """Asyncio workers that claim and run parse jobs.
+
+    Workers are woken by ``notify()`` after enqueueing and also poll the table,
+    picking up jobs enqueued by other processes or left over by a restart.
+    """
+
+    def __init__(self, session_factory=SessionLocal, workers: int = 2, poll_seconds: float = 5.0, stale_seconds: int = 300):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.stale_seconds = stale_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Started {self.workers} parse workers")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers (no-op when the pool is not running)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            db = self.session_factory()
+            try:
+                job = await run_in_threadpool(claim_next_job, db, self.stale_seconds)
+                if job is not None:
+                    logger.info(f"Worker {index} running parse job {job.id} from page {job.last_completed_page + 1}")
+                    await run_job(db, job, self.session_factory, self.stale_seconds / 3)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Parse worker {index} error")
+            finally:
+                await run_in_threadpool(db.close)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+pool = ParseWorkerPool(
+    workers=settings.PARSE_WORKERS,
+    poll_seconds=settings.PARSE_JOB_POLL_SECONDS,
+    stale_seconds=settings.PARSE_JOB_STALE_SECONDS,
+)
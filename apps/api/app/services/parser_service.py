@@ -79,8 +79,8 @@ class ParserService:
     async def _parse_cian(self, url: str) -> Optional[ParsedProperty]:
         """Parse property from CIAN.
         """
-        parser = CianParser()
-        cian_prop = await parser.parse_listing(url)
+        async with CianParser() as parser:
+            cian_prop = await parser.parse_listing(url)
         
         if not cian_prop:
             return None
@@ -109,8 +109,8 @@ class ParserService:
     async def _parse_avito(self, url: str) -> Optional[ParsedProperty]:
         """Parse property from Avito.
         """
-        parser = AvitoParser()
-        avito_prop = await parser.parse_listing(url)
+        async with AvitoParser() as parser:
+            avito_prop = await parser.parse_listing(url)
         
         if not avito_prop:
             return None
@@ -1,9 +1,19 @@
 """CRUD operations for Property model."""
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional, List, Tuple, Dict, Iterable
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import func, or_, and_, case, cast, insert, literal, null, union_all, String
+from app.core import cache
 from app.models.property import Property
-from app.schemas.property import PropertyCreate, PropertyUpdate
+from app.schemas.property import (
+    PropertyCreate, PropertyUpdate, PropertyResponse, PropertyCardResponse, BulkPropertyCreate,
+)
+from app.services import district_stats_service, complex_matcher, enrichment_service, spatial_index, search_service, analytics_snapshot
+from app.services.geo_service import GeoService
+from app.services.geocoder import geocoder
 
 
 def get_property(db: Session, property_id: str) -> Optional[Property]:
@@ -11,10 +21,8 @@ def get_property(db: Session, property_id: str) -> Optional[Property]:
     return db.query(Property).filter(Property.id == property_id).first()
 
 
-def get_properties(
+def _filter_properties(
     db: Session,
-    skip: int = 0,
-    limit: int = 20,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     min_area: Optional[float] = None,
@@ -24,9 +32,22 @@ def get_properties(
     layout_type: Optional[str] = None,
     finishing_type: Optional[str] = None,
     is_from_developer: Optional[bool] = None,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    radius_m: Optional[float] = None,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    q: Optional[str] = None,
     is_active: bool = True,
-) -> tuple[List[Property], int]:
-    """Get list of properties with filters and pagination."""
+):
+    """Build a filtered Property query shared by list endpoints.
+    
+    Spatial filters (``radius_m`` around ``lat``/``lon``, ``bbox`` as
+    west, south, east, north) are index-assisted, see GeoService; ``q`` is a
+    full-text query, see search_service.
+    
+    Raises:
+        ValueError: If radius_m is given without lat/lon, or q has no words.
+    """
     query = db.query(Property).filter(Property.is_active == is_active)
     
     if min_price is not None:
@@ -47,40 +68,461 @@ def get_properties(
         query = query.filter(Property.finishing_type == finishing_type)
     if is_from_developer is not None:
         query = query.filter(Property.is_from_developer == is_from_developer)
+    if radius_m is not None:
+        if lat is None or lon is None:
+            raise ValueError("radius_m requires lat and lon")
+        query = query.filter(GeoService.within_radius(db, Property, lat, lon, radius_m))
+    if bbox is not None:
+        query = query.filter(GeoService.within_bbox(db, Property, bbox))
+    if q:
+        query = search_service.apply(db, query, q)
     
-    total = query.count()
-    items = query.order_by(Property.created_at.desc()).offset(skip).limit(limit).all()
+    return query
+
+
+def encode_cursor(created_at: datetime, property_id: str) -> str:
+    """Encode a keyset position (created_at, id) into an opaque token."""
+    raw = json.dumps([created_at.isoformat(), property_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a token produced by encode_cursor.
     
-    return items, total
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, property_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(property_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
 
 
-from app.services.geo_service import GeoService
+# Columns behind PropertyCardResponse; cover_image is the first of images
+CARD_COLUMNS = tuple("images" if name == "cover_image" else name for name in PropertyCardResponse.model_fields)
+
+
+def parse_fields(fields: str) -> List[str]:
+    """Keys of a ``fields=id,title,price`` sparse fieldset, in request order.
+    
+    Raises:
+        ValueError: On an empty list or a key PropertyResponse does not have.
+    """
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    if not names:
+        raise ValueError("fields must list at least one field")
+    unknown = [name for name in names if name not in PropertyResponse.model_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def _column_attributes(columns: Iterable[str], with_distance: bool) -> List:
+    """Property columns among ``columns`` plus the ones listing needs.
+    
+    id and created_at are always included (keyset cursor), coordinates too
+    when distances are computed; names that are not columns (distance_m,
+    highlight) are skipped.
+    """
+    names = {"id", "created_at", *columns}
+    if with_distance:
+        names |= {"latitude", "longitude"}
+    mapped = Property.__mapper__.column_attrs
+    return [getattr(Property, name) for name in sorted(names) if name in mapped]
+
+
+# Columns behind PropertyResponse (rows mode without an explicit projection)
+RESPONSE_COLUMNS = tuple(
+    name for name in PropertyResponse.model_fields if name in Property.__mapper__.column_attrs
+)
+
+
+def get_properties(
+    db: Session,
+    skip: int = 0,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    sort: Optional[str] = None,
+    columns: Optional[Iterable[str]] = None,
+    as_rows: bool = False,
+    **filters,
+) -> tuple[List[Property], Optional[int], Optional[str]]:
+    """Get list of properties with filters and pagination.
+    
+    Offset mode (``skip``) is kept for the admin UI. When ``cursor`` is given,
+    rows are fetched by keyset on ``(created_at, id)`` and ``skip`` is ignored,
+    so deep pages cost the same as the first one.
+    
+    ``sort`` is "created" (default), "distance" from ``lat``/``lon`` or
+    "relevance" to the search query ``q`` (default when ``q`` is given);
+    the last two work in offset mode only. Whenever ``lat``/``lon`` are given,
+    items get ``distance_m``; with ``q`` they get a ``highlight`` fragment.
+    
+    ``columns`` limits the loaded Property columns (list projections skip the
+    JSON columns); reading any other attribute of the items costs a query.
+    With ``as_rows`` the items are plain dicts of those columns (default:
+    RESPONSE_COLUMNS) plus ``distance_m``/``highlight``, built without ORM
+    objects for the orjson read path.
+    
+    Returns:
+        (items, total, next_cursor). ``total`` is None when ``with_total`` is False.
+    
+    Raises:
+        ValueError: On an invalid cursor, spatial or search parameters.
+    """
+    lat, lon, q = filters.get("lat"), filters.get("lon"), filters.get("q")
+    if sort is None:
+        sort = "relevance" if q else "created"
+    if (lat is None) != (lon is None):
+        raise ValueError("lat and lon must be given together")
+    if sort == "distance" and lat is None:
+        raise ValueError("sort=distance requires lat and lon")
+    if sort == "relevance" and not q:
+        raise ValueError("sort=relevance requires q")
+    if sort != "created" and cursor is not None:
+        raise ValueError(f"cursor pagination is not supported with sort={sort}")
+    
+    query = _filter_properties(db, **filters)
+    
+    total = query.count() if with_total else None
+    if as_rows:
+        query = query.with_entities(*_column_attributes(columns or RESPONSE_COLUMNS, lat is not None))
+    elif columns is not None:
+        query = query.options(load_only(*_column_attributes(columns, lat is not None)))
+    
+    next_cursor = None
+    if sort != "created":
+        if sort == "distance":
+            order = GeoService.distance_order(db, Property, lat, lon)
+        else:
+            order = search_service.rank(db, q).desc()
+        items = query.order_by(order, Property.id).offset(skip).limit(limit).all()
+    else:
+        if cursor is not None:
+            created_at, property_id = decode_cursor(cursor)
+            query = query.filter(
+                or_(
+                    Property.created_at < created_at,
+                    and_(Property.created_at == created_at, Property.id < property_id),
+                )
+            )
+        
+        query = query.order_by(Property.created_at.desc(), Property.id.desc())
+        if cursor is None:
+            query = query.offset(skip)
+        
+        # Fetch one extra row to know whether another page exists
+        items = query.limit(limit + 1).all()
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    
+    distances = _distances(items, lat, lon) if lat is not None else {}
+    fragments = search_service.highlights(db, [p.id for p in items], q) if q else {}
+    if as_rows:
+        return [
+            dict(row._mapping, distance_m=distances.get(row.id), highlight=fragments.get(row.id))
+            for row in items
+        ], total, next_cursor
+    for prop in items:
+        prop.distance_m = distances.get(prop.id)
+        prop.highlight = fragments.get(prop.id)
+    return items, total, next_cursor
+
+
+# Facet -> column; price is bucketed by PRICE_BUCKETS
+FACET_COLUMNS = {
+    "rooms": Property.rooms,
+    "source": Property.source,
+    "layout_type": Property.layout_type,
+    "finishing_type": Property.finishing_type,
+    "is_from_developer": Property.is_from_developer,
+}
+# Lower bounds of price buckets, RUB; the last bucket is open-ended
+PRICE_BUCKETS = (0, 5_000_000, 10_000_000, 20_000_000, 50_000_000)
+
+
+def _price_bucket():
+    return case(
+        *[(Property.price < upper, str(i)) for i, upper in enumerate(PRICE_BUCKETS[1:])],
+        else_=str(len(PRICE_BUCKETS) - 1),
+    )
+
+
+def get_facets(db: Session, **filters) -> Dict:
+    """Option counts of every catalog filter under the current filter set.
+    
+    Each facet is counted with all filters except its own, so picking
+    "2 rooms" still shows how many 3-room listings match everything else.
+    The total and all facets come from one UNION ALL of grouped queries.
+    
+    Returns:
+        {"total": int, "facets": {"rooms": [{"value": "2", "count": 10}, ...],
+         ..., "price": [{"min": 0, "max": 5000000, "count": 3}, ...]}}
+    
+    Raises:
+        ValueError: On invalid spatial or search parameters.
+    """
+    def branch(name: str, expression, exclude: Tuple[str, ...]):
+        query = _filter_properties(db, **{k: v for k, v in filters.items() if k not in exclude})
+        return query.with_entities(
+            literal(name, String).label("facet"),
+            cast(expression, String).label("value"),
+            func.count().label("count"),
+        ).group_by(expression).statement
+    
+    branches = [
+        _filter_properties(db, **filters).with_entities(
+            literal("total", String).label("facet"),
+            cast(null(), String).label("value"),
+            func.count().label("count"),
+        ).statement
+    ]
+    branches += [branch(name, column, (name,)) for name, column in FACET_COLUMNS.items()]
+    branches.append(branch("price", _price_bucket(), ("min_price", "max_price")))
+    
+    total = 0
+    facets: Dict[str, list] = {name: [] for name in FACET_COLUMNS}
+    price_counts = [0] * len(PRICE_BUCKETS)
+    for facet, value, count in db.execute(union_all(*branches)):
+        if facet == "total":
+            total = count
+        elif facet == "price":
+            price_counts[int(value)] = count
+        elif value is not None:
+            if facet == "is_from_developer":
+                value = value in ("1", "true")
+            facets[facet].append({"value": value, "count": count})
+    
+    for options in facets.values():
+        options.sort(key=lambda option: (-option["count"], str(option["value"])))
+    facets["price"] = [
+        {
+            "min": lower,
+            "max": PRICE_BUCKETS[i + 1] if i + 1 < len(PRICE_BUCKETS) else None,
+            "count": price_counts[i],
+        }
+        for i, lower in enumerate(PRICE_BUCKETS)
+    ]
+    return {"total": total, "facets": facets}
+
+
+def _distances(items, lat: float, lon: float) -> Dict[str, int]:
+    """Meters from lat/lon to loaded properties (or rows) with coordinates, by ID."""
+    located = [p for p in items if p.latitude is not None and p.longitude is not None]
+    if not located:
+        return {}
+    meters = spatial_index.haversine_m(
+        lat, lon, [p.latitude for p in located], [p.longitude for p in located]
+    )
+    return {prop.id: int(round(float(m))) for prop, m in zip(located, meters)}
+
+
+def get_nearby_properties(
+    db: Session,
+    lat: float,
+    lon: float,
+    radius_m: Optional[float] = None,
+    limit: int = 20,
+) -> List[Tuple[Property, int]]:
+    """Active properties nearest to a point ("near me"), closest first.
+
+    Returns:
+        [(property, distance in meters), ...]
+    """
+    query = db.query(Property).filter(Property.is_active == True)
+    items = GeoService.nearest(db, Property, lat, lon, limit=limit, radius_m=radius_m, query=query).all()
+    distances = _distances(items, lat, lon)
+    return [(prop, distances.get(prop.id)) for prop in items]
+
 
 def create_property(db: Session, property_data: PropertyCreate) -> Property:
-    """Create a new property."""
+    """Create a new property.
+    
+    Coordinates missing from the payload are taken from the geocoding cache
+    only; network geocoding and distances are left to the enrichment worker
+    (``enrichment_status="pending"``).
+    """
     data = property_data.model_dump()
     
     # Auto-Geocode if address provided but coords missing
     if (not data.get('latitude') or not data.get('longitude')) and data.get('address'):
-        coords = GeoService.geocode(data['address'])
+        coords = geocoder.lookup(data['address'], db)
         if coords:
             data['latitude'], data['longitude'] = coords
-    
-    # Auto-Calculate Distances
-    # if data.get('latitude') and data.get('longitude'):
-    #     try:
-    #         distances = GeoService.calculate_distances(db, data['latitude'], data['longitude'])
-    #         data['distances'] = distances
-    #     except Exception:
-    #         pass # Ignore geo errors to prevent transaction abort
+    data['enrichment_status'] = enrichment_service.PENDING
 
     db_property = Property(**data)
+    complex_matcher.assign_complex(db, db_property)
     db.add(db_property)
+    db.flush()
+    district_stats_service.refresh_for_addresses(db, [db_property.address])
     db.commit()
     db.refresh(db_property)
+    cache.invalidate(cache.PROPERTIES)
+    enrichment_service.worker.enqueue(db_property.id)
     return db_property
 
 
+def create_floor_units(db: Session, bulk: BulkPropertyCreate) -> List[str]:
+    """Create one property per floor/apartment of a newbuild from a template.
+
+    Everything shared by the units is resolved once: the template is dumped
+    once, coordinates come from the geocoding cache once, the complex is
+    classified once and, when the building is located, its infrastructure
+    distances are computed once and stored on every unit (so the units are
+    ``done`` right away). Rows are inserted in one executemany INSERT ...
+    RETURNING (batched by SQLAlchemy under the driver's parameter limit) and
+    committed in a single transaction.
+
+    Returns:
+        IDs of the created properties, floor by floor.
+    """
+    template = bulk.template.model_dump()
+    if (not template.get('latitude') or not template.get('longitude')) and template.get('address'):
+        coords = geocoder.lookup(template['address'], db)
+        if coords:
+            template['latitude'], template['longitude'] = coords
+
+    located = template.get('latitude') is not None and template.get('longitude') is not None
+    if located:
+        template['distances'] = GeoService.calculate_distances(db, template['latitude'], template['longitude'])
+        template['enrichment_status'] = enrichment_service.DONE
+    else:
+        template['enrichment_status'] = enrichment_service.PENDING
+    if not template['complex_name']:
+        name, complex_id = complex_matcher.classify(db, template['title'], template['address'])
+        template['complex_name'] = name
+        template['complex_id'] = template['complex_id'] or complex_id
+        template['complex_auto'] = name is not None
+
+    now = datetime.utcnow()
+    template.update(created_at=now, updated_at=now, is_active=True)
+    rows = []
+    for floor in range(bulk.floor_from, bulk.floor_to + 1):
+        price = bulk.template.price + (floor - bulk.floor_from) * bulk.price_increment_per_floor
+        for apt_num in range(1, bulk.apartments_per_floor + 1):
+            if bulk.apartments_per_floor > 1:
+                title = f"{bulk.template.title} (эт. {floor}, кв. {apt_num})"
+            else:
+                title = f"{bulk.template.title} (эт. {floor})"
+            rows.append({**template, "id": str(uuid.uuid4()), "floor": floor, "price": price, "title": title})
+
+    statement = insert(Property).returning(Property.id, sort_by_parameter_order=True)
+    property_ids = list(db.execute(statement, rows).scalars())
+    district_stats_service.refresh_for_addresses(db, [template['address']])
+    db.commit()
+    cache.invalidate(cache.PROPERTIES)
+    if not located:
+        for property_id in property_ids:
+            enrichment_service.worker.enqueue(property_id)
+    return property_ids
+
+
+# Columns refreshed from the source on re-scrape; admin-edited fields are kept
+UPSERT_FIELDS = (
+    "title", "description", "price", "currency", "address", "latitude", "longitude",
+    "area_sqm", "rooms", "floor", "total_floors", "url", "images", "features",
+)
+
+
+def _dialect_insert(db: Session):
+    """INSERT construct with ON CONFLICT support for the bound dialect."""
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(Property)
+
+
+def bulk_upsert_properties(
+    db: Session,
+    items: List[PropertyCreate],
+    batch_size: int = 500,
+) -> Dict[str, int]:
+    """Insert or update a page of scraped listings in a few statements.
+    
+    Listings are matched on (source, source_id) with one SELECT; unchanged ones
+    are skipped and the rest are written with INSERT ... ON CONFLICT DO UPDATE
+    in batches of ``batch_size``, then committed once.
+    
+    Returns:
+        {"inserted": int, "updated": int, "unchanged": int}
+    """
+    # Deduplicate within the page (last occurrence wins)
+    rows_by_key: Dict[tuple, dict] = {}
+    for index, item in enumerate(items):
+        data = item.model_dump()
+        rows_by_key[(data["source"], data["source_id"] or f"#{index}")] = data
+    rows = list(rows_by_key.values())
+    
+    existing = {}
+    source_ids = {r["source_id"] for r in rows if r["source_id"]}
+    if source_ids:
+        current_rows = db.query(
+            Property.source, Property.source_id, *(getattr(Property, f) for f in UPSERT_FIELDS),
+            Property.complex_name, Property.complex_id, Property.complex_auto,
+        ).filter(Property.source_id.in_(source_ids))
+        existing = {(r.source, r.source_id): r for r in current_rows}
+    
+    now = datetime.utcnow()
+    inserted, updated, unchanged = 0, 0, 0
+    pending, addresses = [], []
+    for data in rows:
+        current = existing.get((data["source"], data["source_id"]))
+        if current is None:
+            if not data["complex_name"]:
+                name, complex_id = complex_matcher.classify(db, data["title"], data["address"])
+                data["complex_name"] = name
+                data["complex_id"] = data["complex_id"] or complex_id
+                data["complex_auto"] = name is not None
+            inserted += 1
+        else:
+            # Listings without coordinates must not erase known ones
+            for coord in ("latitude", "longitude"):
+                if data[coord] is None:
+                    data[coord] = getattr(current, coord)
+            if all(data[f] == getattr(current, f) for f in UPSERT_FIELDS):
+                unchanged += 1
+                continue
+            complex_fields = (current.complex_name, current.complex_id, current.complex_auto)
+            if data["title"] != current.title or data["address"] != current.address:
+                # Same rules as update_property: automatic complexes follow the listing
+                complex_fields = complex_matcher.reclassify(db, data["title"], data["address"], *complex_fields)
+            data["complex_name"], data["complex_id"], data["complex_auto"] = complex_fields
+            addresses.append(current.address)
+            updated += 1
+        data.setdefault("complex_auto", False)
+        data.update(id=str(uuid.uuid4()), created_at=now, updated_at=now, is_active=True)
+        pending.append(data)
+        addresses.append(data["address"])
+    
+    for start in range(0, len(pending), batch_size):
+        stmt = _dialect_insert(db).values(pending[start:start + batch_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Property.source, Property.source_id],
+            # is_active is set on insert only: admin soft deletes survive re-scrapes
+            set_={
+                **{f: getattr(stmt.excluded, f) for f in UPSERT_FIELDS},
+                # Current values, or reclassified ones when the title/address changed
+                **{f: getattr(stmt.excluded, f) for f in ("complex_name", "complex_id", "complex_auto")},
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.execute(stmt)
+    
+    if pending:
+        district_stats_service.refresh_for_addresses(db, addresses)
+    db.commit()
+    if pending:
+        cache.invalidate(cache.PROPERTIES)
+    
+    return {"inserted": inserted, "updated": updated, "unchanged": unchanged}
+
+
 def update_property(db: Session, property_id: str, property_data: PropertyUpdate) -> Optional[Property]:
     """Update an existing property."""
     db_property = get_property(db, property_id)
@@ -88,38 +530,47 @@ def update_property(db: Session, property_id: str, property_data: PropertyUpdate
         return None
     
     update_data = property_data.model_dump(exclude_unset=True)
+    old_address = db_property.address
     
-    # Auto-Geocode if address changed but coords missing
-    if 'address' in update_data and 'latitude' not in update_data:
-        coords = GeoService.geocode(update_data['address'])
+    # Auto-Geocode (cache only) if address changed but coords missing
+    address_changed = 'address' in update_data and update_data['address'] != old_address
+    if address_changed and 'latitude' not in update_data:
+        coords = geocoder.lookup(update_data['address'], db)
         if coords:
             update_data['latitude'], update_data['longitude'] = coords
+            update_data['location_stale'] = False
+        else:
+            # Listing stays on the map at the old location until the worker geocodes the new one
+            update_data['location_stale'] = True
+    elif 'latitude' in update_data or 'longitude' in update_data:
+        update_data['location_stale'] = False
     
-    # If location changed, recalculate distances
-    if 'latitude' in update_data or 'longitude' in update_data:
-        lat = update_data.get('latitude', db_property.latitude)
-        lon = update_data.get('longitude', db_property.longitude)
-        
-        if lat and lon:
-            try:
-                distances = GeoService.calculate_distances(db, lat, lon)
-                update_data['distances'] = distances 
-                # Also update the object field directly since setattr might miss nested dict update logic if handled poorly
-                setattr(db_property, 'distances', distances)
-            except Exception as e:
-                print(f"Warning: Failed to calculate distances: {e}")
-                # Do not abort transaction if geo fails
-                pass
+    # Location changed: distances are recomputed by the enrichment worker
+    location_changed = update_data.get('location_stale', False) or any(
+        field in update_data and update_data[field] != getattr(db_property, field)
+        for field in ('latitude', 'longitude')
+    )
+    if location_changed:
+        update_data['enrichment_status'] = enrichment_service.PENDING
+        update_data['enrichment_attempts'] = 0
+        update_data['enrichment_retry_at'] = None
 
     for field, value in update_data.items():
         setattr(db_property, field, value)
     
-    update_data = property_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_property, field, value)
+    if 'complex_name' in update_data:
+        # Set (or cleared) by admin: no longer reclassified
+        db_property.complex_auto = False
+    elif 'title' in update_data or 'address' in update_data:
+        complex_matcher.assign_complex(db, db_property)
     
+    db.flush()
+    district_stats_service.refresh_for_addresses(db, [old_address, db_property.address])
     db.commit()
     db.refresh(db_property)
+    cache.invalidate(cache.PROPERTIES)
+    if location_changed:
+        enrichment_service.worker.enqueue(db_property.id)
     return db_property
 
 
@@ -130,12 +581,18 @@ def delete_property(db: Session, property_id: str) -> bool:
         return False
     
     db_property.is_active = False
+    db.flush()
+    district_stats_service.refresh_for_addresses(db, [db_property.address])
     db.commit()
+    cache.invalidate(cache.PROPERTIES)
     return True
 
 
 def get_property_stats(db: Session) -> dict:
     """Get aggregate statistics for properties."""
+    if analytics_snapshot.enabled():
+        return analytics_snapshot.snapshot.get(db).property_stats()
+    
     stats = db.query(
         func.count(Property.id).label("total"),
         func.avg(Property.price).label("avg_price"),
@@ -0,0 +1,129 @@
+"""Full-text search over property title, address and description.
+
+PostgreSQL matches the ``search_vector`` column (GIN index, ``russian``
+configuration) and ranks with ``ts_rank_cd``; SQLite matches the FTS5 table
+and ranks with ``bm25``. Every word of the query has to match as a word
+prefix, so "квартир мор" finds "Квартира у моря" on both backends.
+Index definitions live in ``app.models.fulltext``.
+"""
+import html
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, literal_column, select, table, column
+from sqlalchemy.orm import Session, Query
+from sqlalchemy.sql import ColumnElement
+
+from app.models.fulltext import SEARCH_VECTOR_COLUMN
+from app.models.property import Property
+
+MAX_TERMS = 8
+# bm25 weights of the FTS5 columns (title, address, description)
+SQLITE_WEIGHTS = (10.0, 5.0, 1.0)
+HIGHLIGHT_WORDS = 16
+
+_WORD_RE = re.compile(r"\w+")
+# Name of the SQLite match CTE built by apply()
+_MATCHES = "search_matches"
+# Control characters survive escaping and are swapped for <mark> tags afterwards
+_START, _STOP = "\x02", "\x03"
+
+
+def terms(q: str) -> List[str]:
+    """Words of a search query.
+
+    Raises:
+        ValueError: If the query has no words.
+    """
+    words = _WORD_RE.findall(q.lower())[:MAX_TERMS]
+    if not words:
+        raise ValueError("q must contain at least one word")
+    return words
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _vector() -> ColumnElement:
+    return literal_column(f"{Property.__tablename__}.{SEARCH_VECTOR_COLUMN}")
+
+
+def _tsquery(words: List[str]) -> ColumnElement:
+    return func.to_tsquery("russian", " & ".join(f"{w}:*" for w in words))
+
+
+def _fts():
+    return table(f"{Property.__tablename__}_fts", column("rowid"))
+
+
+def _fts_match(words: List[str]) -> ColumnElement:
+    expression = " ".join(f'"{w}"*' for w in words)
+    return literal_column(_fts().name).op("MATCH")(expression)
+
+
+def apply(db: Session, query: Query, q: str) -> Query:
+    """Restrict a Property query to rows matching q.
+
+    On SQLite the matches (with their bm25 score) are computed once in a
+    materialized CTE and joined by rowid; a plain join or subquery gets
+    flattened and the planner may run the MATCH once per property row.
+
+    Raises:
+        ValueError: If the query has no words.
+    """
+    words = terms(q)
+    if _is_postgres(db):
+        return query.filter(_vector().op("@@")(_tsquery(words)))
+    matches = _matches(tuple(words))
+    return query.join(matches, matches.c.rowid == literal_column(f"{Property.__tablename__}.rowid"))
+
+
+@lru_cache(maxsize=256)
+def _matches(words: Tuple[str, ...]):
+    """SQLite match CTE; one object per query so UNIONs of filtered queries share it."""
+    fts = _fts()
+    return (
+        select(fts.c.rowid, (-func.bm25(literal_column(fts.name), *SQLITE_WEIGHTS)).label("rank"))
+        .where(_fts_match(list(words)))
+        .cte(_MATCHES)
+        .prefix_with("MATERIALIZED")
+    )
+
+
+def rank(db: Session, q: str) -> ColumnElement:
+    """Relevance of a row of a query passed through apply(); higher is better."""
+    if _is_postgres(db):
+        return func.ts_rank_cd(_vector(), _tsquery(terms(q)))
+    return literal_column(f"{_MATCHES}.rank")
+
+
+def _render(fragment: str) -> str:
+    return html.escape(fragment).replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def highlights(db: Session, property_ids: List[str], q: str) -> Dict[str, str]:
+    """HTML-escaped fragments with matches wrapped in <mark>, by property ID.
+
+    Computed for one page of results only: headline generation is the
+    expensive part of a search.
+    """
+    if not property_ids:
+        return {}
+    words = terms(q)
+    if _is_postgres(db):
+        document = func.concat_ws(" — ", Property.title, Property.address, Property.description)
+        options = f"StartSel={_START}, StopSel={_STOP}, MaxFragments=2, MaxWords={HIGHLIGHT_WORDS}, MinWords=5"
+        statement = select(Property.id, func.ts_headline("russian", document, _tsquery(words), options)).where(
+            Property.id.in_(property_ids)
+        )
+    else:
+        fts = _fts()
+        snippet = func.snippet(literal_column(fts.name), -1, _START, _STOP, "…", HIGHLIGHT_WORDS)
+        statement = (
+            select(Property.id, snippet)
+            .join(fts, fts.c.rowid == literal_column(f"{Property.__tablename__}.rowid"))
+            .where(_fts_match(words), Property.id.in_(property_ids))
+        )
+    return {property_id: _render(fragment) for property_id, fragment in db.execute(statement) if fragment}
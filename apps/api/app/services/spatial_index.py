@@ -0,0 +1,143 @@
+"""In-memory spatial index of infrastructure for nearest-distance queries.
+
+Infrastructure points of each ``InfraType`` are converted to 3D unit vectors
+and put into a KD-tree (scipy ``cKDTree``; a vectorized NumPy scan is used
+when scipy is not installed). Euclidean chord length on the unit sphere maps
+monotonically to great-circle distance, so the nearest chord neighbour is the
+nearest haversine neighbour and ``2R·asin(chord/2)`` is its distance in meters.
+
+The index is built from the ``infrastructure`` table on first use and rebuilt
+after ORM writes to ``Infrastructure`` (mapper events) or after a TTL, which
+covers bulk SQL changes.
+"""
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.infrastructure import Infrastructure, InfraType
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None  # type: ignore
+
+EARTH_RADIUS_M = 6_371_000.0
+INDEX_TTL_SECONDS = 600
+# Query points compared at once in the NumPy fallback (bounds memory use)
+_FALLBACK_CHUNK = 1024
+
+
+def to_unit_vectors(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """(N,) latitude/longitude in degrees -> (N, 3) unit vectors."""
+    lat_r = np.radians(np.asarray(lat, dtype=float))
+    lon_r = np.radians(np.asarray(lon, dtype=float))
+    cos_lat = np.cos(lat_r)
+    return np.column_stack((cos_lat * np.cos(lon_r), cos_lat * np.sin(lon_r), np.sin(lat_r)))
+
+
+def chord_to_meters(chord: np.ndarray) -> np.ndarray:
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+
+def haversine_m(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized haversine distance in meters."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class SpatialIndex:
+    """Nearest-neighbour index of infrastructure points, one tree per type."""
+
+    def __init__(self, points: Dict[str, np.ndarray], use_tree: bool = True):
+        """
+        Args:
+            points: Type key ("school", "sea", ...) -> (N, 2) array of lat/lon.
+            use_tree: Build KD-trees when scipy is available.
+        """
+        self.types = [t.value for t in InfraType]
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._trees: Dict[str, "cKDTree"] = {}
+        for key, latlon in points.items():
+            if len(latlon) == 0:
+                continue
+            vectors = to_unit_vectors(latlon[:, 0], latlon[:, 1])
+            self._vectors[key] = vectors
+            if use_tree and cKDTree is not None:
+                self._trees[key] = cKDTree(vectors)
+        self.size = sum(len(v) for v in self._vectors.values())
+
+    @classmethod
+    def load(cls, db: Session) -> "SpatialIndex":
+        """Build from the infrastructure table."""
+        grouped: Dict[str, list] = {}
+        rows = db.query(Infrastructure.type, Infrastructure.latitude, Infrastructure.longitude).filter(
+            Infrastructure.latitude.isnot(None),
+            Infrastructure.longitude.isnot(None),
+        )
+        for infra_type, lat, lon in rows:
+            key = infra_type.value if isinstance(infra_type, InfraType) else str(infra_type)
+            grouped.setdefault(key, []).append((lat, lon))
+        return cls({key: np.array(values, dtype=float) for key, values in grouped.items()})
+
+    def _nearest_chord(self, key: str, queries: np.ndarray) -> np.ndarray:
+        tree = self._trees.get(key)
+        if tree is not None:
+            chord, _ = tree.query(queries, k=1)
+            return np.asarray(chord, dtype=float)
+        vectors = self._vectors[key]
+        result = np.empty(len(queries))
+        for start in range(0, len(queries), _FALLBACK_CHUNK):
+            chunk = queries[start:start + _FALLBACK_CHUNK]
+            # |a - b|^2 = 2 - 2 a·b for unit vectors
+            dots = np.clip(chunk @ vectors.T, -1.0, 1.0)
+            result[start:start + len(chunk)] = np.sqrt(2.0 - 2.0 * dots.max(axis=1))
+        return result
+
+    def nearest_many(self, lats: Sequence[float], lons: Sequence[float]) -> Dict[str, Optional[np.ndarray]]:
+        """Distance in meters from every query point to the nearest object of each type.
+
+        Returns:
+            Type key -> (N,) float array, or None when there are no objects of the type.
+        """
+        queries = to_unit_vectors(np.asarray(lats), np.asarray(lons))
+        return {
+            key: chord_to_meters(self._nearest_chord(key, queries)) if key in self._vectors else None
+            for key in self.types
+        }
+
+    def nearest(self, lat: float, lon: float) -> Dict[str, Optional[int]]:
+        """Distances for a single point, rounded to tens of meters."""
+        return {
+            key: int(round(float(meters[0]), -1)) if meters is not None else None
+            for key, meters in self.nearest_many([lat], [lon]).items()
+        }
+
+
+_index: Optional[SpatialIndex] = None
+_built_at = 0.0
+_lock = threading.Lock()
+
+
+def invalidate(*_args) -> None:
+    """Drop the index; the next query rebuilds it."""
+    global _index
+    _index = None
+
+
+def get_index(db: Session) -> SpatialIndex:
+    """Return the process-wide index, (re)building it when stale."""
+    global _index, _built_at
+    with _lock:
+        if _index is None or time.monotonic() - _built_at > INDEX_TTL_SECONDS:
+            _index = SpatialIndex.load(db)
+            _built_at = time.monotonic()
+        return _index
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Infrastructure, _event, invalidate)
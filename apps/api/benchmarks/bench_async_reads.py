@@ -0,0 +1,137 @@
+"""Requests per second of GET /districts: sync Session in async def vs. AsyncSession.
+
+    python -m benchmarks.bench_async_reads [--requests 2000] [--concurrency 50] [--url postgresql://...]
+
+Serves the districts router in-process (httpx ASGITransport) next to a copy of
+the previous handler, an ``async def`` that queries through the blocking sync
+Session, and a plain ``def`` variant that FastAPI runs in its threadpool.
+Without --url a temporary SQLite file is used (aiosqlite for the async
+engine); with a PostgreSQL URL the tables must not exist yet (asyncpg).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.v1 import districts
+from app.core.db import Base
+from app.core.deps import get_async_db, get_db
+from app.models.district import District
+
+ROWS = 50
+
+
+def build_app(session_factory, async_session_factory) -> FastAPI:
+    app = FastAPI()
+    app.include_router(districts.router)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    @app.get("/legacy/districts")
+    async def legacy_list_districts(db: Session = Depends(get_db)):
+        # Previous handler: blocks the event loop for the whole query
+        return [{"id": d.id, "name": d.name} for d in db.query(District).all()]
+
+    @app.get("/threadpool/districts")
+    def threadpool_list_districts(db: Session = Depends(get_db)):
+        return [{"id": d.id, "name": d.name} for d in db.query(District).all()]
+
+    return app
+
+
+async def load(app: FastAPI, path: str, requests: int, concurrency: int):
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def worker(client: AsyncClient):
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return requests / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmpdir.name, 'bench_async_reads.db')}"
+    async_url = url.replace("sqlite://", "sqlite+aiosqlite://", 1).replace("postgresql://", "postgresql+asyncpg://", 1)
+    # One connection per client for both engines: with fewer, the blocking
+    # handler waits for a connection on the event loop that has to return it
+    engine = create_engine(
+        url,
+        pool_size=args.concurrency,
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {},
+    )
+    Base.metadata.create_all(engine, tables=[District.__table__])
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add_all(
+            District(name=f"Район {i}", center_lat=43.5 + i / 1000, center_lng=39.7, coordinates=[[43.5, 39.7]] * 20)
+            for i in range(ROWS)
+        )
+        db.commit()
+
+    async def run():
+        async_engine = create_async_engine(async_url, pool_size=args.concurrency)
+        app = build_app(session_factory, async_sessionmaker(async_engine, expire_on_commit=False))
+        try:
+            print(f"{engine.dialect.name}: {args.requests} requests, concurrency {args.concurrency}")
+            print(f"{'handler':<26}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}")
+            for name, path in (
+                ("async def + sync Session", "/legacy/districts"),
+                ("def (threadpool)", "/threadpool/districts"),
+                ("async def + AsyncSession", "/districts"),
+            ):
+                rps, p50, p99 = await load(app, path, args.requests, args.concurrency)
+                print(f"{name:<26}{rps:>9.0f}{p50:>9.1f}{p99:>9.1f}")
+        finally:
+            await async_engine.dispose()
+
+    try:
+        asyncio.run(run())
+    finally:
+        if args.url is not None:
+            Base.metadata.drop_all(engine, tables=[District.__table__])
+        engine.dispose()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
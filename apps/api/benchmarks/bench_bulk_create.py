@@ -0,0 +1,104 @@
+"""Bulk newbuild creation: per-unit create_property vs. create_floor_units.
+
+    python -m benchmarks.bench_bulk_create [--floors 50] [--per-floor 20] [--url postgresql://...]
+
+Creates one building of floors x per-floor units (1,000 by default) both ways
+on a temporary SQLite file (or an empty PostgreSQL database) and prints wall
+time and statement counts.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.schemas.property import BulkPropertyCreate, PropertyCreate
+from app.services import property_service
+
+TEMPLATE = {
+    "title": "ЖК Бенчмарк, 2-комн.",
+    "price": 12_000_000,
+    "address": "Сочи, ул. Навагинская, 9",
+    "latitude": 43.58,
+    "longitude": 39.72,
+    "area_sqm": 54.0,
+    "rooms": "2",
+    "property_type": "newbuild",
+    "is_from_developer": True,
+    "images": [f"https://cdn.example/plan/{i}.jpg" for i in range(4)],
+}
+
+
+def per_unit(db, bulk: BulkPropertyCreate):
+    """The previous endpoint: one create_property (and transaction) per unit."""
+    ids = []
+    for floor in range(bulk.floor_from, bulk.floor_to + 1):
+        for apt_num in range(1, bulk.apartments_per_floor + 1):
+            data = bulk.template.model_dump()
+            data["floor"] = floor
+            data["price"] = bulk.template.price + (floor - bulk.floor_from) * bulk.price_increment_per_floor
+            data["title"] = f"{data['title']} (эт. {floor}, кв. {apt_num})"
+            ids.append(property_service.create_property(db, PropertyCreate(**data)).id)
+    return ids
+
+
+def batched(db, bulk: BulkPropertyCreate):
+    return property_service.create_floor_units(db, bulk)
+
+
+def measure(fn, engine, session_factory, bulk: BulkPropertyCreate):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        with session_factory() as db:
+            started = time.perf_counter()
+            ids = fn(db, bulk)
+            elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return len(ids), elapsed, len(statements)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--floors", type=int, default=50)
+    parser.add_argument("--per-floor", type=int, default=20)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmpdir.name, 'bench_bulk_create.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    bulk = BulkPropertyCreate(
+        template=TEMPLATE,
+        floor_from=1,
+        floor_to=args.floors,
+        apartments_per_floor=args.per_floor,
+        price_increment_per_floor=150_000,
+    )
+
+    try:
+        print(f"{engine.dialect.name}: {args.floors} floors x {args.per_floor} units")
+        print(f"{'path':<12}{'units':>7}{'seconds':>10}{'statements':>12}")
+        for name, fn in (("per-unit", per_unit), ("batched", batched)):
+            units, elapsed, statements = measure(fn, engine, session_factory, bulk)
+            print(f"{name:<12}{units:>7}{elapsed:>10.2f}{statements:>12}")
+    finally:
+        if args.url is not None:
+            Base.metadata.drop_all(engine)
+        engine.dispose()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
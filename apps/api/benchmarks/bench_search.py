@@ -0,0 +1,130 @@
+"""Full-text search vs. ILIKE substring scan over synthetic listings.
+
+    python -m benchmarks.bench_search [--rows 100000] [--url postgresql://...]
+
+Without --url a temporary SQLite file is used (FTS5); with a PostgreSQL URL the
+tables must not exist yet (tsvector + GIN). Prints per-query latency of
+``property_service.get_properties(q=...)`` next to an equivalent ILIKE filter.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import create_engine, insert, or_
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models.property import Property
+from app.services import property_service
+
+STREETS = ["Навагинская", "Орджоникидзе", "Курортный проспект", "Виноградная", "Пластунская", "Донская", "Гагарина"]
+DISTRICTS = ["Центральный", "Хостинский", "Адлерский", "Лазаревский"]
+KINDS = ["Квартира", "Студия", "Апартаменты", "Пентхаус", "Таунхаус", "Дом"]
+WORDS = [
+    "вид на море", "панорамные окна", "рядом парк", "закрытая территория", "подземный паркинг",
+    "дизайнерский ремонт", "бассейн", "тихий двор", "у набережной", "новый дом", "школа рядом",
+    "горы", "террасой", "камином", "консьерж", "охрана", "спортзал", "детская площадка",
+]
+QUERIES = ["море", "пентхаус бассейн", "студия центральный", "паркинг", "навагинская", "камин террас"]
+
+
+def synthetic_rows(count: int, rng: random.Random):
+    for i in range(count):
+        kind = rng.choice(KINDS)
+        yield {
+            "id": str(uuid.uuid4()),
+            "title": f"{kind}, {rng.randint(20, 250)} м², {rng.choice(WORDS)}",
+            "description": ", ".join(rng.sample(WORDS, 5)).capitalize() + ".",
+            "address": f"Сочи, {rng.choice(DISTRICTS)} район, ул. {rng.choice(STREETS)}, {rng.randint(1, 120)}",
+            "price": rng.randint(3, 90) * 1_000_000,
+            "area_sqm": rng.randint(20, 250),
+            "source": "bench",
+            "source_id": str(i),
+            "is_active": True,
+            "enrichment_status": "done",
+        }
+
+
+def populate(session_factory, rows: int, batch: int = 5000) -> float:
+    rng = random.Random(42)
+    started = time.perf_counter()
+    with session_factory() as db:
+        buffer = []
+        for row in synthetic_rows(rows, rng):
+            buffer.append(row)
+            if len(buffer) == batch:
+                db.execute(insert(Property), buffer)
+                buffer = []
+        if buffer:
+            db.execute(insert(Property), buffer)
+        db.commit()
+    return time.perf_counter() - started
+
+
+def ilike_search(db, q: str, limit: int):
+    query = db.query(Property).filter(Property.is_active == True)
+    for word in q.split():
+        pattern = f"%{word}%"
+        query = query.filter(or_(
+            Property.title.ilike(pattern),
+            Property.address.ilike(pattern),
+            Property.description.ilike(pattern),
+        ))
+    return query.count(), query.limit(limit).all()
+
+
+def fts_search(db, q: str, limit: int):
+    items, total, _ = property_service.get_properties(db, limit=limit, q=q)
+    return total, items
+
+
+def measure(fn, session_factory, q: str, repeat: int, limit: int):
+    timings = []
+    total = None
+    for _ in range(repeat):
+        with session_factory() as db:
+            started = time.perf_counter()
+            total, _ = fn(db, q, limit)
+            timings.append((time.perf_counter() - started) * 1000)
+    return total, statistics.median(timings), max(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmpdir.name, 'bench_search.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine, tables=[Property.__table__])
+    session_factory = sessionmaker(bind=engine)
+
+    try:
+        seconds = populate(session_factory, args.rows)
+        print(f"{engine.dialect.name}: inserted {args.rows} listings in {seconds:.1f}s (index kept in sync)")
+        print(f"{'query':<22}{'matches':>9}{'fts ms':>10}{'ilike ms':>10}{'speedup':>9}")
+        for q in QUERIES:
+            total, fts_median, _ = measure(fts_search, session_factory, q, args.repeat, args.limit)
+            _, ilike_median, _ = measure(ilike_search, session_factory, q, args.repeat, args.limit)
+            print(f"{q:<22}{total:>9}{fts_median:>10.1f}{ilike_median:>10.1f}{ilike_median / fts_median:>8.1f}x")
+    finally:
+        if args.url is not None:
+            Base.metadata.drop_all(engine, tables=[Property.__table__])
+        engine.dispose()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
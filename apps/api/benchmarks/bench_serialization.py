@@ -0,0 +1,112 @@
+"""Pydantic response_model vs. orjson rows for property list pages.
+
+    python -m benchmarks.bench_serialization [--rows 2000] [--repeat 200]
+
+Loads pages of 100 and 1000 synthetic listings from a temporary SQLite file
+both ways ``GET /properties`` can (FAST_JSON_READS off: ORM objects validated
+into PropertyListResponse and encoded with json; on: column dicts encoded with
+orjson) and prints p50/p99 of the fetch and of the serialization alone.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import orjson
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models.property import Property
+from app.schemas.property import PropertyListResponse, PropertyResponse
+from app.services import property_service
+
+from benchmarks.bench_search import synthetic_rows
+
+PAGE_SIZES = (100, 1000)
+
+
+def populate(session_factory, rows: int) -> None:
+    rng = random.Random(42)
+    with session_factory() as db:
+        batch = []
+        for row in synthetic_rows(rows, rng):
+            row.update(
+                latitude=43.4 + rng.random() * 0.3,
+                longitude=39.6 + rng.random() * 0.4,
+                images=[f"https://cdn.example/{row['id']}/{i}.jpg" for i in range(8)],
+                features={"pool": rng.random() < 0.3, "view": "sea", "parking": True},
+                investment_metrics={"roi": rng.randint(3, 12), "growth": rng.randint(50, 150)},
+                growth_forecasts=[{"year": str(2026 + i), "val": rng.randint(1, 20)} for i in range(5)],
+                eco_score={"air": 5, "noise": 4, "green": 3},
+                agent_profile={"name": "Анна", "role": "Эксперт", "photo": "https://cdn.example/a.jpg"},
+            )
+            batch.append(row)
+        db.execute(insert(Property), batch)
+        db.commit()
+
+
+def pydantic_page(db, size: int):
+    started = time.perf_counter()
+    items, total, next_cursor = property_service.get_properties(db, limit=size)
+    fetched = time.perf_counter()
+    # What FastAPI does with response_model=PropertyListResponse and JSONResponse
+    payload = PropertyListResponse(items=items, total=total, page=1, size=size, pages=1, next_cursor=next_cursor)
+    body = json.dumps(
+        PropertyListResponse.model_validate(payload.model_dump()).model_dump(mode="json"),
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+    return fetched - started, time.perf_counter() - fetched, len(body)
+
+
+def orjson_page(db, size: int):
+    started = time.perf_counter()
+    items, total, next_cursor = property_service.get_properties(db, limit=size, as_rows=True)
+    fetched = time.perf_counter()
+    names = list(PropertyResponse.model_fields)
+    body = orjson.dumps({
+        "items": [{name: item.get(name) for name in names} for item in items],
+        "total": total, "page": 1, "size": size, "pages": 1, "next_cursor": next_cursor,
+    })
+    return fetched - started, time.perf_counter() - fetched, len(body)
+
+
+def measure(fn, session_factory, size: int, repeat: int):
+    fetch, serialize = [], []
+    with session_factory() as db:
+        for _ in range(repeat):
+            f, s, body_bytes = fn(db, size)
+            fetch.append(f * 1000)
+            serialize.append(s * 1000)
+            db.expunge_all()
+    return np.percentile(fetch, [50, 99]), np.percentile(serialize, [50, 99]), body_bytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmpdir, 'bench_serialization.db')}")
+        Base.metadata.create_all(engine, tables=[Property.__table__])
+        session_factory = sessionmaker(bind=engine)
+        populate(session_factory, args.rows)
+
+        print(f"{'path':<10}{'items':>7}{'fetch p50':>11}{'p99':>8}{'serialize p50':>15}{'p99':>8}{'bytes':>10}")
+        for size in PAGE_SIZES:
+            for name, fn in (("pydantic", pydantic_page), ("orjson", orjson_page)):
+                fetch, serialize, body_bytes = measure(fn, session_factory, size, args.repeat)
+                print(
+                    f"{name:<10}{size:>7}{fetch[0]:>11.2f}{fetch[1]:>8.2f}"
+                    f"{serialize[0]:>15.2f}{serialize[1]:>8.2f}{body_bytes:>10}"
+                )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
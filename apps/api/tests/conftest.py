@@ -1,13 +1,20 @@
 import pytest
 from typing import AsyncGenerator, Generator
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 from httpx import ASGITransport, AsyncClient
 
+from app.core import cache
+from app.core.config import settings
 from app.core.db import Base
-from app.core.deps import get_db
+from app.core.deps import get_db, get_async_db, get_read_db
 from app.main import app
+from app.services import analytics_snapshot
+
+# Tests never call external geocoding providers
+settings.GEOCODER_PROVIDER = "none"
 
 # Use in-memory SQLite for tests
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -31,6 +38,8 @@ def db(db_engine) -> Generator[Session, None, None]:
     connection = db_engine.connect()
     transaction = connection.begin()
     session = TestingSessionLocal(bind=connection)
+    # The snapshot is process-wide; rebuild it from this test's rows
+    analytics_snapshot.snapshot.reset()
     
     yield session
     
@@ -38,16 +47,48 @@ def db(db_engine) -> Generator[Session, None, None]:
     transaction.rollback()
     connection.close()
 
+@pytest.fixture(scope="session")
+def async_db_engine(tmp_path_factory):
+    # aiosqlite cannot share the in-memory connection above: async endpoints
+    # read a separate file database, seeded through the async_db fixture
+    path = tmp_path_factory.mktemp("async") / "test.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+    # NullPool: every test runs on its own event loop
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    yield engine
+    engine.sync_engine.dispose()
+
 @pytest.fixture(scope="function")
-async def client(db: Session) -> AsyncGenerator[AsyncClient, None]:
+async def async_db(async_db_engine) -> AsyncGenerator[AsyncSession, None]:
+    async with async_db_engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, expire_on_commit=False)
+        
+        yield session
+        
+        await session.close()
+        await transaction.rollback()
+
+@pytest.fixture(scope="function")
+async def client(db: Session, async_db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     # Override the dependency
     def override_get_db():
         try:
             yield db
         finally:
             pass
+    
+    async def override_get_async_db():
+        yield async_db
             
     app.dependency_overrides[get_db] = override_get_db
+    # Reads see the test transaction too (no replicas in tests)
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # Each test runs in a rolled-back transaction, so cached responses must not leak
+    cache.cache.clear()
     
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
@@ -0,0 +1,117 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core import cache
+from app.core.config import settings
+from app.models.property import Property
+from app.services import analytics_snapshot, complex_service, heatmap_service, property_service
+
+SOCHI_BBOX = (39.5, 43.3, 40.0, 43.8)
+
+
+def _add_property(db, price: float, lat: float = 43.58, lon: float = 39.72, **fields):
+    prop = Property(
+        title="Flat",
+        price=price,
+        address="Сочи",
+        area_sqm=fields.pop("area_sqm", 50.0),
+        latitude=lat,
+        longitude=lon,
+        source=fields.pop("source", "cian"),
+        **fields,
+    )
+    db.add(prop)
+    return prop
+
+
+def _cell(feature):
+    return feature["properties"]["cell"]
+
+
+def test_snapshot_refreshes_incrementally(db):
+    snapshot = analytics_snapshot.snapshot
+    first = _add_property(db, 10_000_000)
+    _add_property(db, 20_000_000)
+    db.flush()
+    assert len(snapshot.get(db)) == 2
+    assert snapshot.refreshes["full"] == 1
+
+    # New, changed and soft-deleted rows are merged without a full rebuild
+    third = _add_property(db, 30_000_000, rooms="2")
+    first.price = 12_000_000
+    db.flush()
+    cache.invalidate(cache.PROPERTIES)
+    columns = snapshot.get(db)
+    assert snapshot.refreshes == {"full": 1, "incremental": 1}
+    assert sorted(columns.price.tolist()) == [12_000_000, 20_000_000, 30_000_000]
+
+    third.is_active = False
+    db.flush()
+    cache.invalidate(cache.PROPERTIES)
+    assert snapshot.get(db).property_stats()["total_properties"] == 2
+    assert snapshot.refreshes["full"] == 1
+
+    # Hard deletes are invisible to the watermark; the count check rebuilds
+    db.delete(first)
+    db.flush()
+    cache.invalidate(cache.PROPERTIES)
+    assert len(snapshot.get(db)) == 1
+    assert snapshot.refreshes["full"] == 2
+
+
+def test_readers_do_not_wait_for_a_refresh(db):
+    snapshot = analytics_snapshot.snapshot
+    _add_property(db, 10_000_000)
+    db.flush()
+    columns = snapshot.get(db)
+
+    _add_property(db, 20_000_000)
+    db.flush()
+    cache.invalidate(cache.PROPERTIES)
+    # Another caller is refreshing: the published columns are served meanwhile
+    with snapshot._refresh_lock:
+        assert snapshot.get(db) is columns
+    assert len(snapshot.get(db)) == 2
+
+
+def test_snapshot_matches_sql_backend(db, monkeypatch):
+    _add_property(db, 10_000_000, rooms="1", complex_name="Mantera")
+    _add_property(db, 30_000_000, rooms="2", complex_name="Mantera", area_sqm=60.0)
+    _add_property(db, 60_000_000, rooms="2", complex_name="Mantera", source="avito")
+    _add_property(db, 45_000_000, rooms="3", complex_name="Mantera")  # Even count: interpolated median
+    _add_property(db, 8_000_000, lat=43.41, lon=39.95, area_sqm=0.0)
+    _add_property(db, 5_000_000, lat=None, lon=None)
+    db.flush()
+
+    def results():
+        return (
+            property_service.get_property_stats(db),
+            heatmap_service.get_clusters(db, SOCHI_BBOX, zoom=12),
+            complex_service.get_statistics(db, "Mantera"),
+            complex_service.get_distributions(db, "Mantera"),
+        )
+
+    monkeypatch.setattr(settings, "ANALYTICS_BACKEND", "sql")
+    expected = results()
+    monkeypatch.setattr(settings, "ANALYTICS_BACKEND", "snapshot")
+    stats, clusters, statistics, distributions = results()
+
+    assert stats == pytest.approx(expected[0])
+    assert sorted(clusters, key=_cell) == sorted(expected[1], key=_cell)
+    assert statistics == expected[2]
+    assert distributions == expected[3]
+    assert complex_service.get_statistics(db, "Unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_snapshot_memory_stats(client: AsyncClient, db):
+    _add_property(db, 10_000_000, rooms="1")
+    db.flush()
+
+    response = await client.get("/api/v1/stats/analytics-snapshot")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["backend"] == "snapshot"
+    assert data["rows"] == 1
+    assert data["memory_bytes"]["price"] == 8
+    assert data["total_bytes"] == sum(data["memory_bytes"].values())
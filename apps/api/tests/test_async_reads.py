@@ -0,0 +1,38 @@
+import pytest
+from httpx import AsyncClient
+
+from app.models.complex import Complex
+from app.models.district import District
+
+
+@pytest.mark.asyncio
+async def test_admin_reads_use_async_session(client: AsyncClient, async_db):
+    district = District(name="Хостинский", center_lat=43.51, center_lng=39.87)
+    complex_obj = Complex(name="Mantera Residence", center_lat=43.58, center_lng=39.72, tags=["sea"])
+    async_db.add_all([district, complex_obj])
+    await async_db.flush()
+    
+    response = await client.get("/api/v1/districts")
+    assert response.status_code == 200
+    assert [d["name"] for d in response.json()] == ["Хостинский"]
+    response = await client.get(f"/api/v1/districts/{district.id}")
+    assert response.json()["center_lat"] == 43.51
+    response = await client.get("/api/v1/districts/999999")
+    assert response.status_code == 404
+    
+    response = await client.get(f"/api/v1/complexes-admin/{complex_obj.id}")
+    assert response.status_code == 200
+    assert response.json()["tags"] == ["sea"]
+    assert [c["name"] for c in (await client.get("/api/v1/complexes-admin")).json()] == ["Mantera Residence"]
+
+
+@pytest.mark.asyncio
+async def test_settings_created_on_first_async_read(client: AsyncClient):
+    response = await client.get("/api/v1/settings")
+    assert response.status_code == 200
+    assert response.json()["footer_phone"] == "+7 (800) 555-35-35"
+    
+    # Served from cache with validators afterwards
+    etag = response.headers["etag"]
+    response = await client.get("/api/v1/settings", headers={"If-None-Match": etag})
+    assert response.status_code == 304
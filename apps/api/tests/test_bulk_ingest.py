@@ -0,0 +1,124 @@
+import json
+
+from sqlalchemy import event
+
+from app.models.complex import Complex
+from app.models.property import Property
+from app.schemas.property import BulkPropertyCreate, PropertyCreate
+from app.services import complex_matcher, property_service
+
+
+def listing(source_id: str, price: float, **overrides) -> PropertyCreate:
+    data = dict(
+        title=f"Квартира {source_id}",
+        price=price,
+        address="ул. Навагинская, 9, Центральный",
+        latitude=43.58,
+        longitude=39.72,
+        area_sqm=50.0,
+        source="cian",
+        source_id=source_id,
+    )
+    data.update(overrides)
+    return PropertyCreate(**data)
+
+
+def test_bulk_upsert_inserts_updates_and_skips(db):
+    first = property_service.bulk_upsert_properties(
+        db, [listing("1", 10_000_000), listing("2", 12_000_000), listing("2", 12_000_000)]
+    )
+    assert first == {"inserted": 2, "updated": 0, "unchanged": 0}
+    
+    original = db.query(Property).filter(Property.source_id == "1").one()
+    original_id, created_at = original.id, original.created_at
+    
+    second = property_service.bulk_upsert_properties(db, [
+        listing("1", 9_500_000, latitude=None, longitude=None),
+        listing("2", 12_000_000),
+        listing("3", 15_000_000),
+    ], batch_size=2)
+    assert second == {"inserted": 1, "updated": 1, "unchanged": 1}
+    
+    db.expire_all()
+    assert db.query(Property).count() == 3
+    updated = db.query(Property).filter(Property.source_id == "1").one()
+    assert updated.id == original_id
+    assert updated.created_at == created_at
+    assert updated.price == 9_500_000
+    # Missing coordinates in the new scrape keep the stored ones
+    assert updated.latitude == 43.58
+
+
+def test_bulk_upsert_keeps_soft_deleted_listings_inactive(db):
+    property_service.bulk_upsert_properties(db, [listing("7", 10_000_000)])
+    deleted = db.query(Property).filter(Property.source_id == "7").one()
+    property_service.delete_property(db, deleted.id)
+    
+    result = property_service.bulk_upsert_properties(db, [listing("7", 9_000_000)])
+    assert result == {"inserted": 0, "updated": 1, "unchanged": 0}
+    db.expire_all()
+    deleted = db.query(Property).filter(Property.source_id == "7").one()
+    assert deleted.price == 9_000_000
+    assert deleted.is_active is False
+
+
+def test_bulk_upsert_reclassifies_automatic_complexes(db):
+    corum = Complex(name="Corum", center_lat=43.59, center_lng=39.73)
+    db.add(corum)
+    db.flush()
+    complex_matcher.invalidate()
+    property_service.bulk_upsert_properties(db, [
+        listing("8", 10_000_000, title="Квартира в ЖК Mantera Residence"),
+        listing("9", 10_000_000, title="Квартира в ЖК Mantera Residence"),
+    ])
+    admin_set = db.query(Property).filter(Property.source_id == "9").one()
+    admin_set.complex_name, admin_set.complex_auto = "Mantera Residence", False
+    db.commit()
+    
+    property_service.bulk_upsert_properties(db, [
+        listing("8", 10_000_000, title="Пентхаус Corum"),
+        listing("9", 10_000_000, title="Пентхаус Corum"),
+    ])
+    db.expire_all()
+    rows = {p.source_id: p for p in db.query(Property).filter(Property.source_id.in_(["8", "9"]))}
+    assert (rows["8"].complex_name, rows["8"].complex_id, rows["8"].complex_auto) == ("Corum", corum.id, True)
+    assert (rows["9"].complex_name, rows["9"].complex_auto) == ("Mantera Residence", False)
+
+
+def test_bulk_upsert_keeps_sources_apart(db):
+    property_service.bulk_upsert_properties(db, [
+        listing("42", 10_000_000),
+        listing("42", 11_000_000, source="avito"),
+    ])
+    assert db.query(Property).filter(Property.source_id == "42").count() == 2
+
+
+def test_create_floor_units_inserts_in_one_statement(db):
+    bulk = BulkPropertyCreate(
+        template=listing("A", 10_000_000, source="manual").model_dump(exclude={"source_id"}),
+        floor_from=2,
+        floor_to=4,
+        apartments_per_floor=2,
+        price_increment_per_floor=100_000,
+    )
+    inserts = []
+
+    def listener(conn, cursor, statement, *args):
+        if statement.startswith("INSERT INTO properties"):
+            inserts.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        ids = property_service.create_floor_units(db, bulk)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    
+    assert len(ids) == len(set(ids)) == 6
+    assert len(inserts) == 1
+    units = {p.id: p for p in db.query(Property).filter(Property.id.in_(ids))}
+    first, last = units[ids[0]], units[ids[-1]]
+    assert first.title == "Квартира A (эт. 2, кв. 1)"
+    assert (last.floor, last.price) == (4, 10_200_000)
+    # Located template: distances computed once, units need no enrichment
+    assert all(p.enrichment_status == "done" for p in units.values())
+    assert len({json.dumps(p.distances, sort_keys=True) for p in units.values()}) == 1
@@ -0,0 +1,119 @@
+import fnmatch
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.cache import CacheEntry, LocalCache, RedisCache
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis-py client."""
+    
+    def __init__(self):
+        self.data = {}
+    
+    def get(self, key):
+        return self.data.get(key)
+    
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+    
+    def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+    
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+    
+    def expire(self, key, ttl):
+        pass
+    
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+    
+    def scan_iter(self, pattern):
+        return [k for k in list(self.data) if fnmatch.fnmatch(k, pattern)]
+
+
+def _entry(body: bytes = b"{}") -> CacheEntry:
+    return CacheEntry(body=body, etag='W/"x"', last_modified=time.time())
+
+
+def test_local_cache_lru_ttl_and_tags():
+    cache = LocalCache(max_entries=2, ttl=60)
+    cache.set("a", _entry(b"a"), ["properties"])
+    cache.set("b", _entry(b"b"), ["settings"])
+    assert cache.get("a").body == b"a"  # "a" is now most recently used
+    cache.set("c", _entry(b"c"), ["properties"])
+    assert cache.get("b") is None
+    
+    cache.invalidate_tags("properties")
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+    
+    cache.set("d", _entry(), [], ttl=-1)
+    assert cache.get("d") is None
+    cache.set("e", _entry(), ["settings"], ttl=0)
+    assert cache.get("e") is None
+
+
+def test_local_cache_prunes_tags():
+    cache = LocalCache(max_entries=2, ttl=60)
+    for i in range(10):
+        cache.set(f"/page{i}", _entry(), ["properties", f"tag{i}"])
+    # Evicted keys leave no tag references behind
+    assert cache._tags == {"properties": {"/page8", "/page9"}, "tag8": {"/page8"}, "tag9": {"/page9"}}
+    
+    cache.set("/page9", _entry(), ["settings"])
+    assert cache._tags == {"properties": {"/page8"}, "tag8": {"/page8"}, "settings": {"/page9"}}
+    
+    cache.set("/short", _entry(), ["districts"], ttl=1)
+    cache._entries["/short"] = (0.0, *cache._entries["/short"][1:])  # Expired
+    assert cache.get("/short") is None
+    assert "districts" not in cache._tags
+    
+    cache.invalidate_tags("properties")
+    assert cache._tags == {"settings": {"/page9"}}
+
+
+def test_redis_cache_tags():
+    cache = RedisCache(FakeRedis(), ttl=60)
+    cache.set("/stats?", _entry(b'{"a":1}'), ["properties"])
+    cache.set("/settings?", _entry(), ["settings"])
+    assert cache.get("/stats?").body == b'{"a":1}'
+    
+    assert cache.invalidated_at(["properties"]) == 0.0
+    cache.invalidate_tags("properties")
+    assert cache.get("/stats?") is None
+    assert cache.get("/settings?") is not None
+    # Invalidation times are shared so every worker can shorten replica-built entries
+    assert cache.invalidated_at(["settings", "properties"]) > time.time() - 5
+    
+    cache.clear()
+    assert cache.get("/settings?") is None
+
+
+@pytest.mark.asyncio
+async def test_stats_revalidation_and_invalidation(client: AsyncClient, db):
+    from app.schemas.property import PropertyCreate
+    from app.services import property_service
+    
+    response = await client.get("/api/v1/stats")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["last-modified"]
+    total = response.json()["properties"]["total_properties"]
+    
+    response = await client.get("/api/v1/stats", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    
+    property_service.create_property(db, PropertyCreate(
+        title="Cache Flat", price=1_000_000, address="Сочи",
+        latitude=43.58, longitude=39.72, area_sqm=30,
+    ))
+    
+    response = await client.get("/api/v1/stats", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["properties"]["total_properties"] == total + 1
@@ -0,0 +1,125 @@
+import pytest
+from httpx import AsyncClient
+
+from app.models.complex import Complex
+from app.models.property import Property
+from app.schemas.property import PropertyCreate, PropertyUpdate
+from app.services import complex_matcher, property_service
+
+
+def test_aho_corasick_picks_highest_priority_match():
+    matcher = complex_matcher.AhoCorasick([
+        ("he", 1, "he"),
+        ("she", 0, "she"),
+        ("hers", 2, "hers"),
+    ])
+    assert matcher.best("USHERS") == "she"
+    assert matcher.best("other") == "he"
+    assert matcher.best("nothing") is None
+
+
+def test_matcher_follows_known_complex_order():
+    matcher = complex_matcher.build_matcher()
+    # "residence" also matches, but Mantera is listed first
+    assert matcher.best("Квартира в ЖК Mantera Residence") == "Mantera Residence"
+    assert matcher.best("2-к квартира в ЖК Горки Город") == "Горки Город"
+    assert matcher.best("Студия у моря") is None
+
+
+@pytest.mark.asyncio
+async def test_complexes_grouped_by_assigned_name(client: AsyncClient, db):
+    complex_matcher.invalidate()
+    
+    def create(title: str, price: float):
+        return property_service.create_property(db, PropertyCreate(
+            title=title,
+            price=price,
+            address="ул. Виноградная, 15, Сочи",
+            latitude=43.58,
+            longitude=39.72,
+            area_sqm=100.0,
+        ))
+    
+    first = create("Квартира в ЖК Mantera Residence", 40_000_000)
+    create("Апартаменты Мантера", 60_000_000)
+    create("Студия у моря", 10_000_000)
+    assert first.complex_name == "Mantera Residence"
+    
+    # Rows created before the classifier existed are picked up by backfill
+    legacy = Property(
+        title="Пентхаус Corum", price=90_000_000, address="Сочи",
+        area_sqm=150.0, source="manual",
+    )
+    db.add(legacy)
+    db.flush()
+    assert complex_matcher.backfill(db) == 1
+    db.refresh(legacy)
+    assert legacy.complex_name == "Corum"
+    
+    response = await client.get("/api/v1/complexes")
+    assert response.status_code == 200
+    by_name = {c["name"]: c for c in response.json()}
+    assert by_name["Mantera Residence"]["count"] == 2
+    assert by_name["Mantera Residence"]["avg_price_per_sqm"] == 500_000
+    assert by_name["Corum"]["count"] == 1
+    assert by_name["Другие объекты"]["count"] == 1
+    
+    response = await client.get("/api/v1/complexes/mantera")
+    assert response.status_code == 200
+    assert response.json()["name"] == "Mantera Residence"
+    assert response.json()["statistics"]["total_count"] == 2
+    
+    detail = response.json()
+    assert detail["statistics"]["min_price"] == 40_000_000
+    # Interpolated between the two middle prices
+    assert detail["statistics"]["median_price"] == 50_000_000
+    assert detail["statistics"]["avg_area"] == 100
+    assert {d["range"]: d["count"] for d in detail["price_distribution"]} == {
+        "< 15M": 0, "15-30M": 0, "30-50M": 1, "50-100M": 1, "> 100M": 0,
+    }
+    assert detail["room_distribution"] == {"Не указано": 2}
+    assert detail["source_distribution"] == {"manual": 2}
+    assert [p["price"] for p in detail["properties"]] == [40_000_000, 60_000_000]
+    
+    response = await client.get("/api/v1/complexes/mantera/compare", params={"compare_with": "corum"})
+    assert response.status_code == 200
+    comparison = response.json()
+    assert comparison["complex_b"]["name"] == "Corum"
+    assert comparison["comparison"]["count_diff"] == 1
+
+
+def test_auto_assigned_complex_follows_title_edits(db):
+    complex_matcher.invalidate()
+    prop = property_service.create_property(db, PropertyCreate(
+        title="Квартира в ЖК Mantera Residence", price=40_000_000,
+        address="Сочи", area_sqm=100.0,
+    ))
+    assert (prop.complex_name, prop.complex_auto) == ("Mantera Residence", True)
+    
+    prop = property_service.update_property(db, prop.id, PropertyUpdate(title="Пентхаус Corum"))
+    assert (prop.complex_name, prop.complex_auto) == ("Corum", True)
+    prop = property_service.update_property(db, prop.id, PropertyUpdate(title="Студия у моря"))
+    assert (prop.complex_name, prop.complex_auto) == (None, False)
+    
+    # Names set by admin are kept
+    prop = property_service.update_property(db, prop.id, PropertyUpdate(complex_name="Mantera Residence"))
+    prop = property_service.update_property(db, prop.id, PropertyUpdate(title="Пентхаус Corum"))
+    assert (prop.complex_name, prop.complex_auto) == ("Mantera Residence", False)
+
+
+def test_reclassification_with_a_cold_matcher(db):
+    mantera = Complex(name="Mantera Residence", center_lat=43.58, center_lng=39.72)
+    corum = Complex(name="Corum", center_lat=43.59, center_lng=39.73)
+    db.add_all([mantera, corum])
+    db.flush()
+    complex_matcher.invalidate()
+    prop = property_service.create_property(db, PropertyCreate(
+        title="Квартира в ЖК Mantera Residence", price=40_000_000,
+        address="Сочи", area_sqm=100.0,
+    ))
+    assert prop.complex_id == mantera.id
+    
+    # First call after invalidate() (or in a new process) still recognises the old auto id
+    complex_matcher.invalidate()
+    prop = property_service.update_property(db, prop.id, PropertyUpdate(title="Пентхаус Corum"))
+    assert (prop.complex_name, prop.complex_id) == ("Corum", corum.id)
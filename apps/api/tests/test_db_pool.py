@@ -0,0 +1,99 @@
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+
+from app.core import db_pool
+from app.core.config import settings
+from app.services import property_service
+
+# Counts to 10^8: takes seconds on SQLite, far longer than the test timeouts
+SLOW_QUERY = text(
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000000) "
+    "SELECT count(*) FROM n"
+)
+COUNT_QUERY = text(
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 10000) SELECT count(*) FROM n"
+)
+PG_URL = "postgresql://user:secret@db:5432/estate_db"
+
+
+def test_engine_options(monkeypatch):
+    options = db_pool.engine_options(PG_URL)
+    assert options["poolclass"] is db_pool.TimedQueuePool
+    assert options["pool_size"] == settings.DB_POOL_SIZE
+    assert options["connect_args"] == {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    async_options = db_pool.engine_options(PG_URL.replace("postgresql://", "postgresql+asyncpg://"))
+    assert async_options["poolclass"] is db_pool.TimedAsyncQueuePool
+    assert async_options["connect_args"]["server_settings"] == {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+
+    # PgBouncer pools server connections itself and shares their sessions
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    assert db_pool.engine_options(PG_URL) == {"poolclass": db_pool.TimedNullPool, "connect_args": {}}
+    async_options = db_pool.engine_options(PG_URL.replace("postgresql://", "postgresql+asyncpg://"))
+    assert async_options["connect_args"] == {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+
+    assert db_pool.engine_options("sqlite:///./dev.db") == {"connect_args": {"check_same_thread": False}}
+    assert db_pool.engine_options("sqlite+aiosqlite:///./dev.db") == {}
+
+
+def test_pool_metrics(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=db_pool.TimedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    try:
+        first, second = engine.connect(), engine.connect()
+        stats = db_pool.pool_stats(engine.pool)
+        assert (stats["checked_out"], stats["overflow"], stats["checkouts"]) == (2, 1, 2)
+
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        second.close()
+        first.close()
+
+        stats = db_pool.pool_stats(engine.pool)
+        assert stats["checked_out"] == 0
+        assert stats["timeouts"] == 1
+        assert stats["wait_ms_max"] >= stats["wait_ms_avg"] > 0
+    finally:
+        engine.dispose()
+
+
+def test_statement_timeout_sqlite(db_engine):
+    with Session(db_engine) as session:
+        with db_pool.statement_timeout(session, 50):
+            with pytest.raises(OperationalError) as e:
+                session.execute(SLOW_QUERY)
+        assert db_pool.is_statement_timeout(e.value)
+        session.rollback()
+
+        # The limit only applies inside the block
+        time.sleep(0.06)
+        assert session.execute(COUNT_QUERY).scalar() == 10000
+
+
+@pytest.mark.asyncio
+async def test_analytics_statement_timeout(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "DB_ANALYTICS_STATEMENT_TIMEOUT_MS", 50)
+    monkeypatch.setattr(property_service, "get_property_stats", lambda db: db.execute(SLOW_QUERY).scalar())
+
+    response = await client.get("/api/v1/stats")
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Query timed out"}
+
+
+@pytest.mark.asyncio
+async def test_db_health(client: AsyncClient):
+    response = await client.get("/healthz/db")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ok"
+    assert data["pools"].keys() == {"sync", "async", "replicas"}
+    assert "pool" in data["pools"]["sync"] and "pool" in data["pools"]["async"]
@@ -0,0 +1,135 @@
+import time
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException, Request
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import Session
+
+from app.core import cache, deps
+from app.core.config import settings
+from app.core.db import Base
+from app.core.db_router import STICKY_HEADER, ReplicaRouter, StickyPrimaryMiddleware
+from app.main import app as main_app
+from app.models.property import Property
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """Primary and replica as two SQLite files that tell themselves apart."""
+    engines = {}
+    for name in ("primary", "replica"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}.db", connect_args={"check_same_thread": False})
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE marker (name TEXT)"))
+            conn.execute(text("INSERT INTO marker VALUES (:name)"), {"name": name})
+        engines[name] = engine
+    # Unreachable: the directory does not exist
+    engines["down"] = create_engine(f"sqlite:///{tmp_path / 'missing' / 'down.db'}")
+    yield engines
+    for engine in engines.values():
+        engine.dispose()
+
+
+def _marker(bind):
+    if isinstance(bind, Connection):
+        with bind:
+            return bind.execute(text("SELECT name FROM marker")).scalar()
+    with bind.connect() as conn:
+        return conn.execute(text("SELECT name FROM marker")).scalar()
+
+
+def test_router_falls_back(databases, tmp_path):
+    router = ReplicaRouter(databases["primary"], [databases["down"], databases["replica"]], retry_seconds=60)
+
+    assert _marker(router.connect()) == "replica"
+    assert [replica["up"] for replica in router.stats()] == [False, True]
+    # The failed replica is not retried until retry_seconds have passed
+    assert _marker(router.connect()) == "replica"
+    assert _marker(router.connect()) == "replica"
+
+    router.mark_down(1)
+    assert router.connect() is databases["primary"]
+    assert ReplicaRouter(databases["primary"], []).connect() is databases["primary"]
+
+    # An exhausted pool counts as unavailable instead of failing the request
+    busy = create_engine(
+        f"sqlite:///{tmp_path / 'replica'}.db", poolclass=QueuePool, pool_size=1, max_overflow=0, pool_timeout=0.01,
+    )
+    try:
+        held = busy.connect()
+        router = ReplicaRouter(databases["primary"], [busy])
+        assert router.connect() is databases["primary"]
+        assert not router.stats()[0]["up"]
+        held.close()
+    finally:
+        busy.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_stick_to_primary_after_write(databases, monkeypatch):
+    monkeypatch.setattr(deps, "replica_router", ReplicaRouter(databases["primary"], [databases["replica"]]))
+    app = FastAPI()
+    app.add_middleware(StickyPrimaryMiddleware, sticky_seconds=10)
+
+    @app.get("/marker")
+    def read_marker(db: Session = Depends(deps.get_read_db)):
+        return db.execute(text("SELECT name FROM marker")).scalar()
+
+    @app.post("/write")
+    def write(fail: bool = False):
+        if fail:
+            raise HTTPException(status_code=400, detail="rejected")
+        return {"ok": True}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/marker")).json() == "replica"
+
+        # Failed writes change nothing
+        response = await client.post("/write", params={"fail": True})
+        assert STICKY_HEADER not in response.headers
+        assert (await client.get("/marker")).json() == "replica"
+
+        # The client echoes the header back (cookies do not work cross-site)
+        response = await client.post("/write")
+        until = response.headers[STICKY_HEADER]
+        assert (await client.get("/marker", headers={STICKY_HEADER: until})).json() == "primary"
+        assert (await client.get("/marker", headers={STICKY_HEADER: "0"})).json() == "replica"
+
+        # Admins always read their own writes
+        assert (await client.get("/marker", headers={"Authorization": "Bearer x"})).json() == "primary"
+
+
+@pytest.mark.asyncio
+async def test_cached_analytics_read_the_replica(tmp_path, monkeypatch):
+    engines = {}
+    for name, count in (("primary", 0), ("replica", 2)):
+        engine = create_engine(f"sqlite:///{tmp_path / name}-schema.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add_all(
+                Property(title=f"Flat {i}", price=10_000_000, address="Сочи", area_sqm=50.0, source="manual")
+                for i in range(count)
+            )
+            session.commit()
+        engines[name] = engine
+    monkeypatch.setattr(deps, "replica_router", ReplicaRouter(engines["primary"], [engines["replica"]]))
+    monkeypatch.setattr(settings, "ANALYTICS_BACKEND", "sql")
+    cache.cache.clear()
+    try:
+        async with AsyncClient(transport=ASGITransport(app=main_app), base_url="http://test") as client:
+            cache.invalidate(cache.PROPERTIES)
+            response = await client.get("/api/v1/stats")
+        assert response.json()["properties"]["total_properties"] == 2
+
+        # Built on a replica right after a write: kept only until replication caught up
+        expires_at = cache.cache._entries["/api/v1/stats?"][0]
+        assert expires_at - time.monotonic() <= settings.DB_REPLICA_STICKY_SECONDS
+        monkeypatch.setattr(settings, "DB_REPLICA_STICKY_SECONDS", 0)
+        assert cache._replica_ttl([cache.PROPERTIES], None) is None
+    finally:
+        cache.cache.clear()
+        for engine in engines.values():
+            engine.dispose()
@@ -0,0 +1,48 @@
+import pytest
+from httpx import AsyncClient
+
+from app.models.infrastructure import Infrastructure, InfraType
+from app.models.property import Property
+from app.services import distance_backfill, spatial_index
+from tests.test_properties import get_admin_header
+
+
+def add_property(db, title, lat, distances=None):
+    prop = Property(
+        title=title, price=10_000_000, area_sqm=50.0, address="Сочи", source="manual",
+        latitude=lat, longitude=39.72, distances=distances,
+    )
+    db.add(prop)
+    return prop
+
+
+def test_backfill_updates_dirty_rows_in_chunks(db):
+    spatial_index.invalidate()
+    db.add(Infrastructure(name="Пляж", type=InfraType.SEA, latitude=43.58, longitude=39.72))
+    empty = [add_property(db, f"Квартира {i}", 43.58 + i * 0.009) for i in range(5)]
+    done = add_property(db, "Готово", 43.59, distances={"sea": 1})
+    db.commit()
+    
+    progress = []
+    result = distance_backfill.backfill_distances(db, chunk_size=2, on_progress=progress.append)
+    
+    assert result["processed"] == 5
+    assert result["chunks"] == 3
+    assert [p["processed"] for p in progress] == [2, 4, 5]
+    db.expire_all()
+    assert sorted(p.distances["sea"] for p in empty) == [0, 1000, 2000, 3000, 4000]
+    assert empty[0].distances["school"] is None
+    assert done.distances == {"sea": 1}
+    
+    assert distance_backfill.backfill_distances(db, only_dirty=False)["processed"] == 6
+    db.expire_all()
+    assert done.distances["sea"] == 1110
+
+
+@pytest.mark.asyncio
+async def test_backfill_endpoint_requires_admin(client: AsyncClient):
+    url = "/api/v1/properties/maintenance/backfill-distances"
+    assert (await client.post(url)).status_code == 401
+    response = await client.post(url, headers=await get_admin_header(client))
+    assert response.status_code == 200
+    assert "rows_per_second" in response.json()
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.models.property import Property
+from app.schemas.property import PropertyCreate, PropertyUpdate
+from app.services import enrichment_service, property_service
+from app.services.geocoder import geocoder
+
+
+def test_create_defers_geocoding_to_enrichment(db, monkeypatch):
+    calls = []
+    
+    def fake_get(url, params=None, **kwargs):
+        calls.append(params["q"])
+        return httpx.Response(
+            200,
+            json={"features": [{"geometry": {"coordinates": [39.8, 43.5]}}]},
+            request=httpx.Request("GET", url),
+        )
+    
+    monkeypatch.setattr(settings, "GEOCODER_PROVIDER", "photon")
+    monkeypatch.setattr(httpx, "get", fake_get)
+    
+    prop = property_service.create_property(db, PropertyCreate(
+        title="Дом у моря", price=20_000_000, area_sqm=80.0,
+        address="ул. Совсем Новая, 7, Хостинский",
+    ))
+    # Saving does not call the provider
+    assert calls == []
+    assert prop.latitude is None
+    assert prop.enrichment_status == "pending"
+    
+    assert enrichment_service.enrich(db, prop.id) == "done"
+    db.refresh(prop)
+    assert (prop.latitude, prop.longitude) == (43.5, 39.8)
+    assert len(calls) == 1
+    # Already enriched rows are skipped
+    assert enrichment_service.enrich(db, prop.id) is None
+
+
+def test_update_uses_cached_coordinates_inline(db):
+    geocoder.reset()
+    prop = property_service.create_property(db, PropertyCreate(
+        title="Квартира", price=10_000_000, area_sqm=40.0,
+        address="ул. Горького, 45", latitude=43.0, longitude=39.0,
+    ))
+    
+    updated = property_service.update_property(db, prop.id, PropertyUpdate(address="ул. Войкова, 21"))
+    assert (updated.latitude, updated.longitude) == (43.5840, 39.7225)
+    assert updated.enrichment_status == "pending"
+    
+    # Cache miss: the old coordinates stay until the worker geocodes the new address
+    updated = property_service.update_property(db, prop.id, PropertyUpdate(address="ул. Неизвестная, 1"))
+    assert (updated.latitude, updated.longitude) == (43.5840, 39.7225)
+    assert updated.location_stale
+    assert updated.enrichment_status == "pending"
+
+
+def test_provider_errors_are_retried_with_backoff(db, monkeypatch):
+    geocoder.reset()
+    prop = property_service.create_property(db, PropertyCreate(
+        title="Квартира", price=10_000_000, area_sqm=40.0,
+        address="ул. Горького, 45", latitude=43.0, longitude=39.0,
+    ))
+    property_service.update_property(db, prop.id, PropertyUpdate(address="ул. Неизвестная, 1"))
+
+    # No provider configured: still pending, retried later
+    assert enrichment_service.enrich(db, prop.id) == "pending"
+    assert prop.enrichment_attempts == 1
+    assert prop.enrichment_retry_at > datetime.utcnow()
+    assert (prop.latitude, prop.longitude) == (43.0, 39.0)
+    assert not enrichment_service.claim(db, prop.id)
+    assert enrichment_service.retry_delay(2) == 2 * enrichment_service.retry_delay(1)
+
+    # The provider does not know the address: failed, the old location is kept
+    def not_found(url, params=None, **kwargs):
+        return httpx.Response(200, json={"features": []}, request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(settings, "GEOCODER_PROVIDER", "photon")
+    monkeypatch.setattr(httpx, "get", not_found)
+    prop.enrichment_retry_at = None
+    db.commit()
+    assert enrichment_service.enrich(db, prop.id) == "failed"
+    assert (prop.latitude, prop.longitude) == (43.0, 39.0)
+    assert not prop.location_stale
+    assert prop.enrichment_attempts == 0
+
+
+def test_pending_rows_are_claimed_once(db):
+    pending = [
+        property_service.create_property(db, PropertyCreate(
+            title=f"Квартира {i}", price=10_000_000, area_sqm=40.0, address=f"ул. Новая, {i}",
+        ))
+        for i in range(3)
+    ]
+    pending[2].enrichment_retry_at = datetime.utcnow() + timedelta(minutes=5)
+    db.commit()
+
+    claimed = enrichment_service.claim_due(db)
+    assert sorted(claimed) == sorted(p.id for p in pending[:2])
+    # Leased rows are not handed to a second worker
+    assert enrichment_service.claim_due(db) == []
+    assert not enrichment_service.claim(db, pending[0].id)
+
+
+@pytest.mark.asyncio
+async def test_enrichment_status_in_response(client: AsyncClient, db):
+    db.add(Property(
+        title="Студия", price=5_000_000, area_sqm=25.0, address="Сочи", source="manual",
+        latitude=43.58, longitude=39.72,
+    ))
+    db.commit()
+    response = await client.get("/api/v1/properties")
+    assert response.json()["items"][0]["enrichment_status"] == "done"
@@ -0,0 +1,55 @@
+import pytest
+from httpx import AsyncClient
+
+from app.models.property import Property
+
+
+def _add_property(db, rooms: str, price: float, source: str = "cian", is_from_developer: bool = False, title: str = "Flat"):
+    prop = Property(
+        title=title,
+        price=price,
+        address="Sochi",
+        area_sqm=50.0,
+        rooms=rooms,
+        source=source,
+        is_from_developer=is_from_developer,
+    )
+    db.add(prop)
+    return prop
+
+
+def _counts(options):
+    return {option["value"]: option["count"] for option in options}
+
+
+@pytest.mark.asyncio
+async def test_facets_exclude_own_filter(client: AsyncClient, db):
+    _add_property(db, "1", 4_000_000)
+    _add_property(db, "2", 8_000_000, title="Квартира у моря")
+    _add_property(db, "2", 12_000_000, source="avito", is_from_developer=True)
+    _add_property(db, "3", 60_000_000, source="avito")
+    db.flush()
+
+    response = await client.get("/api/v1/properties/facets", params={"rooms": "2"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    facets = data["facets"]
+    # Own filter ignored: every rooms option stays visible
+    assert _counts(facets["rooms"]) == {"1": 1, "2": 2, "3": 1}
+    # Other facets are narrowed to 2-room listings
+    assert _counts(facets["source"]) == {"cian": 1, "avito": 1}
+    assert _counts(facets["is_from_developer"]) == {False: 1, True: 1}
+    assert [bucket["count"] for bucket in facets["price"]] == [0, 1, 1, 0, 0]
+    assert facets["price"][-1] == {"min": 50_000_000, "max": None, "count": 0}
+
+    response = await client.get("/api/v1/properties/facets", params={"min_price": 10_000_000, "q": "мор"})
+    data = response.json()
+    assert data["total"] == 0
+    assert [bucket["count"] for bucket in data["facets"]["price"]] == [0, 1, 0, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_facets_validation(client: AsyncClient):
+    response = await client.get("/api/v1/properties/facets", params={"radius_m": 500})
+    assert response.status_code == 400
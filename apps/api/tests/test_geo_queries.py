@@ -0,0 +1,136 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import create_mock_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.core.db import Base
+from app.models.infrastructure import Infrastructure
+from app.models.property import Property
+from app.services import property_service
+from app.services.geo_service import GeoService
+
+
+def _add_property(db, lat: float, lon: float, is_active: bool = True, price: float = 10_000_000):
+    prop = Property(
+        title="Geo Flat",
+        price=price,
+        address="Sochi",
+        latitude=lat,
+        longitude=lon,
+        area_sqm=50.0,
+        source="manual",
+        is_active=is_active,
+    )
+    db.add(prop)
+    return prop
+
+
+def _postgres_sql(query) -> str:
+    return str(query.statement.compile(dialect=postgresql.dialect()))
+
+
+def test_nearby_properties_on_sqlite(db):
+    near = _add_property(db, 43.5810, 39.7200)   # ~110 m north
+    middle = _add_property(db, 43.5800, 39.7300)  # ~800 m east
+    _add_property(db, 43.5800, 39.7210, is_active=False)
+    _add_property(db, 43.4300, 39.9200)           # Adler, far away
+    db.flush()
+
+    result = property_service.get_nearby_properties(db, 43.5800, 39.7200, radius_m=1000)
+    assert [prop.id for prop, _ in result] == [near.id, middle.id]
+    assert 100 <= result[0][1] <= 120
+    assert 790 <= result[1][1] <= 820
+
+    # Without a radius the k nearest are returned
+    result = property_service.get_nearby_properties(db, 43.5800, 39.7200, limit=3)
+    assert len(result) == 3
+    assert result[-1][1] > 15_000
+
+
+def test_postgis_queries_use_geography_column():
+    engine = create_mock_engine("postgresql+psycopg2://", lambda *args, **kwargs: None)
+    db = Session(bind=engine)
+
+    query = GeoService.nearest(db, Property, 43.58, 39.72, limit=5, radius_m=500)
+    sql = _postgres_sql(query)
+    assert "ST_DWithin(properties.geog" in sql
+    assert "properties.geog <-> CAST(ST_SetSRID(ST_MakePoint(" in sql
+
+    bbox = db.query(Property.id).filter(GeoService.within_bbox(db, Property, (39.6, 43.5, 39.8, 43.7)))
+    assert "properties.geog && CAST(ST_MakeEnvelope(" in _postgres_sql(bbox)
+
+
+def test_create_all_adds_geography_column_on_postgres_only():
+    statements = []
+    engine = create_mock_engine(
+        "postgresql+psycopg2://",
+        lambda sql, *args, **kwargs: statements.append(str(sql.compile(dialect=engine.dialect))),
+    )
+    Base.metadata.create_all(engine, tables=[Property.__table__, Infrastructure.__table__], checkfirst=False)
+
+    ddl = "\n".join(statements)
+    assert "CREATE EXTENSION IF NOT EXISTS postgis" in ddl
+    for table in ("properties", "infrastructure"):
+        assert f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS geog geography(Point, 4326)" in ddl
+        assert f"CREATE INDEX IF NOT EXISTS idx_{table}_geog ON {table} USING GIST (geog)" in ddl
+
+
+@pytest.mark.asyncio
+async def test_list_properties_radius_bbox_and_distance_sort(client: AsyncClient, db):
+    near = _add_property(db, 43.5810, 39.7200, price=5_000_000)
+    middle = _add_property(db, 43.5800, 39.7300, price=20_000_000)
+    far = _add_property(db, 43.4300, 39.9200, price=7_000_000)
+    db.flush()
+
+    response = await client.get("/api/v1/properties", params={
+        "lat": 43.58, "lon": 39.72, "radius_m": 1000, "sort": "distance",
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [near.id, middle.id]
+    assert data["total"] == 2
+    assert data["items"][0]["distance_m"] < data["items"][1]["distance_m"]
+
+    # Combined with a price filter
+    response = await client.get("/api/v1/properties", params={
+        "lat": 43.58, "lon": 39.72, "radius_m": 1000, "max_price": 10_000_000,
+    })
+    assert [item["id"] for item in response.json()["items"]] == [near.id]
+
+    response = await client.get("/api/v1/properties", params={"bbox": "39.80,43.40,40.00,43.50"})
+    assert [item["id"] for item in response.json()["items"]] == [far.id]
+    assert response.json()["items"][0]["distance_m"] is None
+
+
+@pytest.mark.asyncio
+async def test_list_properties_spatial_validation(client: AsyncClient):
+    for params in (
+        {"radius_m": 500},
+        {"lat": 43.58},
+        {"sort": "distance"},
+        {"lat": 43.58, "lon": 39.72, "sort": "distance", "cursor": "abc"},
+        {"bbox": "40,43,39,44"},
+    ):
+        response = await client.get("/api/v1/properties", params=params)
+        assert response.status_code == 400, params
+
+
+def test_rtree_follows_property_writes(db):
+    prop = _add_property(db, 43.58, 39.72)
+    db.flush()
+
+    def count():
+        return db.execute(text("SELECT count(*) FROM properties_rtree")).scalar()
+
+    before = count()
+
+    prop.latitude = 43.60
+    db.flush()
+    assert count() == before
+    south = db.execute(text("SELECT min_lat FROM properties_rtree WHERE id = (SELECT rowid FROM properties WHERE id = :id)"), {"id": prop.id}).scalar()
+    assert abs(south - 43.60) < 1e-4
+
+    db.delete(prop)
+    db.flush()
+    assert count() == before - 1
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.models.geocode_cache import GeocodeCache
+from app.models.property import Property
+from app.services.geocoder import Geocoder, GeocodingError, normalize_address
+from app.services.geocoding_service import SOCHI_ADDRESS_CACHE
+
+
+def test_normalize_collapses_abbreviations():
+    assert normalize_address("ул. Навагинская, 9Д") == normalize_address("Навагинская улица, 9 Д")
+    assert normalize_address("Курортный пр., 105") == normalize_address("г. Сочи, Курортный проспект 105")
+    assert normalize_address("ул. Горького, 45") != normalize_address("ул. Горького, 46")
+
+
+def test_partial_match_uses_token_index(db):
+    geocoder = Geocoder()
+    seeded = SOCHI_ADDRESS_CACHE["ул. Орджоникидзе, 17"]
+    
+    assert geocoder.lookup("ул. Орджоникидзе, 17", db) == seeded
+    # Query adds a district
+    assert geocoder.lookup("улица Орджоникидзе 17, Центральный район", db) == seeded
+    # Query lacks the house number: least specific address of the street
+    assert geocoder.lookup("ул. Орджоникидзе", db) in (seeded, SOCHI_ADDRESS_CACHE["ул. Орджоникидзе, 11А"])
+    assert geocoder.lookup("ул. Несуществующая, 1", db) is None
+    
+    stats = geocoder.stats()
+    assert stats["hits"] == 1
+    assert stats["partial_hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_provider_results_and_negatives_are_cached(db, monkeypatch):
+    calls = []
+    
+    def fake_get(url, params=None, **kwargs):
+        calls.append(params["q"])
+        features = [] if "Пустая" in params["q"] else [{"geometry": {"coordinates": [39.75, 43.6]}}]
+        return httpx.Response(200, json={"features": features}, request=httpx.Request("GET", url))
+    
+    monkeypatch.setattr(settings, "GEOCODER_PROVIDER", "photon")
+    monkeypatch.setattr(httpx, "get", fake_get)
+    geocoder = Geocoder()
+    
+    assert geocoder.geocode("ул. Новая, 3", db) == (43.6, 39.75)
+    assert geocoder.geocode("Новая улица 3", db) == (43.6, 39.75)
+    assert geocoder.geocode("ул. Пустая, 1", db) is None
+    assert geocoder.geocode("ул. Пустая, 1", db) is None
+    assert len(calls) == 2
+    
+    # Persisted: a fresh process reads it back from the table
+    assert Geocoder().lookup("ул. Новая, 3", db) == (43.6, 39.75)
+    
+    # Expired negative result is retried
+    row = db.get(GeocodeCache, normalize_address("ул. Пустая, 1"))
+    row.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    geocoder.geocode("ул. Пустая, 1", db)
+    assert len(calls) == 3
+    assert geocoder.stats()["negative_hits"] == 1
+
+
+def test_provider_errors_raise_and_callers_commit(db, monkeypatch):
+    responses = {"ул. Сбойная, 2": 503, "ул. Новая, 4": 200}
+    
+    def fake_get(url, params=None, **kwargs):
+        status = next(code for address, code in responses.items() if address in params["q"])
+        features = [{"geometry": {"coordinates": [39.75, 43.6]}}]
+        return httpx.Response(status, json={"features": features}, request=httpx.Request("GET", url))
+    
+    monkeypatch.setattr(httpx, "get", fake_get)
+    geocoder = Geocoder()
+    
+    # Disabled provider and provider errors are not "not found"
+    monkeypatch.setattr(settings, "GEOCODER_PROVIDER", "none")
+    with pytest.raises(GeocodingError):
+        geocoder.geocode("ул. Новая, 4", db)
+    monkeypatch.setattr(settings, "GEOCODER_PROVIDER", "photon")
+    with pytest.raises(GeocodingError):
+        geocoder.geocode("ул. Сбойная, 2", db)
+    assert db.get(GeocodeCache, normalize_address("ул. Сбойная, 2")) is None
+    
+    # The cache row does not commit or expire the caller's pending work
+    prop = Property(title="Flat", price=10_000_000, address="ул. Новая, 4", area_sqm=50.0, source="manual")
+    db.add(prop)
+    db.flush()
+    transaction = db.get_transaction()
+    assert geocoder.geocode("ул. Новая, 4", db) == (43.6, 39.75)
+    assert db.get_transaction() is transaction
+    assert "price" in prop.__dict__
+    assert db.get(GeocodeCache, normalize_address("ул. Новая, 4")).latitude == 43.6
+
+
+@pytest.mark.asyncio
+async def test_geocoder_stats_endpoint(client: AsyncClient):
+    response = await client.get("/api/v1/stats/geocoder")
+    assert response.status_code == 200
+    assert {"hits", "misses", "hit_rate", "provider_calls"} <= response.json().keys()
@@ -0,0 +1,125 @@
+import pytest
+from httpx import AsyncClient
+
+from app.models.property import Property
+from app.services import heatmap_service
+
+
+def _add_property(db, lat: float, lon: float, price: float, area: float = 50.0):
+    prop = Property(
+        title="Heatmap Flat",
+        price=price,
+        address="Sochi",
+        latitude=lat,
+        longitude=lon,
+        area_sqm=area,
+        source="manual",
+    )
+    db.add(prop)
+    return prop
+
+
+def _tile_for(lat: float, lon: float, z: int) -> tuple[int, int]:
+    import math
+    n = 2 ** z
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return x, y
+
+
+@pytest.mark.asyncio
+async def test_heatmap_tile_clusters_and_points(client: AsyncClient, db):
+    _add_property(db, 43.5801, 39.7201, 10_000_000)
+    _add_property(db, 43.5802, 39.7202, 20_000_000)
+    _add_property(db, 43.4300, 39.9200, 30_000_000)  # Adler, far away
+    db.flush()
+    
+    # Low zoom: everything collapses into cells with aggregates
+    x, y = _tile_for(43.58, 39.72, 8)
+    response = await client.get(f"/api/v1/heatmap/tiles/8/{x}/{y}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["metadata"]["mode"] == "clusters"
+    assert data["metadata"]["total"] == 3
+    cells = {f["properties"]["count"]: f["properties"] for f in data["features"]}
+    assert cells[2]["avg_price"] == 15_000_000
+    assert cells[2]["avg_price_per_sqm"] == 300_000
+    
+    # High zoom: individual listings
+    x, y = _tile_for(43.58015, 39.72015, heatmap_service.POINTS_MIN_ZOOM)
+    response = await client.get(f"/api/v1/heatmap/tiles/{heatmap_service.POINTS_MIN_ZOOM}/{x}/{y}")
+    data = response.json()
+    assert data["metadata"]["mode"] == "points"
+    assert len(data["features"]) == 2
+    assert all(not f["properties"]["cluster"] for f in data["features"])
+    
+    response = await client.get("/api/v1/heatmap/tiles/2/9/0")
+    assert response.status_code == 400
+    
+    response = await client.get("/api/v1/heatmap/clusters", params={"bbox": "39.9,43.4,40.0,43.5", "zoom": 10})
+    assert response.status_code == 200
+    assert response.json()["metadata"]["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_district_analytics_refreshed_on_writes(client: AsyncClient, db):
+    from app.models.district import District
+    from app.schemas.property import PropertyCreate, PropertyUpdate
+    from app.services import property_service
+    
+    db.add(District(name="Адлер", center_lat=43.43, center_lng=39.92))
+    db.flush()
+    
+    def create(price: float, address: str):
+        return property_service.create_property(db, PropertyCreate(
+            title="District Flat",
+            price=price,
+            address=address,
+            latitude=43.43,
+            longitude=39.92,
+            area_sqm=50.0,
+        ))
+    
+    first = create(10_000_000, "ул. Ленина, 1, Адлер")
+    create(20_000_000, "ул. Ленина, 2, Адлер")
+    create(30_000_000, "ул. Навагинская 9, Сочи")
+    
+    response = await client.get("/api/v1/heatmap/districts")
+    assert response.status_code == 200
+    by_name = {d["district"]: d for d in response.json()}
+    assert by_name["Адлер"]["count"] == 2
+    assert by_name["Адлер"]["avg_price"] == 15_000_000
+    assert by_name["Адлер"]["median_price"] == 20_000_000
+    assert by_name["Сочи"]["count"] == 1
+    
+    district = db.query(District).filter(District.name == "Адлер").one()
+    db.refresh(district)
+    assert district.objects_count == 2
+    assert district.avg_price_sqm == 300_000
+    
+    # Moving a listing to another district updates both rows
+    property_service.update_property(db, first.id, PropertyUpdate(address="ул. Горького 5", latitude=43.58))
+    by_name = {d["district"]: d for d in (await client.get("/api/v1/heatmap/districts")).json()}
+    assert by_name["Адлер"]["count"] == 1
+    assert by_name["Сочи"]["count"] == 2
+    
+    property_service.delete_property(db, first.id)
+    by_name = {d["district"]: d for d in (await client.get("/api/v1/heatmap/districts")).json()}
+    assert by_name["Сочи"]["count"] == 1
+
+
+def test_district_stats_built_at_startup_not_on_read(db):
+    from app.models.district_stats import DistrictStats
+    from app.services import district_stats_service
+    
+    db.add(Property(title="Flat", price=10_000_000, address="ул. Ленина, 1, Адлер",
+                    latitude=43.43, longitude=39.92, area_sqm=50.0, source="cian"))
+    db.flush()
+    
+    # Reads never build the table
+    assert district_stats_service.get_district_stats(db) == []
+    assert db.query(DistrictStats).count() == 0
+    
+    assert district_stats_service.build_if_empty(db) == 1
+    assert [d["district"] for d in district_stats_service.get_district_stats(db)] == ["Адлер"]
+    assert district_stats_service.build_if_empty(db) == 0
@@ -0,0 +1,64 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.core import metrics
+from app.core.middleware import MetricMiddleware
+from app.models.property import Property
+
+ROUTE = "/api/v1/properties/{property_id}"
+
+
+def sample(name: str, **labels) -> float:
+    return metrics.REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_route_metrics(client: AsyncClient, db):
+    prop = Property(title="Flat", price=10_000_000, address="Сочи", area_sqm=50.0, source="cian")
+    db.add(prop)
+    db.flush()
+    ok_before = sample("http_requests_total", method="GET", route=ROUTE, status="200")
+    missing_before = sample("http_requests_total", method="GET", route=ROUTE, status="404")
+    queries_before = sample("http_request_db_queries_sum", method="GET", route=ROUTE)
+
+    assert (await client.get(f"/api/v1/properties/{prop.id}")).status_code == 200
+    assert (await client.get("/api/v1/properties/missing")).status_code == 404
+    response = await client.get("/no/such/path", headers={"X-Request-Id": "req-1"})
+    assert response.status_code == 404
+    assert response.headers["X-Request-Id"] == "req-1"
+
+    # Labelled by path template, not by the concrete id
+    assert sample("http_requests_total", method="GET", route=ROUTE, status="200") == ok_before + 1
+    assert sample("http_requests_total", method="GET", route=ROUTE, status="404") == missing_before + 1
+    assert sample("http_request_db_queries_sum", method="GET", route=ROUTE) >= queries_before + 2
+    assert sample("http_requests_total", method="GET", route=metrics.UNMATCHED, status="404") >= 1
+    assert sample("http_requests_in_progress", method="GET") == 0
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert f'http_request_duration_seconds_bucket{{le="0.005",method="GET",route="{ROUTE}"}}' in response.text
+
+
+@pytest.mark.asyncio
+async def test_middleware_passes_streaming_through():
+    app = FastAPI()
+    app.add_middleware(MetricMiddleware)
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i}\n"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    before = sample("http_requests_total", method="GET", route="/stream", status="200")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        async with client.stream("GET", "/stream") as response:
+            lines = [line async for line in response.aiter_lines()]
+    assert lines == ["chunk0", "chunk1", "chunk2"]
+    assert response.headers["X-Request-Id"]
+    assert sample("http_requests_total", method="GET", route="/stream", status="200") == before + 1
+    assert sample("http_request_db_queries_count", method="GET", route="/stream") >= 1
@@ -0,0 +1,166 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models.parse_job import ParseJob
+from app.models.property import Property
+from app.parsers import CianProperty
+from app.schemas.parse_job import ParseJobCreate
+from app.services import parse_job_service
+from app.services.geocoder import GeocodingError, geocoder
+from tests.test_properties import get_admin_header
+
+
+class StubParser:
+    """Three pages of two listings each, then an empty page."""
+    requested = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        pass
+    
+    async def search_sochi(self, page: int = 1, **filters):
+        StubParser.requested.append(page)
+        if page > 3:
+            return []
+        return [
+            CianProperty(
+                title=f"Квартира {page}-{i}", description="", price=10_000_000.0, currency="RUB",
+                address="ул. Навагинская, 9, Центральный", area_sqm=50.0, rooms="2",
+                floor=None, total_floors=None, source_id=f"cian_{page}_{i}", url="",
+                images=[], features={}, latitude=43.58, longitude=39.72,
+            )
+            for i in range(2)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_enqueue_poll_and_cancel(client: AsyncClient):
+    response = await client.post("/api/v1/parse/jobs", json={"source": "cian", "max_pages": 5})
+    assert response.status_code == 401
+    assert (await client.get("/api/v1/parse/jobs")).status_code == 401
+    
+    auth_headers = await get_admin_header(client)
+    response = await client.post("/api/v1/parse/jobs", json={"source": "cian", "max_pages": 5}, headers=auth_headers)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    assert job["params"]["max_pages"] == 5
+    
+    response = await client.get(f"/api/v1/parse/jobs/{job['id']}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["pages_done"] == 0
+    
+    response = await client.post(f"/api/v1/parse/jobs/{job['id']}/cancel", headers=auth_headers)
+    assert response.json()["status"] == "cancelled"
+    response = await client.post(f"/api/v1/parse/jobs/{job['id']}/cancel", headers=auth_headers)
+    assert response.status_code == 409
+    
+    response = await client.post("/api/v1/parse/jobs", json={"source": "domclick"}, headers=auth_headers)
+    assert response.status_code == 400
+    assert (await client.get("/api/v1/parse/jobs/missing", headers=auth_headers)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_job_resumes_after_last_completed_page(db, monkeypatch):
+    monkeypatch.setitem(parse_job_service.PARSERS, "cian", ("CIAN", StubParser))
+    StubParser.requested = []
+    
+    job = parse_job_service.create_job(db, ParseJobCreate(source="cian", max_pages=5, concurrency=2))
+    # Simulate a restart after page 1 was saved
+    job.status, job.last_completed_page, job.pages_done = "running", 1, 1
+    job.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+    db.commit()
+    
+    claimed = parse_job_service.claim_next_job(db, stale_seconds=60)
+    assert claimed.id == job.id
+    await parse_job_service.run_job(db, claimed)
+    
+    db.refresh(job)
+    assert job.status == "completed"
+    assert 1 not in StubParser.requested
+    assert job.last_completed_page == 4
+    assert job.items_saved == 4
+    assert db.query(Property).filter(Property.source_id.like("cian_%")).count() == 4
+    assert parse_job_service.claim_next_job(db) is None
+
+
+def test_running_job_with_fresh_heartbeat_is_not_claimed(db):
+    db.add(ParseJob(source="cian", params={}, status="running", heartbeat_at=datetime.utcnow()))
+    db.commit()
+    assert parse_job_service.claim_next_job(db, stale_seconds=60) is None
+
+
+@pytest.mark.asyncio
+async def test_build_items_geocodes_concurrently_with_a_bound(db, monkeypatch):
+    in_flight, peak = 0, 0
+
+    async def fake_geocode(address, db=None, city="Сочи"):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if address.endswith("0"):
+            raise GeocodingError("provider down")
+        return 43.6, 39.7
+
+    monkeypatch.setattr(geocoder, "geocode_async", fake_geocode)
+    listings = [
+        CianProperty(
+            title=f"Квартира {i}", description="", price=10_000_000.0, currency="RUB",
+            address=f"ул. Новая, {i}", area_sqm=50.0, rooms="2", floor=None, total_floors=None,
+            source_id=f"cian_geo_{i}", url="", images=[], features={},
+        )
+        for i in range(12)
+    ]
+    errors = []
+    items = await parse_job_service.build_items(db, "cian", listings, errors)
+
+    assert peak == parse_job_service.GEOCODE_CONCURRENCY
+    assert [(item.latitude, item.longitude) for item in items[:2]] == [(None, None), (43.6, 39.7)]
+    assert len(items) == 12 and errors == []
+
+
+@pytest.mark.asyncio
+async def test_run_parser_limits_pages_and_concurrency(client: AsyncClient):
+    for params in ({"max_pages": 0}, {"max_pages": 101}, {"concurrency": 0}, {"concurrency": 11}):
+        response = await client.post("/api/v1/parse/run", json={"source": "cian", **params})
+        assert response.status_code == 422, params
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_is_refreshed_during_a_slow_page(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    stale = datetime.utcnow() - timedelta(hours=1)
+    beats = []
+
+    class SlowParser(StubParser):
+        async def search_sochi(self, page: int = 1, **filters):
+            await asyncio.sleep(0.2)
+            with session_factory() as session:
+                beats.append(session.get(ParseJob, job.id).heartbeat_at)
+            return []
+
+    monkeypatch.setitem(parse_job_service.PARSERS, "cian", ("CIAN", SlowParser))
+    db = session_factory()
+    try:
+        job = ParseJob(source="cian", params={"max_pages": 1}, status="running", heartbeat_at=stale)
+        db.add(job)
+        db.commit()
+        await parse_job_service.run_job(db, job, session_factory, heartbeat_seconds=0.02)
+        assert job.status == "completed"
+        # Written while the page was still downloading
+        assert beats[0] > stale
+    finally:
+        db.close()
+        engine.dispose()
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.parsers import CianParser, CrawlScheduler, TokenBucket, crawl
+
+
+def cian_offer(cian_id: int) -> dict:
+    return {
+        "cianId": cian_id,
+        "title": f"Квартира {cian_id}",
+        "bargainTerms": {"priceRur": 10_000_000 + cian_id},
+        "geo": {
+            "address": [{"fullName": "ул. Навагинская, 9, Центральный"}],
+            "coordinates": {"lat": 43.58, "lng": 39.72},
+        },
+        "totalArea": 50,
+        "roomsCount": 2,
+        "fullUrl": f"https://cian.ru/sale/flat/{cian_id}/",
+    }
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20.0, capacity=2)
+    started = time.monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+    # Two tokens are free (burst), the other four refill at 20/s
+    assert time.monotonic() - started >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_scheduler_fetches_concurrently_and_stops_at_empty_page():
+    in_flight = 0
+    peak = 0
+    started = []
+    
+    async def fetch_page(page: int):
+        nonlocal in_flight, peak
+        started.append(page)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        return [] if page >= 4 else [page]
+    
+    pages = [p async for p in CrawlScheduler(fetch_page, max_pages=1000, concurrency=3).stream()]
+    
+    assert peak == 3
+    # Pages start as earlier ones finish, not all up front
+    assert max(started) <= 6
+    assert sorted(p.page for p in pages if p.items) == [1, 2, 3]
+    assert max(p.page for p in pages) <= 5
+
+
+@pytest.mark.asyncio
+async def test_cian_parser_reuses_one_client_against_stub():
+    requested_pages = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["p"])
+        requested_pages.append(page)
+        offers = [cian_offer(page * 10 + i) for i in range(2)] if page <= 2 else []
+        return httpx.Response(200, json={"data": {"offersSerialized": offers}})
+    
+    async with CianParser(transport=httpx.MockTransport(handler)) as parser:
+        parser._rate_limit_delay = (0.0, 0.0)
+        client = parser._get_client()
+        results = [page async for page in crawl(parser, max_pages=3, concurrency=3)]
+        assert parser._get_client() is client
+    
+    assert sorted(requested_pages) == [1, 2, 3]
+    items = [item for page in results for item in page.items]
+    assert sorted(item.source_id for item in items) == ["cian_10", "cian_11", "cian_20", "cian_21"]
+    assert parser._client is None
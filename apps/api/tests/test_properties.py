@@ -1,5 +1,11 @@
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.complex import Complex
+from app.models.property import Property
+
 
 async def get_admin_header(client: AsyncClient):
     # Ensure user exists (Setup)
@@ -70,3 +76,117 @@ async def test_property_unauthorized_write(client: AsyncClient):
     }
     response = await client.post("/api/v1/properties", json=payload)
     assert response.status_code == 403 or response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_property_cursor_pagination(client: AsyncClient):
+    auth_headers = await get_admin_header(client)
+    
+    created_ids = []
+    for i in range(5):
+        payload = {
+            "title": f"Cursor Flat {i}",
+            "price": 10000000.0 + i,
+            "address": "Lenina 1",
+            "latitude": 43.58,
+            "longitude": 39.72,
+            "area_sqm": 50.0,
+        }
+        response = await client.post("/api/v1/properties", json=payload, headers=auth_headers)
+        assert response.status_code == 201
+        created_ids.append(response.json()["id"])
+    
+    # First page in page mode also returns a cursor for the next page
+    response = await client.get("/api/v1/properties", params={"size": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 5
+    assert data["next_cursor"]
+    seen = [item["id"] for item in data["items"]]
+    
+    cursor = data["next_cursor"]
+    while cursor:
+        response = await client.get("/api/v1/properties", params={"size": 2, "cursor": cursor})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] is None
+        assert data["page"] is None
+        seen.extend(item["id"] for item in data["items"])
+        cursor = data["next_cursor"]
+    
+    assert len(seen) == len(set(seen)) == 5
+    assert set(seen) == set(created_ids)
+    
+    response = await client.get("/api/v1/properties", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_property_list_projections(client: AsyncClient, db):
+    for i in range(3):
+        db.add(Property(
+            title=f"Card Flat {i}", price=10_000_000 + i, address="Lenina 1", area_sqm=50.0, source="manual",
+            latitude=43.58, longitude=39.72, images=[f"https://img/{i}.jpg", "https://img/x.jpg"],
+            investment_metrics={"roi": 7}, eco_score={"air": 9},
+        ))
+    db.flush()
+    
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        response = await client.get("/api/v1/properties", params={"view": "card", "size": 2})
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3 and data["next_cursor"]
+    card = data["items"][0]
+    assert card["title"] == "Card Flat 2"
+    assert card["cover_image"] == "https://img/2.jpg"
+    assert "investment_metrics" not in card and "images" not in card
+    # count + one page query, no JSON columns and no per-row lazy loads
+    assert len(statements) == 2
+    assert "investment_metrics" not in statements[1]
+    
+    response = await client.get(
+        "/api/v1/properties",
+        params={"fields": "id,price,distance_m", "lat": 43.58, "lon": 39.72, "cursor": data["next_cursor"]},
+    )
+    assert response.status_code == 200
+    assert [set(item) for item in response.json()["items"]] == [{"id", "price", "distance_m"}]
+    assert response.json()["items"][0]["distance_m"] == 0
+    
+    response = await client.get("/api/v1/properties", params={"fields": "id,password"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_fast_json_reads_match_pydantic_path(client: AsyncClient, db, monkeypatch):
+    complex_obj = Complex(name="Fast JSON", center_lat=43.58, center_lng=39.72)
+    db.add(complex_obj)
+    db.flush()
+    for i in range(3):
+        db.add(Property(
+            title=f"Квартира {i}", price=9_500_000.5 + i, address="Сочи", area_sqm=42.5, source="manual",
+            latitude=43.58 + i / 100, longitude=39.72, rooms=str(i + 1), images=[f"https://img/{i}.jpg"],
+            features={"pool": True}, investment_metrics={"roi": 7.5}, complex_id=complex_obj.id,
+        ))
+    db.flush()
+    
+    requests = [
+        ("/api/v1/properties", {}),
+        ("/api/v1/properties", {"lat": 43.58, "lon": 39.72, "sort": "distance"}),
+        ("/api/v1/properties", {"view": "card", "q": "квартир"}),
+        ("/api/v1/properties", {"fields": "id,title,created_at,distance_m", "lat": 43.58, "lon": 39.72}),
+        (f"/api/v1/complexes/{complex_obj.id}/apartments", {}),
+    ]
+    for path, params in requests:
+        monkeypatch.setattr(settings, "FAST_JSON_READS", False)
+        expected = (await client.get(path, params=params)).json()
+        monkeypatch.setattr(settings, "FAST_JSON_READS", True)
+        response = await client.get(path, params=params)
+        assert response.status_code == 200
+        assert response.json() == expected, (path, params)
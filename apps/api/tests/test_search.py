@@ -0,0 +1,67 @@
+import pytest
+from httpx import AsyncClient
+
+from app.models.property import Property
+from app.services import search_service
+
+
+def _add_property(db, title: str, description: str = None, address: str = "Сочи, ул. Навагинская, 9"):
+    prop = Property(
+        title=title,
+        description=description,
+        price=10_000_000,
+        address=address,
+        area_sqm=50.0,
+        source="manual",
+    )
+    db.add(prop)
+    return prop
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_and_highlights(client: AsyncClient, db):
+    in_title = _add_property(db, "Квартира с видом на море")
+    in_description = _add_property(db, "Студия в центре", "Пять минут до моря, <b>новый</b> дом")
+    _add_property(db, "Дом в горах", "Тишина и лес")
+    db.flush()
+
+    response = await client.get("/api/v1/properties", params={"q": "мор"})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    # Title matches outrank description matches
+    assert [item["id"] for item in items] == [in_title.id, in_description.id]
+    assert "<mark>море</mark>" in items[0]["highlight"]
+    # Listing text is escaped, only <mark> is markup
+    assert "&lt;b&gt;новый&lt;/b&gt;" in items[1]["highlight"]
+
+    # Every word must match; combines with other filters
+    response = await client.get("/api/v1/properties", params={"q": "студия моря"})
+    assert [item["id"] for item in response.json()["items"]] == [in_description.id]
+    response = await client.get("/api/v1/properties", params={"q": "море", "min_price": 20_000_000})
+    assert response.json()["items"] == []
+
+
+def test_search_index_follows_writes(db):
+    prop = _add_property(db, "Пентхаус")
+    db.flush()
+
+    def matches(q):
+        return search_service.apply(db, db.query(Property.id), q).count()
+
+    assert matches("пентхаус") == 1
+
+    prop.title = "Таунхаус"
+    db.flush()
+    assert matches("пентхаус") == 0
+    assert matches("таунхаус") == 1
+
+    db.delete(prop)
+    db.flush()
+    assert matches("таунхаус") == 0
+
+
+@pytest.mark.asyncio
+async def test_search_validation(client: AsyncClient):
+    for params in ({"q": "!!!"}, {"sort": "relevance"}, {"q": "море", "cursor": "abc"}):
+        response = await client.get("/api/v1/properties", params=params)
+        assert response.status_code == 400, params
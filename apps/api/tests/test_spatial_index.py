@@ -0,0 +1,44 @@
+import numpy as np
+
+from app.models.infrastructure import Infrastructure, InfraType
+from app.services import spatial_index
+from app.services.geo_service import GeoService
+
+
+def random_points(rng, n):
+    return np.column_stack((rng.uniform(43.3, 43.8, n), rng.uniform(39.5, 40.2, n)))
+
+
+def test_tree_and_fallback_match_brute_force_haversine():
+    rng = np.random.default_rng(7)
+    points = {"school": random_points(rng, 300), "sea": random_points(rng, 50)}
+    queries = random_points(rng, 200)
+    
+    expected = {
+        key: np.array([
+            spatial_index.haversine_m(lat, lon, pts[:, 0], pts[:, 1]).min() for lat, lon in queries
+        ])
+        for key, pts in points.items()
+    }
+    for use_tree in (True, False):
+        index = spatial_index.SpatialIndex(points, use_tree=use_tree)
+        result = index.nearest_many(queries[:, 0], queries[:, 1])
+        assert result["park"] is None
+        for key in points:
+            np.testing.assert_allclose(result[key], expected[key], rtol=1e-6, atol=1e-3)
+
+
+def test_calculate_distances_uses_infrastructure_table(db):
+    spatial_index.invalidate()
+    db.add(Infrastructure(name="Пляж", type=InfraType.SEA, latitude=43.5800, longitude=39.7200))
+    db.flush()
+    
+    distances = GeoService.calculate_distances(db, 43.5890, 39.7200)
+    # 0.009° of latitude is ~1 km
+    assert distances["sea"] == 1000
+    assert distances["school"] is None
+    
+    # ORM writes rebuild the index
+    db.add(Infrastructure(name="Школа №1", type=InfraType.SCHOOL, latitude=43.5890, longitude=39.7210))
+    db.flush()
+    assert GeoService.calculate_distances(db, 43.5890, 39.7200)["school"] == 80